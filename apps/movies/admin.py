@@ -5,6 +5,8 @@ from apps.movies.models import (
     Movie,
     MovieNight,
     MovieNightInvitation,
+    MovieNightSeries,
+    MovieNightReminder,
     Notification
 )
 class MovieAdmin(admin.ModelAdmin):
@@ -16,4 +18,6 @@ admin.site.register(Movie, MovieAdmin)
 admin.site.register(MovieNight)
 admin.site.register(Notification)
 admin.site.register(MovieNightInvitation)
+admin.site.register(MovieNightSeries)
+admin.site.register(MovieNightReminder)
 
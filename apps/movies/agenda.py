@@ -0,0 +1,120 @@
+"""
+Unified "my agenda" timeline for a user.
+
+The agenda is the union of three sources, each read with one indexed query ordered by `(start_time, id)`:
+- `creator`: movie nights created by the user.
+- `attending`: movie nights the user accepted an invitation to.
+- `invited`: movie nights the user was invited to and has not answered yet.
+
+The sources are merged lazily with `heapq.merge` (k-way merge) and paged with a keyset cursor on
+`(start_time, id)`, so a page costs one bounded query per source and no COUNT. A movie night found in
+several sources is kept once; if that leaves the page short while a source may have more rows, the
+sources are read again past the rows already merged.
+"""
+
+import base64
+import heapq
+from datetime import datetime
+from django.db.models import Q
+from apps.movies.models import MovieNight, MovieNightInvitation
+
+AGENDA_ROLES = ("creator", "attending", "invited")
+
+
+def encode_cursor(movie_night):
+    raw = f"{movie_night.start_time.isoformat()}|{movie_night.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Return the `(start_time, id)` position encoded in `cursor`. Raises ValueError if it is malformed.
+    """
+    try:
+        start_time, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(start_time), int(pk)
+    except (TypeError, UnicodeDecodeError, ValueError) as e:
+        raise ValueError("Invalid cursor.") from e
+
+
+def _after(position, prefix=""):
+    """Keyset condition `(start_time, id) > position` on `prefix` fields."""
+    start_time, pk = position
+    return Q(**{f"{prefix}start_time__gt": start_time}) | Q(
+        **{f"{prefix}start_time": start_time, f"{prefix}id__gt": pk}
+    )
+
+
+def _created(user, position, start_from, limit):
+    queryset = MovieNight.objects.filter(creator=user).select_related("movie", "creator")
+    if start_from:
+        queryset = queryset.filter(start_time__gte=start_from)
+    if position:
+        queryset = queryset.filter(_after(position))
+    for movie_night in queryset.order_by("start_time", "id")[:limit]:
+        movie_night.agenda_role = "creator"
+        movie_night.invitation_id = None
+        yield movie_night
+
+
+def _invited(user, role, position, start_from, limit):
+    queryset = MovieNightInvitation.objects.filter(invitee=user).select_related(
+        "movie_night__movie", "movie_night__creator"
+    )
+    if role == "attending":
+        queryset = queryset.filter(attendance_confirmed=True, is_attending=True)
+    else:
+        queryset = queryset.filter(attendance_confirmed=False)
+    if start_from:
+        queryset = queryset.filter(movie_night__start_time__gte=start_from)
+    if position:
+        queryset = queryset.filter(_after(position, prefix="movie_night__"))
+    for invitation in queryset.order_by("movie_night__start_time", "movie_night_id")[:limit]:
+        movie_night = invitation.movie_night
+        movie_night.agenda_role = role
+        movie_night.invitation_id = invitation.pk
+        yield movie_night
+
+
+def _key(movie_night):
+    return movie_night.start_time, movie_night.pk
+
+
+def get_agenda_page(user, page_size, cursor=None, start_from=None):
+    """
+    Return `(movie_nights, next_cursor)` for one page of the user's agenda ordered by start time.
+    Each movie night carries `agenda_role` and `invitation_id` attributes. `next_cursor` is None on the last page.
+    """
+    position = decode_cursor(cursor) if cursor else None
+    # One extra row tells whether there is a next page
+    limit = page_size + 1
+
+    page, seen = [], set()
+    while True:
+        sources = [
+            list(_created(user, position, start_from, limit)),
+            list(_invited(user, "attending", position, start_from, limit)),
+            list(_invited(user, "invited", position, start_from, limit)),
+        ]
+        # A source cut at `limit` rows may have more past its last row: the merge is complete only up to
+        # the earliest such row
+        cut = [_key(rows[-1]) for rows in sources if len(rows) == limit]
+        horizon = min(cut) if cut else None
+        for movie_night in heapq.merge(*sources, key=_key):
+            if horizon is not None and _key(movie_night) > horizon:
+                break
+            # Keep the first role if a night shows up in several sources
+            if movie_night.pk in seen:
+                continue
+            seen.add(movie_night.pk)
+            page.append(movie_night)
+            if len(page) == limit:
+                break
+        if len(page) == limit or horizon is None:
+            break
+        position = horizon
+
+    if len(page) > page_size:
+        page = page[:page_size]
+        return page, encode_cursor(page[-1])
+    return page, None
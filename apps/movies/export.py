@@ -0,0 +1,95 @@
+"""
+Streaming export of the Movie catalog with genres, as NDJSON or CSV.
+
+Rows are read with a server-side cursor (`.iterator(chunk_size=...)`), genres are prefetched once per
+chunk, and every format is produced by generators, so memory stays constant whatever the catalog size.
+Used by `MovieExportView` and the `export_catalog` management command.
+"""
+
+import csv
+import json
+import zlib
+from django.db.models import Prefetch
+from apps.movies.models import Movie, Genre
+
+EXPORT_FIELDS = [
+    "id",
+    "imdb_id",
+    "title",
+    "year",
+    "runtime_minutes",
+    "plot",
+    "country",
+    "imdb_rating",
+    "url_poster",
+    "is_full_record",
+    "genres",
+]
+EXPORT_CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def iter_catalog(chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield every movie as a dict of `EXPORT_FIELDS`, genres as a list of names.
+    """
+    movies = (
+        Movie.objects.order_by("pk")
+        .prefetch_related(Prefetch("genres", queryset=Genre.objects.only("name")))
+        .iterator(chunk_size=chunk_size)
+    )
+    for movie in movies:
+        row = {field: getattr(movie, field) for field in EXPORT_FIELDS if field != "genres"}
+        row["genres"] = [genre.name for genre in movie.genres.all()]
+        yield row
+
+
+def render_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row) + "\n"
+
+
+class _Echo:
+    """File-like object whose `write` returns the value, so `csv.writer` can feed a generator."""
+
+    def write(self, value):
+        return value
+
+
+def render_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        row["genres"] = "|".join(row["genres"])
+        yield writer.writerow([row[field] for field in EXPORT_FIELDS])
+
+
+RENDERERS = {
+    "ndjson": render_ndjson,
+    "csv": render_csv,
+}
+
+
+def gzip_stream(chunks):
+    """
+    Compress a stream of text chunks into a gzip stream without buffering it.
+    """
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_catalog(export_format, use_gzip=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Return a generator of the catalog rendered in `export_format`: str chunks, or bytes if gzipped.
+    """
+    chunks = RENDERERS[export_format](iter_catalog(chunk_size=chunk_size))
+    if use_gzip:
+        return gzip_stream(chunks)
+    return chunks
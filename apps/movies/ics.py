@@ -0,0 +1,164 @@
+"""
+Per-user ICS calendar feed of movie nights.
+
+The feed lists the movie nights a user created or accepted an invitation to. Calendar apps poll it
+often, so each user has a change counter in the cache, bumped by the movie night and invitation
+signals once their transaction commits:
+
+- The counter gives a strong ETag and its bump time the `Last-Modified` header, so a poll with a
+  matching `If-None-Match` is answered with 304 without touching the database.
+- The rendered feed is cached under the counter value, so it is built again only after a change.
+- Filling in the details of a movie from OMDb bumps the counters of everyone whose feed lists a movie
+  night of that movie, since its title and runtime give the SUMMARY and DTEND of the events.
+
+Calendar apps cannot send our auth headers, so the feed URL carries a signed token of the user id.
+"""
+
+import time
+from datetime import timezone as dt_timezone
+from django.core import signing
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+from apps.movies.models import MovieNight, MovieNightInvitation, compute_end_time
+
+FEED_TOKEN_SALT = "movies.ics.feed"
+FEED_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def feed_token(user):
+    return signing.Signer(salt=FEED_TOKEN_SALT).sign(str(user.pk))
+
+
+def user_id_from_token(token):
+    """
+    Return the user id signed in `token`, or None if the token is invalid.
+    """
+    try:
+        return int(signing.Signer(salt=FEED_TOKEN_SALT).unsign(token))
+    except (signing.BadSignature, ValueError):
+        return None
+
+
+def _version_key(user_id):
+    return f"ics_version:{user_id}"
+
+
+def _modified_key(user_id):
+    return f"ics_modified:{user_id}"
+
+
+def bump_version(user_ids):
+    """
+    Mark the feeds of `user_ids` as changed.
+    """
+    user_ids = set(user_ids)
+    now = timezone.now()
+    for user_id in user_ids:
+        # Counters start from the current time in milliseconds, so a counter lost from the cache
+        # never restarts at a value (and ETag) that was already served
+        cache.add(_version_key(user_id), int(time.time() * 1000), timeout=None)
+        cache.incr(_version_key(user_id))
+    cache.set_many({_modified_key(user_id): now for user_id in user_ids}, timeout=None)
+
+
+def bump_movie_versions(movie_id):
+    """
+    Mark as changed the feeds listing a movie night of `movie_id`: those of its creators and attending
+    invitees. Called when the title or runtime of the movie changes, which the feed shows.
+    """
+    user_ids = set(MovieNight.objects.filter(movie_id=movie_id).values_list("creator_id", flat=True))
+    user_ids.update(
+        MovieNightInvitation.objects.filter(movie_night__movie_id=movie_id, is_attending=True)
+        .values_list("invitee_id", flat=True)
+    )
+    if user_ids:
+        bump_version(user_ids)
+
+
+def get_version(user_id):
+    """
+    Return `(counter, last_modified)` of the user's feed. A counter lost from the cache is started
+    again, which only costs one rebuild of the feed.
+    """
+    values = cache.get_many([_version_key(user_id), _modified_key(user_id)])
+    counter = values.get(_version_key(user_id))
+    modified = values.get(_modified_key(user_id))
+    if counter is None or modified is None:
+        bump_version([user_id])
+        values = cache.get_many([_version_key(user_id), _modified_key(user_id)])
+        counter, modified = values[_version_key(user_id)], values[_modified_key(user_id)]
+    return counter, modified
+
+
+def _escape(text):
+    return (
+        str(text).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+    )
+
+
+def _fold(line):
+    """Fold a content line into chunks of at most 75 octets, as required by RFC 5545."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line
+    chunks, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Never split a multi-byte character
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1
+        chunks.append(encoded[start:end].decode("utf-8"))
+        start, limit = end, 74  # Continuation lines start with a space
+    return "\r\n ".join(chunks)
+
+
+def _format_datetime(value):
+    return value.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def render_feed(user_id, last_modified):
+    """
+    Render the ICS feed of the movie nights `user_id` created or is attending.
+    """
+    movie_nights = (
+        MovieNight.objects.filter(
+            Q(creator_id=user_id) | Q(invites__invitee_id=user_id, invites__is_attending=True)
+        )
+        .select_related("movie", "creator")
+        .distinct()
+        .order_by("start_time", "pk")
+    )
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//MovieNight//Movie nights//EN",
+        "CALSCALE:GREGORIAN",
+        "X-WR-CALNAME:Movie nights",
+    ]
+    for movie_night in movie_nights:
+        end_time = movie_night.end_time or compute_end_time(movie_night.start_time, movie_night.movie)
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:movienight-{movie_night.pk}@movienight",
+            f"DTSTAMP:{_format_datetime(last_modified)}",
+            f"DTSTART:{_format_datetime(movie_night.start_time)}",
+            f"DTEND:{_format_datetime(end_time)}",
+            f"SUMMARY:{_escape(movie_night.movie.title)}",
+            f"DESCRIPTION:{_escape(f'Movie night hosted by {movie_night.creator.email}')}",
+            "END:VEVENT",
+        ]
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(_fold(line) for line in lines) + "\r\n"
+
+
+def get_feed(user_id, counter, last_modified):
+    """
+    Return the rendered feed for this counter value, from the cache when possible.
+    """
+    key = f"ics_feed:{user_id}:{counter}"
+    feed = cache.get(key)
+    if feed is None:
+        feed = render_feed(user_id, last_modified)
+        cache.set(key, feed, timeout=FEED_CACHE_TIMEOUT)
+    return feed
@@ -0,0 +1,43 @@
+"""
+Set-based invitation of a whole chat group to a movie night.
+
+`invite_chat_group` inserts one invitation per `Membership` of a `ChatGroup` with a single
+`INSERT ... SELECT` statement, so the database does the work whatever the size of the group:
+members already invited and the movie night creator are excluded in SQL, and `ON CONFLICT DO NOTHING`
+covers invitations created concurrently. The pending counter of the movie night is raised by the number
+of new invitations, and their ids are returned so the caller can queue one batched notification task for
+all of them.
+"""
+
+from django.db import connection
+from apps.chat.models import Membership
+from apps.movies.models import MovieNight, MovieNightInvitation
+
+
+def invite_chat_group(movie_night, chat_group):
+    """
+    Invite every member of `chat_group` to `movie_night`, except the creator and users already invited.
+    Returns the ids of the created invitations.
+    """
+    invitation_table = connection.ops.quote_name(MovieNightInvitation._meta.db_table)
+    membership_table = connection.ops.quote_name(Membership._meta.db_table)
+    sql = f"""
+        INSERT INTO {invitation_table} (movie_night_id, invitee_id, attendance_confirmed, is_attending)
+        SELECT %s, membership.user_id, %s, %s
+        FROM {membership_table} AS membership
+        WHERE membership.chat_group_id = %s
+          AND membership.user_id <> %s
+          AND NOT EXISTS (
+              SELECT 1 FROM {invitation_table} AS invitation
+              WHERE invitation.movie_night_id = %s AND invitation.invitee_id = membership.user_id
+          )
+        ON CONFLICT (invitee_id, movie_night_id) DO NOTHING
+        RETURNING id
+    """
+    params = [movie_night.pk, False, False, chat_group.pk, movie_night.creator_id, movie_night.pk]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        invitation_ids = [row[0] for row in cursor.fetchall()]
+    # The INSERT bypasses the invitation signals, so the pending counter is updated here
+    MovieNight.adjust_rsvp_counts(movie_night.pk, pending=len(invitation_ids))
+    return invitation_ids
@@ -0,0 +1,34 @@
+"""
+Request-scoped lookups of movie night invitations.
+
+The movie night detail endpoint needs the invitations of one movie night three times: in
+`MovieNightDetailPermission` to let invitees read it, in the view for the user's `invitation_status`,
+and in `MovieNightDetailSerializer` for the participant and pending invitee lists. `get_invitations`
+loads them once with their invitees and keeps them on the request, so every later lookup in the same
+request is answered from memory.
+"""
+
+from apps.movies.models import MovieNightInvitation
+
+
+def get_invitations(request, movie_night):
+    """
+    Return the invitations of `movie_night` with their invitees, loaded at most once per request.
+    """
+    # Kept in the instance dict, so it never falls through to attributes proxied by the request
+    cache = vars(request).setdefault("_movie_night_invitations", {})
+    if movie_night.pk not in cache:
+        cache[movie_night.pk] = list(
+            MovieNightInvitation.objects.filter(movie_night=movie_night).select_related("invitee").order_by("pk")
+        )
+    return cache[movie_night.pk]
+
+
+def get_user_invitation(request, movie_night):
+    """
+    Return the requesting user's invitation to `movie_night`, or None if they were not invited.
+    """
+    return next(
+        (invitation for invitation in get_invitations(request, movie_night) if invitation.invitee_id == request.user.pk),
+        None,
+    )
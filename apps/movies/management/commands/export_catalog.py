@@ -0,0 +1,39 @@
+"""
+Export the full Movie catalog with genres as NDJSON or CSV.
+
+Examples:
+    python manage.py export_catalog --format csv --output movies.csv
+    python manage.py export_catalog --format ndjson --gzip --output movies.ndjson.gz
+"""
+
+import sys
+from django.core.management.base import BaseCommand
+from apps.movies.export import stream_catalog, RENDERERS, DEFAULT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = "Stream the Movie catalog with genres to a file or stdout as NDJSON or CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=RENDERERS.keys(), default="ndjson", help="Output format.")
+        parser.add_argument("--gzip", action="store_true", help="Gzip the output.")
+        parser.add_argument("--output", help="Output file path. Defaults to stdout.")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows fetched per database round trip.")
+
+    def handle(self, *args, **options):
+        chunks = stream_catalog(options["format"], use_gzip=options["gzip"], chunk_size=options["chunk_size"])
+
+        if options["output"]:
+            mode = "wb" if options["gzip"] else "w"
+            encoding = None if options["gzip"] else "utf-8"
+            with open(options["output"], mode, encoding=encoding, newline="" if encoding else None) as output:
+                for chunk in chunks:
+                    output.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f"Catalog exported to {options['output']}"))
+        elif options["gzip"]:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
@@ -0,0 +1,29 @@
+"""
+Recompute the RSVP counters of movie nights from their invitations.
+
+The counters are kept up to date on every invitation change; this repairs drift after manual database
+edits or writes that bypassed the model layer.
+
+Examples:
+    python manage.py repair_rsvp_counts
+    python manage.py repair_rsvp_counts --movie-night 42
+"""
+
+from django.core.management.base import BaseCommand
+from apps.movies.models import MovieNight
+
+
+class Command(BaseCommand):
+    help = "Recompute the attending, declined and pending counters of movie nights from their invitations."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--movie-night", type=int, action="append", help="Only repair this movie night. Repeatable.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Movie nights updated per UPDATE statement.")
+
+    def handle(self, *args, **options):
+        queryset = MovieNight.objects.all()
+        if options["movie_night"]:
+            queryset = queryset.filter(pk__in=options["movie_night"])
+
+        repaired = MovieNight.recompute_rsvp_counts(queryset, batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Repaired the RSVP counters of {repaired} movie night(s)."))
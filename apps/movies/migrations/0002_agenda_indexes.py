@@ -0,0 +1,21 @@
+# Generated by Django 4.2.16 on 2026-10-19 16:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='movienight',
+            index=models.Index(fields=['creator', 'start_time', 'id'], name='movienight_creator_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movienightinvitation',
+            index=models.Index(fields=['invitee', 'attendance_confirmed', 'is_attending'], name='invitation_invitee_status_idx'),
+        ),
+    ]
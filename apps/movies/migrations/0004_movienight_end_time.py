@@ -0,0 +1,51 @@
+# Generated by Django 4.2.16 on 2026-10-19 17:23
+
+from datetime import timedelta
+from django.db import migrations, models
+
+DEFAULT_MOVIE_NIGHT_DURATION = timedelta(hours=2)
+MAX_MOVIE_NIGHT_DURATION = timedelta(hours=12)
+
+
+def fill_end_times(apps, schema_editor):
+    MovieNight = apps.get_model("movies", "MovieNight")
+    runtimes = (
+        MovieNight.objects.values_list("movie_id", "movie__runtime_minutes").distinct()
+    )
+    for movie_id, runtime_minutes in runtimes:
+        if runtime_minutes:
+            duration = min(timedelta(minutes=runtime_minutes), MAX_MOVIE_NIGHT_DURATION)
+        else:
+            duration = DEFAULT_MOVIE_NIGHT_DURATION
+        MovieNight.objects.filter(movie_id=movie_id).update(end_time=models.F("start_time") + duration)
+
+
+def create_span_index(apps, schema_editor):
+    # GiST index over the movie night time span, used by the overlap checks on PostgreSQL only
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS movienight_span_gist ON movies_movienight "
+            "USING gist (tstzrange(start_time, end_time))"
+        )
+
+
+def drop_span_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS movienight_span_gist")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0003_outboxevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movienight',
+            name='end_time',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(fill_end_times, migrations.RunPython.noop),
+        migrations.RunPython(create_span_index, drop_span_index),
+    ]
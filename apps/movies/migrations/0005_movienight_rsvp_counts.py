@@ -0,0 +1,55 @@
+# Generated by Django 4.2.16 on 2026-10-19 17:38
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+RSVP_COUNTS = {
+    "attending_count": Q(attendance_confirmed=True, is_attending=True),
+    "declined_count": Q(attendance_confirmed=True, is_attending=False),
+    "pending_count": Q(attendance_confirmed=False),
+}
+
+
+def fill_rsvp_counts(apps, schema_editor):
+    MovieNight = apps.get_model("movies", "MovieNight")
+    MovieNightInvitation = apps.get_model("movies", "MovieNightInvitation")
+    MovieNight.objects.update(**{
+        field: Coalesce(
+            Subquery(
+                MovieNightInvitation.objects.filter(condition, movie_night=OuterRef("pk"))
+                .order_by()
+                .values("movie_night")
+                .annotate(count=Count("pk"))
+                .values("count")
+            ),
+            0,
+        )
+        for field, condition in RSVP_COUNTS.items()
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0004_movienight_end_time'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movienight',
+            name='attending_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='movienight',
+            name='declined_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='movienight',
+            name='pending_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_rsvp_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.16 on 2026-10-19 17:45
+
+import datetime
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('movies', '0005_movienight_rsvp_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovieNightSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_time', models.DateTimeField()),
+                ('rrule', models.TextField()),
+                ('ends_at', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('start_notification_before', models.DurationField(default=datetime.timedelta(0))),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name_plural': 'movie night series',
+                'ordering': ['creator', 'start_time'],
+            },
+        ),
+        migrations.AddField(
+            model_name='movienight',
+            name='series_occurrence',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='movienightseries',
+            name='creator',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movie_night_series', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='movienightseries',
+            name='invitees',
+            field=models.ManyToManyField(blank=True, related_name='invited_movie_night_series', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='movienightseries',
+            name='movie',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='movies.movie'),
+        ),
+        migrations.AddField(
+            model_name='movienight',
+            name='series',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='movie_nights', to='movies.movienightseries'),
+        ),
+        migrations.AddIndex(
+            model_name='movienightseries',
+            index=models.Index(fields=['ends_at', 'start_time'], name='series_active_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='movienight',
+            constraint=models.UniqueConstraint(fields=('series', 'series_occurrence'), name='movienight_series_occurrence_unique'),
+        ),
+    ]
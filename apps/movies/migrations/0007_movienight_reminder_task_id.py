@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-19 17:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0006_movienightseries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movienight',
+            name='reminder_task_id',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.16 on 2026-10-19 18:00
+
+from django.db import migrations, models
+from django.utils import timezone
+import django.db.models.deletion
+
+BATCH_SIZE = 1000
+# Pending outbox calls of the tasks that scheduled and revoked the per-movie-night ETA task
+REMOVED_TASKS = [
+    "apps.movies.tasks.schedule_start_notification",
+    "apps.movies.tasks.revoke_start_notification",
+]
+
+
+def create_reminders(apps, schema_editor):
+    """
+    Give every movie night the reminder it had: `start_notification_before` its start, sent if the
+    start notification was sent or already past.
+    """
+    MovieNight = apps.get_model("movies", "MovieNight")
+    MovieNightReminder = apps.get_model("movies", "MovieNightReminder")
+    OutboxEvent = apps.get_model("movies", "OutboxEvent")
+    now = timezone.now()
+    reminders = []
+    rows = MovieNight.objects.values_list("pk", "start_time", "start_notification_before", "start_notification_sent")
+    for pk, start_time, offset, sent in rows.iterator(chunk_size=BATCH_SIZE):
+        fire_at = start_time - offset
+        reminders.append(MovieNightReminder(
+            movie_night_id=pk, offset=offset, fire_at=fire_at, sent_at=now if sent or fire_at <= now else None
+        ))
+        if len(reminders) == BATCH_SIZE:
+            MovieNightReminder.objects.bulk_create(reminders)
+            reminders = []
+    MovieNightReminder.objects.bulk_create(reminders)
+    OutboxEvent.objects.filter(task_name__in=REMOVED_TASKS).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0007_movienight_reminder_task_id'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='movienight',
+            name='reminder_task_id',
+        ),
+        migrations.CreateModel(
+            name='MovieNightReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('offset', models.DurationField()),
+                ('fire_at', models.DateTimeField()),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('movie_night', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='movies.movienight')),
+            ],
+            options={
+                'ordering': ['fire_at'],
+                'indexes': [models.Index(condition=models.Q(('sent_at__isnull', True)), fields=['fire_at'], name='reminder_due_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='movienightreminder',
+            constraint=models.UniqueConstraint(fields=('movie_night', 'offset'), name='reminder_movie_night_offset_unique'),
+        ),
+        migrations.RunPython(create_reminders, migrations.RunPython.noop),
+    ]
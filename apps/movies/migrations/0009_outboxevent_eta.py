@@ -0,0 +1,38 @@
+# Generated by Django 4.2.16 on 2026-10-19 19:31
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+SEND_REMINDER_TASK = "apps.movies.tasks.send_reminder"
+
+
+def arm_reminders(apps, schema_editor):
+    """
+    Queue one ETA task per reminder still to send, now that reminders are no longer found by the beat scan.
+    """
+    MovieNightReminder = apps.get_model("movies", "MovieNightReminder")
+    OutboxEvent = apps.get_model("movies", "OutboxEvent")
+    events = []
+    rows = MovieNightReminder.objects.filter(sent_at__isnull=True).values_list("pk", "fire_at")
+    for pk, fire_at in rows.iterator(chunk_size=BATCH_SIZE):
+        events.append(OutboxEvent(task_name=SEND_REMINDER_TASK, args=[pk], eta=fire_at))
+        if len(events) == BATCH_SIZE:
+            OutboxEvent.objects.bulk_create(events)
+            events = []
+    OutboxEvent.objects.bulk_create(events)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0008_movienightreminder'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxevent',
+            name='eta',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(arm_reminders, migrations.RunPython.noop),
+    ]
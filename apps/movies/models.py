@@ -5,14 +5,100 @@ Each model includes methods to handle business logic, including saving data, and
 """
 
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, FilteredRelation, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.contenttypes.fields import GenericRelation
 from datetime import timedelta
 from apps.notifications.models import Notification
 from django.contrib.contenttypes.models import ContentType
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from apps.movies import recurrence
 UserModel = get_user_model()
 
 
+class FieldTrackerMixin(models.Model):
+    """
+    Abstract model that remembers the database values of `tracked_fields`, so `pre_save` handlers
+    can tell what changed without re-reading the row.
+
+    Values are snapshotted when the instance is loaded from the database and after each save.
+    If a tracked field was not loaded (deferred) or the instance was built by hand with a primary key,
+    the snapshot is read from the database once, on the first call that needs it.
+    """
+    tracked_fields = ()
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # `field_names` are attnames; deferred fields are absent and loaded lazily by `previous`
+        loaded = dict(zip(field_names, values))
+        instance._snapshot = {
+            field: loaded[cls._meta.get_field(field).attname]
+            for field in cls.tracked_fields
+            if cls._meta.get_field(field).attname in loaded
+        }
+        return instance
+
+    def _snapshot_fields(self, fields):
+        snapshot = self.__dict__.setdefault("_snapshot", {})
+        for field in fields:
+            snapshot[field] = getattr(self, self._meta.get_field(field).attname)
+
+    def previous(self, field):
+        """
+        Return the value `field` has in the database, or None if the instance was never saved.
+        """
+        if field not in self.tracked_fields:
+            raise ValueError(f"'{field}' is not tracked on {type(self).__name__}.")
+        if self._state.adding:
+            return None
+        snapshot = self.__dict__.setdefault("_snapshot", {})
+        if field not in snapshot:
+            missing = [name for name in self.tracked_fields if name not in snapshot]
+            attnames = [self._meta.get_field(name).attname for name in missing]
+            row = type(self)._base_manager.filter(pk=self.pk).values(*attnames).first() or {}
+            snapshot.update({name: row.get(attname) for name, attname in zip(missing, attnames)})
+        return snapshot[field]
+
+    def has_changed(self, field):
+        """
+        Return True if `field` differs from its value in the database. Always False for unsaved instances.
+        """
+        if self._state.adding:
+            return False
+        return self.previous(field) != getattr(self, self._meta.get_field(field).attname)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get("update_fields")
+        self._snapshot_fields(
+            [field for field in self.tracked_fields if update_fields is None or field in update_fields]
+        )
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        self._snapshot_fields([field for field in self.tracked_fields if fields is None or field in fields])
+
+
+class AtomicSaveMixin(models.Model):
+    """
+    Abstract model whose `save` runs in a transaction, so the outbox events written by its
+    `pre_save`/`post_save` handlers are committed or rolled back together with the row.
+    """
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
 class Genre(models.Model):
     """
     Genre model represents movie genres. Each genre name is unique and lowercased.
@@ -89,48 +175,381 @@ class Movie(models.Model):
         return f"{self.title} ({self.year})"
 
 
-class MovieNight(models.Model):
+# Length of a movie night whose movie runtime is unknown
+DEFAULT_MOVIE_NIGHT_DURATION = timedelta(hours=2)
+# Upper bound of a movie night's length, which bounds the range scans of the overlap checks
+MAX_MOVIE_NIGHT_DURATION = timedelta(hours=12)
+
+
+def compute_end_time(start_time, movie):
+    """
+    Returns the end time of a movie night starting at `start_time` for `movie`, from the movie runtime.
+    """
+    if not movie.runtime_minutes:
+        return start_time + DEFAULT_MOVIE_NIGHT_DURATION
+    return start_time + min(timedelta(minutes=movie.runtime_minutes), MAX_MOVIE_NIGHT_DURATION)
+
+
+# Denormalized RSVP counter of MovieNight for each invitation status
+RSVP_COUNT_FIELDS = {
+    "attending": "attending_count",
+    "declined": "declined_count",
+    "pending": "pending_count",
+}
+# Invitation filter of each status, for recomputing the counters
+RSVP_STATUS_FILTERS = {
+    "attending": Q(attendance_confirmed=True, is_attending=True),
+    "declined": Q(attendance_confirmed=True, is_attending=False),
+    "pending": Q(attendance_confirmed=False),
+}
+
+
+def rsvp_status(attendance_confirmed, is_attending):
+    """
+    Returns the RSVP status, a key of `RSVP_COUNT_FIELDS`, of an invitation with these values.
+    """
+    if not attendance_confirmed:
+        return "pending"
+    return "attending" if is_attending else "declined"
+
+
+# How late an occurrence that already started is still stored, so its reminder is sent
+SERIES_REMINDER_GRACE = timedelta(minutes=10)
+
+
+class MovieNightSeries(models.Model):
+    """
+    MovieNightSeries model represents a recurring movie night, such as a weekly club. Occurrences are
+    expanded from `rrule` within the requested window; an occurrence is stored as a MovieNight only
+    once someone RSVPs to it or its start notification is due.
+    """
+    class Meta:
+        ordering = ["creator", "start_time"]
+        verbose_name_plural = "movie night series"
+        indexes = [
+            models.Index(fields=["ends_at", "start_time"], name="series_active_idx"),  # Reminder scan of running series
+        ]
+
+    movie = models.ForeignKey(Movie, on_delete=models.PROTECT)
+    creator = models.ForeignKey(UserModel, on_delete=models.CASCADE, related_name="movie_night_series")
+    invitees = models.ManyToManyField(UserModel, related_name="invited_movie_night_series", blank=True)  # Users who can RSVP to occurrences
+    start_time = models.DateTimeField()  # First occurrence; later ones keep its local time of day
+    rrule = models.TextField()  # Recurrence rule, in the RRULE subset of `apps.movies.recurrence`
+    ends_at = models.DateTimeField(null=True, blank=True, editable=False)  # Start of the last occurrence, null if open-ended
+    start_notification_before = models.DurationField(default=timedelta(minutes=0))  # Copied to every occurrence
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        """
+        Returns a string representation of the series, including the movie and the rule.
+        """
+        return f"{self.movie} ({self.rrule})"
+
+    def save(self, *args, **kwargs):
+        """
+        Stores the start of the last occurrence, so ended series are left out of the reminder scan.
+        """
+        self.ends_at = recurrence.last_occurrence(self.rrule, self.start_time)
+        super().save(*args, **kwargs)
+
+    def occurrences(self, window_start, window_end):
+        """
+        Yields the start times of the occurrences in `[window_start, window_end)`, without touching the database.
+        """
+        return recurrence.occurrences(self.rrule, self.start_time, window_start, window_end)
+
+    def is_occurrence(self, value):
+        """
+        Returns True if an occurrence of the series starts at `value`.
+        """
+        return recurrence.is_occurrence(self.rrule, self.start_time, value)
+
+    def materialize(self, occurrence):
+        """
+        Returns the MovieNight of the occurrence starting at `occurrence`, creating it on first use.
+        """
+        movie_night, created = MovieNight.objects.get_or_create(
+            series=self,
+            series_occurrence=occurrence,
+            defaults={
+                "movie": self.movie,
+                "creator": self.creator,
+                "start_time": occurrence,
+                "start_notification_before": self.start_notification_before,
+            },
+        )
+        return movie_night
+
+    @classmethod
+    def materialize_due(cls, now=None, lookahead=timedelta(0)):
+        """
+        Creates the MovieNight of every occurrence whose start notification is due within `lookahead`,
+        so its reminder gets scheduled. Only running series are expanded. Returns the number of movie nights created.
+        """
+        now = now or timezone.now()
+        running = cls.objects.filter(
+            Q(ends_at__isnull=True) | Q(ends_at__gte=now - SERIES_REMINDER_GRACE),
+            start_time__lt=now + lookahead + F("start_notification_before"),
+        ).select_related("movie", "creator")
+        created = 0
+        for series in running:
+            due = series.occurrences(now - SERIES_REMINDER_GRACE, now + lookahead + series.start_notification_before)
+            existing = set(
+                series.movie_nights.filter(series_occurrence__gte=now - SERIES_REMINDER_GRACE)
+                .values_list("series_occurrence", flat=True)
+            )
+            for occurrence in due:
+                if occurrence not in existing:
+                    series.materialize(occurrence)
+                    created += 1
+        return created
+
+
+class MovieNight(FieldTrackerMixin, AtomicSaveMixin, models.Model):
     """
     MovieNight model represents a scheduled movie night event. It includes details about
     the movie being watched, the start time, and notifications that are sent to participants.
     """
+    tracked_fields = ("start_time", "movie", "start_notification_before")
+    # Columns written with targeted UPDATEs only, so a stale instance never overwrites them on save
+    save_excluded_fields = tuple(RSVP_COUNT_FIELDS.values())
+
     class Meta:
         ordering = ["creator", "start_time"]
+        indexes = [
+            models.Index(fields=["creator", "start_time", "id"], name="movienight_creator_start_idx"),  # Agenda / "my movie nights" range scans
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["series", "series_occurrence"], name="movienight_series_occurrence_unique"),
+        ]
 
     movie = models.ForeignKey(Movie, on_delete=models.PROTECT)  # Protects the movie from being deleted if associated with a movie night
     start_time = models.DateTimeField()
+    end_time = models.DateTimeField(null=True, blank=True, editable=False)  # Computed from start_time and the movie runtime on save
     creator = models.ForeignKey(UserModel, on_delete=models.CASCADE)  # The user who created the movie night
     start_notification_sent = models.BooleanField(default=False)  # Whether the notification for the event start was sent
     start_notification_before = models.DurationField(default=timedelta(minutes=0))  # Time before the event to send notifications
     notifications = GenericRelation(Notification)  # Links notifications related to the movie night
+    series = models.ForeignKey(MovieNightSeries, on_delete=models.SET_NULL, null=True, blank=True, related_name="movie_nights")  # Set on occurrences of a series
+    series_occurrence = models.DateTimeField(null=True, blank=True, editable=False)  # Start of the occurrence in the series rule, kept if the night is moved
+    # RSVP counters, maintained with F() updates by the invitation signals and the bulk invitation paths
+    attending_count = models.PositiveIntegerField(default=0, editable=False)
+    declined_count = models.PositiveIntegerField(default=0, editable=False)
+    pending_count = models.PositiveIntegerField(default=0, editable=False)
+
+    def save(self, *args, **kwargs):
+        """
+        Stores the end time computed from the start time and the movie runtime, for the overlap checks.
+        Updates never write `save_excluded_fields`, whose in-memory values may be stale.
+        """
+        if self.end_time is None or self.has_changed("start_time") or self.has_changed("movie"):
+            self.end_time = compute_end_time(self.start_time, self.movie)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None and not self._state.adding and not kwargs.get("force_insert"):
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname not in deferred
+                and field.name not in self.save_excluded_fields
+            ]
+        elif update_fields is not None and "end_time" not in update_fields:
+            kwargs["update_fields"] = [*update_fields, "end_time"]
+        super().save(*args, **kwargs)
 
     @property
-    def end_time(self):
+    def reminder_offsets(self):
         """
-        Calculates and returns the end time of the movie night based on the runtime of the movie.
-        If the movie runtime is not set, it returns None.
+        Returns the offsets of the reminder schedule, earliest reminder first.
+        Uses the `reminders` prefetch when the queryset provides it.
         """
-        if not self.movie.runtime_minutes:
-            return None
-        return self.start_time + timedelta(minutes=self.movie.runtime_minutes)
+        return sorted((reminder.offset for reminder in self.reminders.all()), reverse=True)
+
+    def set_reminders(self, offsets, now=None):
+        """
+        Replaces the reminder schedule with `offsets`, keeping the state of the reminders that stay.
+        The new reminders still to send are armed.
+        """
+        now = now or timezone.now()
+        offsets = set(offsets)
+        with transaction.atomic():
+            self.reminders.exclude(offset__in=offsets).delete()
+            existing = set(self.reminders.values_list("offset", flat=True))
+            reminders = MovieNightReminder.objects.bulk_create([
+                MovieNightReminder(movie_night=self, offset=offset).schedule(self.start_time, now)
+                for offset in offsets - existing
+            ])
+            MovieNightReminder.arm(reminders)
+
+    def reschedule_reminders(self, now=None):
+        """
+        Moves the reminders to the current start time. Reminders moved to an instant still to come are sent again,
+        so they are armed again; the calls armed for their previous instant find nothing to send.
+        """
+        now = now or timezone.now()
+        reminders = [reminder.schedule(self.start_time, now) for reminder in self.reminders.all()]
+        MovieNightReminder.objects.bulk_update(reminders, ["fire_at", "sent_at"])
+        MovieNightReminder.arm(reminders)
+
+    @classmethod
+    def adjust_rsvp_counts(cls, pk, **deltas):
+        """
+        Adds `deltas`, keyed by RSVP status, to the counters of movie night `pk` in one atomic UPDATE.
+        """
+        updates = {
+            RSVP_COUNT_FIELDS[status]: F(RSVP_COUNT_FIELDS[status]) + delta
+            for status, delta in deltas.items()
+            if delta
+        }
+        if updates:
+            cls.objects.filter(pk=pk).update(**updates)
+
+    @classmethod
+    def recompute_rsvp_counts(cls, queryset=None, batch_size=1000):
+        """
+        Recomputes the RSVP counters of the movie nights in `queryset` (all by default) from their
+        invitations, updating only the nights whose counters are wrong. Returns how many were fixed.
+        """
+        queryset = cls.objects.all() if queryset is None else queryset
+        actual = {
+            f"actual_{status}": Coalesce(
+                Subquery(
+                    MovieNightInvitation.objects.filter(condition, movie_night=OuterRef("pk"))
+                    .order_by()
+                    .values("movie_night")
+                    .annotate(count=Count("pk"))
+                    .values("count")
+                ),
+                0,
+            )
+            for status, condition in RSVP_STATUS_FILTERS.items()
+        }
+        mismatch = Q()
+        for status, field in RSVP_COUNT_FIELDS.items():
+            mismatch |= ~Q(**{field: F(f"actual_{status}")})
+        stale = list(queryset.alias(**actual).filter(mismatch).values_list("pk", flat=True))
+        for start in range(0, len(stale), batch_size):
+            cls.objects.filter(pk__in=stale[start:start + batch_size]).update(
+                **{field: actual[f"actual_{status}"] for status, field in RSVP_COUNT_FIELDS.items()}
+            )
+        return len(stale)
+
+    @classmethod
+    def refresh_end_times(cls, movie):
+        """
+        Recomputes the end time of every movie night of `movie` in one UPDATE, after its runtime changed.
+        """
+        if movie.runtime_minutes:
+            duration = min(timedelta(minutes=movie.runtime_minutes), MAX_MOVIE_NIGHT_DURATION)
+        else:
+            duration = DEFAULT_MOVIE_NIGHT_DURATION
+        cls.objects.filter(movie=movie).update(end_time=models.F("start_time") + duration)
 
     def __str__(self):
         """
         Returns a string representation of the movie night, including the movie and creator's email.
         """
         return f"{self.movie} by {self.creator.email}"
+    def snapshot(self):
+        """
+        Returns a JSON-serializable summary of the movie night for notification tasks: movie title,
+        start time (the in-memory value), creator and the ids of the attending invitees, read in one query.
+        Tasks built from it need no database reads, so they still work once the movie night is deleted.
+        """
+        rows = list(
+            MovieNight.objects.filter(pk=self.pk)
+            .annotate(attending=FilteredRelation("invites", condition=Q(invites__is_attending=True)))
+            .values_list("movie__title", "creator__email", "attending__invitee_id")
+        )
+        title, creator_email = rows[0][:2] if rows else (None, None)
+        return {
+            "id": self.pk,
+            "title": title,
+            "start_time": self.start_time,
+            "creator_id": self.creator_id,
+            "creator_email": creator_email,
+            "attendee_ids": [invitee_id for _, _, invitee_id in rows if invitee_id is not None],
+        }
+
     def delete(self, *args, **kwargs):
-        Notification.objects.filter(content_type=ContentType.objects.get_for_model(self), object_id=self.id).update(content_type=None, object_id=None)
-        super().delete(*args, **kwargs)
+        with transaction.atomic():
+            Notification.objects.filter(content_type=ContentType.objects.get_for_model(self), object_id=self.id).update(content_type=None, object_id=None)
+            super().delete(*args, **kwargs)
+
+# Most reminders a movie night can have
+MAX_REMINDERS = 5
+# How late a reminder is still sent; older unsent ones are skipped when scheduled
+REMINDER_GRACE = timedelta(minutes=10)
+# Task sending one reminder, called with an ETA at its `fire_at` through the outbox
+SEND_REMINDER_TASK = "apps.movies.tasks.send_reminder"
+
+
+class MovieNightReminder(models.Model):
+    """
+    MovieNightReminder model is one entry of the reminder schedule of a movie night: a start notification
+    sent `offset` before the movie night starts. Each unsent reminder is armed: a `send_reminder` call with
+    an ETA at `fire_at` is recorded in the outbox, and claims the reminder with `SELECT ... FOR UPDATE
+    SKIP LOCKED` when it runs (see `apps.movies.reminders`). The partial index on `fire_at` serves the
+    catch-up scan of reminders whose call was lost.
+    """
+    class Meta:
+        ordering = ["fire_at"]
+        constraints = [
+            models.UniqueConstraint(fields=["movie_night", "offset"], name="reminder_movie_night_offset_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["fire_at"], name="reminder_due_idx", condition=Q(sent_at__isnull=True)),  # Due reminders scan
+        ]
+
+    movie_night = models.ForeignKey(MovieNight, on_delete=models.CASCADE, related_name="reminders")
+    offset = models.DurationField()  # Time before the start of the movie night
+    fire_at = models.DateTimeField()  # Start time of the movie night minus `offset`
+    sent_at = models.DateTimeField(null=True, blank=True)  # When it was sent, or skipped for being already past
+
+    def __str__(self):
+        """
+        Returns a string representation of the reminder, including the movie night and the instant it fires.
+        """
+        return f"{self.movie_night_id} at {self.fire_at}"
+
+    def schedule(self, start_time, now):
+        """
+        Sets `fire_at` from `start_time`: an instant still to come is unsent, one past the grace period is skipped.
+        Returns the reminder, which is not saved.
+        """
+        self.fire_at = start_time - self.offset
+        if self.fire_at > now:
+            self.sent_at = None
+        elif self.fire_at < now - REMINDER_GRACE:
+            self.sent_at = self.sent_at or now
+        return self
+
+    @classmethod
+    def arm(cls, reminders):
+        """
+        Records in the outbox one `send_reminder` call with an ETA at `fire_at` for each unsent reminder
+        in `reminders`, which must be saved.
+        """
+        OutboxEvent.objects.bulk_create([
+            OutboxEvent(task_name=SEND_REMINDER_TASK, args=[reminder.pk], eta=reminder.fire_at)
+            for reminder in reminders
+            if reminder.sent_at is None
+        ])
+
 
-class MovieNightInvitation(models.Model):
+class MovieNightInvitation(FieldTrackerMixin, AtomicSaveMixin, models.Model):
     """
     MovieNightInvitation model represents an invitation sent to a user for a specific movie night.
     Each invitation is unique for a user and a movie night, and notifications can be generated
     based on the invitation status.
     """
+    tracked_fields = ("is_attending", "attendance_confirmed")
+
     class Meta:
         unique_together = [("invitee", "movie_night")]  # Ensures that the same invitee can't receive multiple invitations for the same movie night
+        indexes = [
+            models.Index(fields=["invitee", "attendance_confirmed", "is_attending"], name="invitation_invitee_status_idx"),  # Agenda / invitation lists per status
+        ]
 
     movie_night = models.ForeignKey(MovieNight, on_delete=models.CASCADE, related_name="invites", db_index=True)
     invitee = models.ForeignKey(UserModel, on_delete=models.CASCADE, db_index=True)  # The user invited to the movie night
@@ -143,6 +562,40 @@ class MovieNightInvitation(models.Model):
         Returns a string representation of the invitation, including the movie night and invitee's email.
         """
         return f"{self.movie_night} / {self.invitee.email}"
+
+    @property
+    def rsvp_status(self):
+        """
+        Returns the RSVP status of the invitation: `attending`, `declined` or `pending`.
+        """
+        return rsvp_status(self.attendance_confirmed, self.is_attending)
+
+    @property
+    def previous_rsvp_status(self):
+        """
+        Returns the RSVP status stored in the database, or None for an unsaved invitation.
+        """
+        if self._state.adding:
+            return None
+        return rsvp_status(self.previous("attendance_confirmed"), self.previous("is_attending"))
+
+
+class OutboxEvent(models.Model):
+    """
+    OutboxEvent model stores a Celery task call written in the same transaction as the change that caused it.
+    The `dispatch_outbox` task publishes pending events in order and deletes them once they are queued,
+    so tasks never run for rolled-back writes nor before the data they read is committed.
+    """
+    task_name = models.CharField(max_length=255)  # Registered name of the Celery task to call
+    args = models.JSONField(default=list, encoder=DjangoJSONEncoder)  # Positional arguments of the task
+    eta = models.DateTimeField(null=True, blank=True)  # When the task should run, as soon as queued if null
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        """
+        Returns a string representation of the event, including the task name and its arguments.
+        """
+        return f"{self.task_name}{tuple(self.args)}"
     
 
 """
@@ -4,12 +4,14 @@ Functions to interact with the OMDb API and manage movie-related data in the loc
 
 import logging 
 import re
-from apps.movies.models import Genre, SearchTerm, Movie
+from apps.movies.models import Genre, SearchTerm, Movie, MovieNight
 from apps.omdb.django_client import get_client_from_settings
 from apps.movies.serializers import MovieDetailSerializer
+from apps.movies import ics
 
 from datetime import timedelta
 
+from django.db import transaction
 from django.utils.timezone import now
 
 logger = logging.getLogger(__name__)
@@ -35,13 +37,18 @@ def fill_movie_details(movie):
         movie_details = omdb_client.get_by_imdb_id(movie.imdb_id)
     except Exception as e:
         logger.error(str(e))
+        return
 
     serializer = MovieDetailSerializer(instance=movie, data=movie_details.to_dict())
+    runtime_minutes, title = movie.runtime_minutes, movie.title
 
     if serializer.is_valid():
-        serializer.is_full_record = True
-        serializer.id = movie.id
-        serializer.save()
+        serializer.save(is_full_record=True)
+        if movie.runtime_minutes != runtime_minutes:
+            MovieNight.refresh_end_times(movie)
+        if movie.runtime_minutes != runtime_minutes or movie.title != title:
+            # The end times are updated without signals: the calendar feeds showing them are marked changed here
+            transaction.on_commit(lambda: ics.bump_movie_versions(movie.pk))
     else:
         logger.error("Failed to update movie details: %s", serializer.errors)
     
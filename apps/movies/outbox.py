@@ -0,0 +1,58 @@
+"""
+Transactional outbox for the Celery tasks triggered by movie night changes.
+
+`publish` records a task call as an `OutboxEvent` row in the current transaction instead of calling
+the broker, so the call is committed or rolled back together with the change that caused it and the
+request never waits on the broker. `dispatch_pending`, run by the periodic `dispatch_outbox` task,
+drains the table in primary key order, in batches, and deletes each event once its task is queued.
+Events with an `eta` (the armed reminders) are queued as ETA tasks to run at that instant.
+"""
+
+import logging
+from celery import current_app
+from django.db import transaction
+from apps.movies.models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_BATCH_SIZE = 500
+
+
+def publish(task, *args):
+    """
+    Record a call of `task` with `args` to be dispatched once the current transaction commits.
+    Arguments must be JSON serializable.
+    """
+    return OutboxEvent.objects.create(task_name=task.name, args=list(args))
+
+
+def dispatch_pending(batch_size=OUTBOX_BATCH_SIZE):
+    """
+    Queue the pending events in order, one batch per transaction, and return how many were queued.
+
+    Rows are locked with `SKIP LOCKED`, so concurrent dispatchers never queue the same event twice.
+    If the broker rejects an event, it and every later event of the batch stay in the outbox to keep
+    the order, and are retried on the next run.
+    """
+    dispatched = 0
+    while True:
+        with transaction.atomic():
+            events = list(
+                OutboxEvent.objects.select_for_update(skip_locked=True).order_by("pk")[:batch_size]
+            )
+            sent = []
+            for event in events:
+                try:
+                    task = current_app.tasks[event.task_name]
+                    if event.eta is None:
+                        task.delay(*event.args)
+                    else:
+                        task.apply_async(args=event.args, eta=event.eta)
+                except Exception as e:
+                    logger.error(f"Failed to dispatch outbox event {event.pk} ({event.task_name}): {str(e)}")
+                    break
+                sent.append(event.pk)
+            OutboxEvent.objects.filter(pk__in=sent).delete()
+        dispatched += len(sent)
+        if len(sent) < batch_size:
+            return dispatched
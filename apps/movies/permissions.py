@@ -1,6 +1,6 @@
 from rest_framework import permissions
 from apps.movies.models import MovieNightInvitation, MovieNight
-from django.db.models import Q
+from apps.movies.lookups import get_user_invitation
 
 class MovieNightDetailPermission(permissions.BasePermission):
     """
@@ -12,22 +12,17 @@ class MovieNightDetailPermission(permissions.BasePermission):
         # SAFE_METHODS are read-only methods (GET, HEAD, OPTIONS)
         if request.method in permissions.SAFE_METHODS:
             # Allow access if the user is the creator of the movie night
-            if obj.creator == request.user:
+            if obj.creator_id == request.user.pk:
                 return True
 
-            # Check if the user is a confirmed participant or a pending invitee
-            is_invited = MovieNightInvitation.objects.filter(
-                movie_night=obj, 
-                invitee=request.user
-            ).filter(
-                Q(attendance_confirmed=True, is_attending=True) | Q(attendance_confirmed=False)
-            ).exists()
-
-            if is_invited:
+            # Check if the user is a confirmed participant or a pending invitee.
+            # The invitations are shared with the view and the serializer for this request.
+            invitation = get_user_invitation(request, obj)
+            if invitation and (invitation.is_attending or not invitation.attendance_confirmed):
                 return True
 
         # For other methods, such as POST, PUT, DELETE, only the creator is allowed
-        return obj.creator == request.user
+        return obj.creator_id == request.user.pk
 
 # class MovieNightInvitationPermission(permissions.BasePermission):
 #     """
@@ -41,6 +36,17 @@ class MovieNightDetailPermission(permissions.BasePermission):
 #         movie_night = MovieNight.objects.get(id=movie_night_id)
 #         return movie_night.creator == request.user
 
+class MovieNightSeriesPermission(permissions.BasePermission):
+    """
+    Custom permission class to allow only the creator of a movie night series
+    or its invitees to view the series and its occurrences.
+    """
+
+    def has_object_permission(self, request, view, obj):
+        if obj.creator_id == request.user.pk:
+            return True
+        return request.method in permissions.SAFE_METHODS and obj.invitees.filter(pk=request.user.pk).exists()
+
 class IsInvitee(permissions.BasePermission):
     """
     Custom permission to only allow the invitee of the MovieNightInvitation to view or edit it.
@@ -0,0 +1,251 @@
+"""
+Local poster proxy for movie posters.
+
+Each poster is fetched once from its `Movie.url_poster` and resized into a few WebP thumbnails on a
+worker pool. Thumbnails are stored in a content-addressed on-disk cache:
+
+- `<POSTER_CACHE_DIR>/urls/<sha256(url)>` holds the sha256 of the poster bytes downloaded from that URL.
+- `<POSTER_CACHE_DIR>/<hash[:2]>/<hash>_<size>.webp` holds each thumbnail, so identical posters
+  served from different URLs share the same files.
+
+Reads refresh the file modification time, and the least recently used thumbnails are evicted once
+the cache grows beyond `POSTER_CACHE_MAX_BYTES`. Each process keeps a running estimate of the cache
+size, so the cache directory is only walked when the estimate goes over the limit.
+"""
+
+import hashlib
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import requests
+from django.conf import settings
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Thumbnail widths in pixels, keyed by the size name used in the URL
+POSTER_SIZES = {
+    "small": 154,
+    "medium": 342,
+    "large": 500,
+}
+POSTER_FETCH_TIMEOUT = 10
+POSTER_MAX_BYTES = 10 * 1024 * 1024
+POSTER_FETCH_CHUNK_SIZE = 64 * 1024
+POSTER_WEBP_QUALITY = 80
+
+_resize_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="poster-resize")
+# url -> [lock, number of requests holding or waiting for it]
+_fetch_locks = {}
+_fetch_locks_guard = threading.Lock()
+# Cache dir -> estimated size in bytes of its thumbnails, refreshed on every walk
+_cache_sizes = {}
+_cache_sizes_guard = threading.Lock()
+
+
+class PosterUnavailable(Exception):
+    """Raised when a poster cannot be fetched or decoded."""
+
+
+def _cache_dir():
+    return settings.POSTER_CACHE_DIR
+
+
+def _url_index_path(url):
+    return os.path.join(_cache_dir(), "urls", hashlib.sha256(url.encode()).hexdigest())
+
+
+def _thumbnail_path(content_hash, size):
+    return os.path.join(_cache_dir(), content_hash[:2], f"{content_hash}_{size}.webp")
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _make_thumbnail(image, width):
+    thumbnail = image.copy()
+    if thumbnail.width > width:
+        height = round(thumbnail.height * width / thumbnail.width)
+        thumbnail = thumbnail.resize((width, height), Image.LANCZOS)
+    buffer = io.BytesIO()
+    thumbnail.save(buffer, format="WEBP", quality=POSTER_WEBP_QUALITY)
+    return buffer.getvalue()
+
+
+@contextmanager
+def _fetch_lock(url):
+    """
+    Hold the lock serializing downloads of `url`. The lock is dropped from `_fetch_locks` once
+    no request holds or waits for it, so a later request can never get a different lock while
+    an earlier one is still downloading.
+    """
+    with _fetch_locks_guard:
+        entry = _fetch_locks.setdefault(url, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _fetch_locks_guard:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _fetch_locks[url]
+
+
+def _download(url):
+    """
+    Return the poster bytes at `url`, aborting once they exceed `POSTER_MAX_BYTES`.
+    """
+    try:
+        resp = requests.get(url, timeout=POSTER_FETCH_TIMEOUT, stream=True)
+    except requests.RequestException as e:
+        raise PosterUnavailable(f"Failed to fetch poster {url}: {e}") from e
+    try:
+        resp.raise_for_status()
+        content_length = resp.headers.get("Content-Length")
+        if content_length and content_length.isdigit() and int(content_length) > POSTER_MAX_BYTES:
+            raise PosterUnavailable(f"Poster {url} is larger than {POSTER_MAX_BYTES} bytes")
+        content = bytearray()
+        for chunk in resp.iter_content(chunk_size=POSTER_FETCH_CHUNK_SIZE):
+            content += chunk
+            if len(content) > POSTER_MAX_BYTES:
+                raise PosterUnavailable(f"Poster {url} is larger than {POSTER_MAX_BYTES} bytes")
+    except requests.RequestException as e:
+        raise PosterUnavailable(f"Failed to fetch poster {url}: {e}") from e
+    finally:
+        resp.close()
+    return bytes(content)
+
+
+def _fetch_and_resize(url):
+    """
+    Download the poster at `url` and write every thumbnail size to the cache.
+    Returns the content hash of the downloaded poster.
+    """
+    content = _download(url)
+    content_hash = hashlib.sha256(content).hexdigest()
+    missing_sizes = [
+        size for size in POSTER_SIZES
+        if not os.path.exists(_thumbnail_path(content_hash, size))
+    ]
+    if missing_sizes:
+        try:
+            image = Image.open(io.BytesIO(content))
+            image.load()
+        except (OSError, Image.DecompressionBombError) as e:
+            raise PosterUnavailable(f"Failed to decode poster {url}: {e}") from e
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGB")
+
+        thumbnails = _resize_pool.map(
+            lambda size: (size, _make_thumbnail(image, POSTER_SIZES[size])), missing_sizes
+        )
+        written = 0
+        for size, data in thumbnails:
+            _write_atomic(_thumbnail_path(content_hash, size), data)
+            written += len(data)
+        _record_written(written)
+
+    _write_atomic(_url_index_path(url), content_hash.encode())
+    return content_hash
+
+
+def _record_written(nbytes):
+    """
+    Add `nbytes` of new thumbnails to the cache size estimate, and walk the cache to evict
+    thumbnails only when the estimate is unknown or over `POSTER_CACHE_MAX_BYTES`.
+    """
+    cache_dir = _cache_dir()
+    with _cache_sizes_guard:
+        cache_size = _cache_sizes.get(cache_dir)
+        if cache_size is not None:
+            cache_size += nbytes
+            _cache_sizes[cache_dir] = cache_size
+    if cache_size is None or cache_size > settings.POSTER_CACHE_MAX_BYTES:
+        evict_if_needed()
+
+
+def _lookup_content_hash(url):
+    try:
+        with open(_url_index_path(url), "rb") as f:
+            return f.read().decode()
+    except FileNotFoundError:
+        return None
+
+
+def get_thumbnail(url, size):
+    """
+    Return `(path, content_hash)` of the cached WebP thumbnail of the poster at `url`.
+
+    The poster is fetched and resized on the first request only. Concurrent requests for the
+    same URL wait for a single download instead of fetching it several times.
+    Raises `PosterUnavailable` if the poster cannot be fetched or decoded.
+    """
+    if size not in POSTER_SIZES:
+        raise ValueError(f"Unknown poster size '{size}'. Allowed sizes are: {', '.join(POSTER_SIZES)}")
+
+    # A thumbnail evicted between the lookup and the read is regenerated once
+    for attempt in range(2):
+        content_hash = _lookup_content_hash(url)
+        if content_hash is None or not os.path.exists(_thumbnail_path(content_hash, size)):
+            with _fetch_lock(url):
+                # Another request may have filled the cache while we were waiting
+                content_hash = _lookup_content_hash(url)
+                if content_hash is None or not os.path.exists(_thumbnail_path(content_hash, size)):
+                    content_hash = _fetch_and_resize(url)
+
+        path = _thumbnail_path(content_hash, size)
+        try:
+            # Mark as recently used for LRU eviction
+            os.utime(path)
+        except FileNotFoundError:
+            continue
+        return path, content_hash
+    raise PosterUnavailable(f"Poster thumbnail for {url} was evicted before it could be served")
+
+
+def evict_if_needed():
+    """
+    Delete the least recently used thumbnails until the cache fits in `POSTER_CACHE_MAX_BYTES`.
+    URL index entries pointing to evicted thumbnails are left in place; the next request for
+    that URL sees the thumbnail is missing and fetches it again.
+    """
+    entries = []
+    total_size = 0
+    for root, dirs, files in os.walk(_cache_dir()):
+        if os.path.basename(root) == "urls":
+            continue
+        for name in files:
+            if not name.endswith(".webp"):
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total_size += stat.st_size
+
+    if total_size > settings.POSTER_CACHE_MAX_BYTES:
+        entries.sort()
+        for mtime, file_size, path in entries:
+            if total_size <= settings.POSTER_CACHE_MAX_BYTES:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_size -= file_size
+            logger.info("Evicted poster thumbnail %s", path)
+
+    with _cache_sizes_guard:
+        _cache_sizes[_cache_dir()] = total_size
@@ -0,0 +1,159 @@
+"""
+Recurrence rules of movie night series.
+
+A series stores an RFC 5545 RRULE restricted to the subset a weekly club needs:
+
+- `FREQ`: `DAILY`, `WEEKLY` or `MONTHLY` (required).
+- `INTERVAL`: every n periods, 1 to 52.
+- `BYDAY`: weekdays (`MO` to `SU`), with `FREQ=WEEKLY` only.
+- `COUNT` or `UNTIL`, not both, for at most `MAX_COUNT` occurrences. Without either the series is open-ended.
+
+Rules are expanded with `dateutil.rrule` in the local time zone, so a series at 20:00 stays at 20:00
+across daylight saving changes. Expansion is lazy and bounded by the requested window: for open-ended
+daily and weekly rules the start is first moved forward by whole periods, so listing next week of a
+series that has run for years does not iterate over its past.
+"""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import islice
+from dateutil import rrule
+from django.utils import timezone
+
+FREQUENCIES = {"DAILY": rrule.DAILY, "WEEKLY": rrule.WEEKLY, "MONTHLY": rrule.MONTHLY}
+WEEKDAYS = {"MO": rrule.MO, "TU": rrule.TU, "WE": rrule.WE, "TH": rrule.TH, "FR": rrule.FR, "SA": rrule.SA, "SU": rrule.SU}
+PERIOD_DAYS = {"DAILY": 1, "WEEKLY": 7}
+MAX_INTERVAL = 52
+MAX_COUNT = 520
+# Latest UNTIL that can be converted to any local time zone without overflowing
+MAX_UNTIL = datetime(9999, 12, 30, tzinfo=dt_timezone.utc)
+
+
+def parse_rrule(text, dtstart=None):
+    """
+    Parse `text` into a dict of RRULE parts. Raises ValueError if it is outside the supported subset.
+    With `dtstart`, an `UNTIL` giving more than `MAX_COUNT` occurrences from it is rejected too.
+    """
+    parts = {}
+    for item in text.strip().upper().removeprefix("RRULE:").split(";"):
+        key, separator, value = item.partition("=")
+        if not separator or not value:
+            raise ValueError(f"Invalid rule part '{item}'.")
+        if key in parts:
+            raise ValueError(f"'{key}' is given more than once.")
+        parts[key] = value
+
+    unsupported = set(parts) - {"FREQ", "INTERVAL", "BYDAY", "COUNT", "UNTIL"}
+    if unsupported:
+        raise ValueError(f"Unsupported rule parts: {', '.join(sorted(unsupported))}.")
+    if parts.get("FREQ") not in FREQUENCIES:
+        raise ValueError("'FREQ' must be one of DAILY, WEEKLY or MONTHLY.")
+
+    rule = {"FREQ": parts["FREQ"], "INTERVAL": _positive_int(parts, "INTERVAL", 1, MAX_INTERVAL)}
+    if "BYDAY" in parts:
+        if rule["FREQ"] != "WEEKLY":
+            raise ValueError("'BYDAY' is only supported with FREQ=WEEKLY.")
+        days = parts["BYDAY"].split(",")
+        if any(day not in WEEKDAYS for day in days):
+            raise ValueError("'BYDAY' must list weekdays among MO, TU, WE, TH, FR, SA and SU.")
+        rule["BYDAY"] = sorted(set(days), key=list(WEEKDAYS).index)
+    if "COUNT" in parts and "UNTIL" in parts:
+        raise ValueError("'COUNT' and 'UNTIL' cannot be combined.")
+    if "COUNT" in parts:
+        rule["COUNT"] = _positive_int(parts, "COUNT", None, MAX_COUNT)
+    if "UNTIL" in parts:
+        rule["UNTIL"] = _parse_until(parts["UNTIL"])
+        if dtstart is not None:
+            # Stop counting at the first occurrence past the limit
+            expanded = islice(_build(rule, timezone.localtime(dtstart)), MAX_COUNT + 1)
+            if sum(1 for _ in expanded) > MAX_COUNT:
+                raise ValueError(f"'UNTIL' cannot be after occurrence {MAX_COUNT} of the series.")
+    return rule
+
+
+def _positive_int(parts, key, default, maximum):
+    if key not in parts:
+        return default
+    try:
+        value = int(parts[key])
+    except ValueError:
+        raise ValueError(f"'{key}' must be an integer.") from None
+    if not 1 <= value <= maximum:
+        raise ValueError(f"'{key}' must be between 1 and {maximum}.")
+    return value
+
+
+def _parse_until(value):
+    for pattern in ("%Y%m%dT%H%M%SZ", "%Y%m%d"):
+        try:
+            until = datetime.strptime(value, pattern)
+        except ValueError:
+            continue
+        if pattern == "%Y%m%d":
+            # A date-only UNTIL includes the whole day
+            until += timedelta(days=1, microseconds=-1)
+        return until.replace(tzinfo=dt_timezone.utc)
+    raise ValueError("'UNTIL' must be a date (YYYYMMDD) or a UTC date-time (YYYYMMDDTHHMMSSZ).")
+
+
+def _build(rule, dtstart):
+    kwargs = {"dtstart": dtstart, "interval": rule["INTERVAL"]}
+    if "BYDAY" in rule:
+        kwargs["byweekday"] = [WEEKDAYS[day] for day in rule["BYDAY"]]
+    if "COUNT" in rule:
+        kwargs["count"] = rule["COUNT"]
+    if "UNTIL" in rule:
+        kwargs["until"] = min(rule["UNTIL"], MAX_UNTIL).astimezone(dtstart.tzinfo)
+    return rrule.rrule(FREQUENCIES[rule["FREQ"]], **kwargs)
+
+
+def _fast_forward(rule, dtstart, window_start):
+    """
+    Move `dtstart` forward by whole periods to just before `window_start`, when that does not change
+    the occurrences: open-ended daily and weekly rules only.
+    """
+    if "COUNT" in rule or rule["FREQ"] not in PERIOD_DAYS:
+        return dtstart
+    period = PERIOD_DAYS[rule["FREQ"]] * rule["INTERVAL"]
+    periods = (window_start - dtstart).days // period - 1
+    if periods <= 0:
+        return dtstart
+    # Shift the wall-clock time, then resolve the UTC offset of the new date
+    naive = dtstart.replace(tzinfo=None) + timedelta(days=periods * period)
+    return timezone.make_aware(naive, dtstart.tzinfo)
+
+
+def occurrences(text, dtstart, window_start, window_end):
+    """
+    Yield the start times of the occurrences of rule `text` from `dtstart` in `[window_start, window_end)`,
+    in order.
+    """
+    rule = parse_rrule(text)
+    first = _fast_forward(rule, timezone.localtime(dtstart), window_start)
+    for occurrence in _build(rule, first).xafter(max(window_start, first), inc=True):
+        if occurrence >= window_end:
+            return
+        yield occurrence
+
+
+def is_occurrence(text, dtstart, value):
+    """
+    Return True if `value` is the start time of an occurrence of rule `text` from `dtstart`.
+    """
+    return any(occurrence == value for occurrence in occurrences(text, dtstart, value, value + timedelta(seconds=1)))
+
+
+def last_occurrence(text, dtstart):
+    """
+    Return the start time of the last occurrence of rule `text` from `dtstart`, or None if it is open-ended.
+    """
+    rule = parse_rrule(text, dtstart)
+    if "COUNT" not in rule and "UNTIL" not in rule:
+        return None
+    expanded = _build(rule, timezone.localtime(dtstart))
+    if "UNTIL" in rule:
+        return expanded.before(rule["UNTIL"], inc=True)
+    # At most MAX_COUNT occurrences
+    last = None
+    for last in expanded:
+        pass
+    return last
@@ -0,0 +1,65 @@
+"""
+Sending of the start notifications of movie nights from their reminder schedules.
+
+Each movie night has up to `MAX_REMINDERS` `MovieNightReminder` rows, one per offset before its start.
+Every unsent reminder is armed with a `send_reminder` ETA task at its `fire_at` (see
+`MovieNightReminder.arm`), so it is sent on time. `send` claims the reminder with
+`SELECT ... FOR UPDATE SKIP LOCKED` and marks it sent in the same transaction as its notifications, so it
+is never sent twice: a call armed for an instant the reminder has since moved from, or delivered twice by
+the broker, finds nothing to claim.
+
+`send_due`, run every minute by the `send_due_reminders` task, only catches up: it claims the reminders
+overdue by more than `CATCH_UP_DELAY`, whose call was lost or ran early.
+"""
+
+from datetime import timedelta
+from django.db import transaction
+from django.utils import timezone
+from apps.movies.models import MovieNightReminder
+from apps.notifications import notifications
+
+REMINDER_BATCH_SIZE = 200
+# Reminders are left to their ETA task for this long before the catch-up scan sends them
+CATCH_UP_DELAY = timedelta(minutes=1)
+
+
+def _claim():
+    return (
+        MovieNightReminder.objects.select_for_update(skip_locked=True, of=("self",))
+        .filter(sent_at__isnull=True)
+        .select_related("movie_night__creator")
+    )
+
+
+def send(reminder_pk):
+    """
+    Send reminder `reminder_pk` if it is due and unsent. Returns True if it was sent.
+    """
+    with transaction.atomic():
+        now = timezone.now()
+        reminder = _claim().filter(pk=reminder_pk, fire_at__lte=now).first()
+        if reminder is None:
+            return False
+        notifications.send_starting_notification(reminder.movie_night, reminder.offset)
+        MovieNightReminder.objects.filter(pk=reminder.pk).update(sent_at=now)
+    return True
+
+
+def send_due(batch_size=REMINDER_BATCH_SIZE, delay=CATCH_UP_DELAY):
+    """
+    Send the reminders overdue by more than `delay`, one batch per transaction, and return how many were sent.
+    Reminders of the same movie night due together send one notification, for the reminder closest to the start.
+    """
+    sent = 0
+    while True:
+        with transaction.atomic():
+            now = timezone.now()
+            reminders = list(_claim().filter(fire_at__lte=now - delay).order_by("fire_at")[:batch_size])
+            # Ordered by `fire_at`, so the last reminder kept for a movie night has the smallest offset
+            latest = {reminder.movie_night_id: reminder for reminder in reminders}
+            for reminder in latest.values():
+                notifications.send_starting_notification(reminder.movie_night, reminder.offset)
+            MovieNightReminder.objects.filter(pk__in=[reminder.pk for reminder in reminders]).update(sent_at=now)
+        sent += len(reminders)
+        if len(reminders) < batch_size:
+            return sent
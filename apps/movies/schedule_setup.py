@@ -2,24 +2,69 @@ from django_celery_beat.models import IntervalSchedule, PeriodicTask
 
 def schedule_setup(sender, **kwargs):
     """
-    Sets up a periodic task that runs every minute to check for movies that 
-    are starting soon.
+    Sets up the periodic tasks of the movies app.
 
-    - The function creates or retrieves an interval schedule that triggers every minute.
-    - A periodic task is then created or linked to this schedule to execute the 
-      `notify_of_starting_soon` task from the `movie.tasks` module.
+    Start notifications are not found by a scan of the MovieNight table: each reminder of a movie night
+    runs as an ETA task at its instant. The every-minute task running `notify_of_starting_soon` that used
+    to scan the whole MovieNight table is removed.
 
-    This ensures that the system regularly checks if any movie nights are starting 
-    within a specific timeframe and sends appropriate notifications.
+    - A periodic task runs `send_due_reminders` every minute, catching up on the reminders whose ETA
+      task was lost, through an index on their instant.
+    - A periodic task runs `materialize_series_occurrences` every 15 minutes, storing the occurrences
+      of movie night series whose reminder is due within the hour.
+    - A third periodic task runs `dispatch_outbox` every 5 seconds to queue the task calls
+      recorded in the transactional outbox.
+    - A periodic task runs `reconcile_unseen_counts` of the notifications app every 15 minutes,
+      counting again the cached unseen counts of users whose notifications changed recently.
+    - An hourly task runs `send_notification_digest`, releasing the notifications of the types listed
+      in the `NOTIFICATION_DIGEST_TYPES` setting, which are held until then.
     """
-    minute_schedule, created = IntervalSchedule.objects.get_or_create(
+    PeriodicTask.objects.filter(task='apps.movies.tasks.notify_of_starting_soon').delete()
+
+    reminder_schedule, created = IntervalSchedule.objects.get_or_create(
         period=IntervalSchedule.MINUTES, every=1
     )
-    # Create or get the periodic task linked to this schedule
     task, created = PeriodicTask.objects.get_or_create(
-        name="Check movie start times every minute",
-        interval=minute_schedule,
-        task='apps.movies.tasks.notify_of_starting_soon',
+        name="Send due movie night reminders every minute",
+        interval=reminder_schedule,
+        task='apps.movies.tasks.send_due_reminders',
+        enabled=True
+    )
+
+    series_schedule, created = IntervalSchedule.objects.get_or_create(
+        period=IntervalSchedule.MINUTES, every=15
+    )
+    task, created = PeriodicTask.objects.get_or_create(
+        name="Store due movie night series occurrences every 15 minutes",
+        interval=series_schedule,
+        task='apps.movies.tasks.materialize_series_occurrences',
+        enabled=True
+    )
+    task, created = PeriodicTask.objects.get_or_create(
+        name="Reconcile unseen notification counts every 15 minutes",
+        interval=series_schedule,
+        task='apps.notifications.tasks.reconcile_unseen_counts',
+        enabled=True
+    )
+
+    digest_schedule, created = IntervalSchedule.objects.get_or_create(
+        period=IntervalSchedule.HOURS, every=1
+    )
+    task, created = PeriodicTask.objects.get_or_create(
+        name="Send the notification digest every hour",
+        interval=digest_schedule,
+        task='apps.notifications.tasks.send_notification_digest',
+        enabled=True
+    )
+
+    # Drain the transactional outbox every few seconds
+    outbox_schedule, created = IntervalSchedule.objects.get_or_create(
+        period=IntervalSchedule.SECONDS, every=5
+    )
+    task, created = PeriodicTask.objects.get_or_create(
+        name="Dispatch outbox events every 5 seconds",
+        interval=outbox_schedule,
+        task='apps.movies.tasks.dispatch_outbox',
         enabled=True
     )
     
@@ -0,0 +1,156 @@
+"""
+Overlap detection for movie night scheduling.
+
+A user's commitments are the movie nights they created or accepted an invitation to. Each check is
+bounded by the stored `MovieNight.end_time`, so it never loads the user's whole history:
+
+- On PostgreSQL the nights are matched with `tstzrange(start_time, end_time) && tstzrange(start, end)`,
+  served by the `movienight_span_gist` GiST index.
+- On other databases the same check is a B-tree range scan on `start_time`, bounded below by
+  `MAX_MOVIE_NIGHT_DURATION` since no night can start earlier and still overlap.
+
+`suggest_start_times` uses the same range query to load the busy intervals of a whole invitee list
+at once, ordered by start time, and finds the free slots with a single sweep over them. Only users
+connected to the requester, through a shared movie night or chat group, are taken into account, so
+suggestions never reveal the schedule of strangers.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Exists, Func, OuterRef, Q
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from apps.chat.models import Membership
+from apps.movies.models import MovieNight, MovieNightInvitation, MAX_MOVIE_NIGHT_DURATION, compute_end_time
+
+
+class ScheduleConflict(APIException):
+    """
+    Raised when a movie night would overlap other movie nights of the same user.
+    The response lists the conflicting nights.
+    """
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "This movie night overlaps other movie nights."
+    default_code = "schedule_conflict"
+
+    def __init__(self, conflicts):
+        super().__init__()
+        self.detail = {
+            "error": self.default_detail,
+            "conflicts": [
+                {
+                    "id": movie_night.pk,
+                    "movie": movie_night.movie.title,
+                    "start_time": movie_night.start_time,
+                    "end_time": movie_night.end_time,
+                }
+                for movie_night in conflicts
+            ],
+        }
+
+
+def _overlapping(queryset, start_time, end_time):
+    # tstzrange(start, NULL) is unbounded: leave out nights without an end time on every backend
+    queryset = queryset.filter(end_time__isnull=False)
+    if connection.vendor == "postgresql":
+        from django.contrib.postgres.fields import DateTimeRangeField
+        from psycopg2.extras import DateTimeTZRange
+
+        span = Func("start_time", "end_time", function="TSTZRANGE", output_field=DateTimeRangeField())
+        return queryset.alias(span=span).filter(span__overlap=DateTimeTZRange(start_time, end_time))
+    return queryset.filter(
+        start_time__gt=start_time - MAX_MOVIE_NIGHT_DURATION,
+        start_time__lt=end_time,
+        end_time__gt=start_time,
+    )
+
+
+def find_conflicts(user, start_time, end_time, exclude_pk=None):
+    """
+    Return the movie nights `user` created or is attending that overlap `[start_time, end_time)`,
+    ordered by start time. `exclude_pk` is left out, for updates of an existing night.
+    """
+    queryset = MovieNight.objects.select_related("movie").exclude(pk=exclude_pk)
+    created = _overlapping(queryset.filter(creator=user), start_time, end_time)
+    attending = _overlapping(
+        queryset.filter(invites__invitee=user, invites__is_attending=True), start_time, end_time
+    )
+    # Two indexed queries instead of an OR across the invitations join
+    conflicts = {movie_night.pk: movie_night for movie_night in [*created, *attending]}
+    return sorted(conflicts.values(), key=lambda movie_night: (movie_night.start_time, movie_night.pk))
+
+
+def check_conflicts(user, start_time, end_time, exclude_pk=None):
+    """
+    Raise `ScheduleConflict` if `[start_time, end_time)` overlaps other movie nights of `user`.
+    """
+    conflicts = find_conflicts(user, start_time, end_time, exclude_pk=exclude_pk)
+    if conflicts:
+        raise ScheduleConflict(conflicts)
+
+
+def busy_intervals(user_ids, window_start, window_end):
+    """
+    Return the `(start_time, end_time)` spans of the movie nights any of `user_ids` created or is
+    attending that overlap the window, ordered by start time, in one query.
+    """
+    queryset = MovieNight.objects.filter(
+        Q(creator_id__in=user_ids) | Q(invites__invitee_id__in=user_ids, invites__is_attending=True)
+    )
+    return (
+        _overlapping(queryset, window_start, window_end)
+        .order_by("start_time", "end_time")
+        .values_list("start_time", "end_time")
+        .distinct()
+    )
+
+
+def connected_user_ids(user, user_ids):
+    """
+    Return the ids among `user_ids` of the users `user` shares a movie night or a chat group with,
+    in one query. A movie night is shared when one of them created it and the other is invited,
+    or when both are invited.
+    """
+    invitations = MovieNightInvitation.objects.filter(invitee=OuterRef("pk"))
+    connected = (
+        Exists(invitations.filter(movie_night__creator=user))
+        | Exists(invitations.filter(movie_night__invites__invitee=user))
+        | Exists(MovieNight.objects.filter(creator=OuterRef("pk"), invites__invitee=user))
+        | Exists(Membership.objects.filter(user=OuterRef("pk"), chat_group__membership__user=user))
+    )
+    return list(
+        get_user_model().objects.filter(pk__in=user_ids).exclude(pk=user.pk).filter(connected)
+        .values_list("pk", flat=True)
+    )
+
+
+def free_slots(intervals, window_start, window_end, duration):
+    """
+    Yield the `(start, end)` gaps of at least `duration` in `[window_start, window_end)` that no interval
+    covers. `intervals` must be ordered by start time; they are merged while sweeping, in linear time.
+    """
+    cursor = window_start
+    for start_time, end_time in intervals:
+        if start_time - cursor >= duration:
+            yield cursor, min(start_time, window_end)
+        cursor = max(cursor, end_time)
+        if cursor >= window_end:
+            return
+    if window_end - cursor >= duration:
+        yield cursor, window_end
+
+
+def suggest_start_times(user_ids, movie, window_start, window_end, limit):
+    """
+    Return up to `limit` free slots, earliest first, where a movie night of `movie` fits between
+    `window_start` and `window_end` without overlapping any commitment of `user_ids`.
+    Each slot is a dict with the suggested `start_time` and `end_time`, and the end of the gap as `free_until`.
+    """
+    duration = compute_end_time(window_start, movie) - window_start
+    intervals = busy_intervals(user_ids, window_start, window_end)
+    slots = []
+    for start_time, free_until in free_slots(intervals, window_start, window_end, duration):
+        slots.append({"start_time": start_time, "end_time": start_time + duration, "free_until": free_until})
+        if len(slots) == limit:
+            break
+    return slots
@@ -6,8 +6,10 @@ validation, serialization to and from JSON, and custom logic for specific fields
 """
 
 from rest_framework import serializers
-from apps.movies.models import Genre, Movie, SearchTerm, MovieNight, MovieNightInvitation
+from apps.movies.models import Genre, Movie, SearchTerm, MovieNight, MovieNightInvitation, MovieNightSeries, MAX_REMINDERS
+from apps.movies import recurrence
 from apps.movienight_auth.models import User
+from apps.movies.lookups import get_invitations
 from django.utils import timezone
 from datetime import timedelta
 from typing import List
@@ -106,18 +108,59 @@ class SearchTermSerializer(serializers.ModelSerializer):
         return value.lower()
 
 
+class ReminderOffsetsField(serializers.ListField):
+    """
+    Field for the reminder schedule of a movie night: up to `MAX_REMINDERS` distinct durations before
+    the start, of at most 30 days each, given and shown earliest reminder first.
+    """
+    child = serializers.DurationField(min_value=timedelta(0), max_value=timedelta(days=30))
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("max_length", MAX_REMINDERS)
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        return sorted(set(super().to_internal_value(data)), reverse=True)
+
+
 class MovieNightSerializer(serializers.ModelSerializer):
     """
     Serializer for MovieNight model. Includes fields for the creator, movie, and start time.
+    `reminder_offsets` replaces the reminder schedule; without it a new movie night gets one reminder
+    `start_notification_before` its start.
     """
     creator = serializers.ReadOnlyField(source='creator.email')
     is_creator = serializers.SerializerMethodField()
+    reminder_offsets = ReminderOffsetsField(required=False, write_only=True)
 
     class Meta:
         model = MovieNight
-        fields = ['id', 'start_time', 'start_notification_before', 'creator', 'movie', 'is_creator']
+        fields = [
+            'id', 'start_time', 'start_notification_before', 'reminder_offsets', 'creator', 'movie', 'is_creator',
+            'attending_count', 'declined_count', 'pending_count',
+        ]
         read_only = ['is_creator']
 
+    def create(self, validated_data):
+        """
+        Create the movie night, then replace its default reminder with the given schedule.
+        """
+        offsets = validated_data.pop("reminder_offsets", None)
+        movie_night = super().create(validated_data)
+        if offsets is not None:
+            movie_night.set_reminders(offsets)
+        return movie_night
+
+    def update(self, instance, validated_data):
+        """
+        Update the movie night, then replace its reminder schedule if one is given.
+        """
+        offsets = validated_data.pop("reminder_offsets", None)
+        movie_night = super().update(instance, validated_data)
+        if offsets is not None:
+            movie_night.set_reminders(offsets)
+        return movie_night
+
     def validate_start_time(self, value):
         """
         Ensure the start time of the movie night is in the future.
@@ -136,10 +179,11 @@ class MovieNightSerializer(serializers.ModelSerializer):
 
 class MovieNightDetailSerializer(MovieNightSerializer):
     """
-    Detailed serializer for MovieNight, adding pending invitees and participants information.
+    Detailed serializer for MovieNight, adding the reminder schedule, pending invitees and participants information.
     """
     pending_invitees = serializers.SerializerMethodField()
     participants = serializers.SerializerMethodField()
+    reminder_offsets = ReminderOffsetsField(required=False)
 
     class Meta:
         model = MovieNight
@@ -150,19 +194,33 @@ class MovieNightDetailSerializer(MovieNightSerializer):
             "creator",
             "start_notification_sent",
             "start_notification_before",
+            "reminder_offsets",
             "pending_invitees",
             "participants",
-            "is_creator"
+            "is_creator",
+            "attending_count",
+            "declined_count",
+            "pending_count",
         ]
         read_only = ["creator"]
 
     def get_participants(self, obj) -> List[str]:
         """ 
         Retrieve emails of invitees who have confirmed their attendance.
+        Uses the `participant_invites` prefetch when the queryset provides it,
+        or the invitations already loaded for the request.
         """
-        confirmed_invitees = MovieNightInvitation.objects.filter(
-            movie_night=obj, attendance_confirmed=True, is_attending=True
-        ).select_related('invitee')
+        confirmed_invitees = getattr(obj, "participant_invites", None)
+        request = self.context.get('request')
+        if confirmed_invitees is None and request:
+            confirmed_invitees = [
+                invitation for invitation in get_invitations(request, obj)
+                if invitation.attendance_confirmed and invitation.is_attending
+            ]
+        if confirmed_invitees is None:
+            confirmed_invitees = MovieNightInvitation.objects.filter(
+                movie_night=obj, attendance_confirmed=True, is_attending=True
+            ).select_related('invitee')
 
         return [invitee.invitee.email for invitee in confirmed_invitees]
 
@@ -170,19 +228,58 @@ class MovieNightDetailSerializer(MovieNightSerializer):
         """
         Retrieve emails of invitees who haven't confirmed yet, 
         but only return this data if the requesting user is the creator.
+        Uses the `pending_invites` prefetch when the queryset provides it,
+        or the invitations already loaded for the request.
         """
         request = self.context.get('request')
 
-        if request and obj.creator == request.user:
-            pending_invitees = MovieNightInvitation.objects.filter(
-                movie_night=obj, attendance_confirmed=False
-            ).select_related('invitee')
+        if request and obj.creator_id == request.user.pk:
+            pending_invitees = getattr(obj, "pending_invites", None)
+            if pending_invitees is None:
+                pending_invitees = [
+                    invitation for invitation in get_invitations(request, obj)
+                    if not invitation.attendance_confirmed
+                ]
 
             return [invitee.invitee.email for invitee in pending_invitees]
 
         return []
 
 
+class MovieSummarySerializer(serializers.ModelSerializer):
+    """
+    Minimal Movie representation embedded in movie night feeds.
+    """
+    class Meta:
+        model = Movie
+        fields = ["title", "runtime_minutes"]
+
+
+class ParticipatingMovieNightSerializer(MovieNightDetailSerializer):
+    """
+    Serializer for the participating movie nights feed. Embeds the movie title and runtime
+    instead of the movie id. Expects `movie` and `creator` to be selected and the
+    `participant_invites` / `pending_invites` lists to be prefetched.
+    """
+    movie = MovieSummarySerializer(read_only=True)
+
+    class Meta(MovieNightDetailSerializer.Meta):
+        pass
+
+
+class AgendaItemSerializer(MovieNightSerializer):
+    """
+    Serializer for an entry of the user's agenda: a movie night tagged with the user's role
+    (`creator`, `attending` or `invited`) and, for invitees, the invitation id to respond to.
+    """
+    movie = MovieSummarySerializer(read_only=True)
+    role = serializers.CharField(source="agenda_role", read_only=True)
+    invitation_id = serializers.IntegerField(read_only=True, allow_null=True)
+
+    class Meta(MovieNightSerializer.Meta):
+        fields = MovieNightSerializer.Meta.fields + ["role", "invitation_id"]
+
+
 class MovieNightInvitationSerializer(serializers.ModelSerializer):
     """
     Serializer for MovieNightInvitation model. Handles the invitee and invitation data.
@@ -229,6 +326,117 @@ class MovieNightInvitationSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class MovieNightBulkInvitationSerializer(serializers.Serializer):
+    """
+    Serializer for the bulk invitation payload: the emails of the users to invite to a movie night.
+    """
+    invitees = serializers.ListField(
+        child=serializers.EmailField(),
+        allow_empty=False,
+        max_length=100,
+    )
+
+    def validate_invitees(self, value):
+        """
+        Drop duplicate emails, keeping the order in which they were given.
+        """
+        return list(dict.fromkeys(value))
+
+
+class MovieNightSeriesSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the MovieNightSeries model. The rule must be in the supported RRULE subset,
+    and invitees are given and shown as emails.
+    """
+    creator = serializers.ReadOnlyField(source='creator.email')
+    invitees = serializers.SlugRelatedField(slug_field="email", queryset=User.objects.all(), many=True, required=False)
+
+    class Meta:
+        model = MovieNightSeries
+        fields = ["id", "movie", "creator", "start_time", "rrule", "ends_at", "start_notification_before", "invitees"]
+
+    def validate_start_time(self, value):
+        """
+        Ensure the first occurrence of the series is in the future.
+        """
+        if value <= timezone.now():
+            raise serializers.ValidationError("Start time must be in the future.")
+        return value
+
+    def validate_rrule(self, value):
+        """
+        Ensure the rule is in the supported RRULE subset, and store it without the `RRULE:` prefix.
+        """
+        try:
+            recurrence.parse_rrule(value)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+        return value.strip().upper().removeprefix("RRULE:")
+
+    def validate(self, data):
+        """
+        Ensure the rule gives at most `MAX_COUNT` occurrences from the start time.
+        """
+        rrule = data.get("rrule", getattr(self.instance, "rrule", None))
+        start_time = data.get("start_time", getattr(self.instance, "start_time", None))
+        if rrule and start_time:
+            try:
+                recurrence.parse_rrule(rrule, start_time)
+            except ValueError as e:
+                raise serializers.ValidationError({"rrule": str(e)})
+        return data
+
+
+class MovieNightSeriesRsvpSerializer(serializers.Serializer):
+    """
+    Serializer for an RSVP to one occurrence of a movie night series, identified by its start time.
+    """
+    occurrence = serializers.DateTimeField()
+    is_attending = serializers.BooleanField()
+
+
+class MovieNightStartTimeSuggestionSerializer(serializers.Serializer):
+    """
+    Serializer for a start time suggestion request: the movie, the window the movie night must fit in,
+    and the emails of the users to invite.
+    """
+    MAX_WINDOW = timedelta(days=31)
+
+    movie = serializers.PrimaryKeyRelatedField(queryset=Movie.objects.all())
+    window_start = serializers.DateTimeField()
+    window_end = serializers.DateTimeField()
+    invitees = serializers.ListField(
+        child=serializers.EmailField(),
+        allow_empty=True,
+        max_length=500,
+        default=list,
+    )
+    limit = serializers.IntegerField(min_value=1, max_value=20, default=5)
+
+    def validate_invitees(self, value):
+        """
+        Drop duplicate emails, keeping the order in which they were given.
+        """
+        return list(dict.fromkeys(value))
+
+    def validate_window_start(self, value):
+        """
+        Ensure the window does not start in the past.
+        """
+        if value < timezone.now():
+            raise serializers.ValidationError("The window cannot start in the past.")
+        return value
+
+    def validate(self, data):
+        """
+        Check that the window is not empty and not longer than `MAX_WINDOW`.
+        """
+        if data["window_end"] <= data["window_start"]:
+            raise serializers.ValidationError({"window_end": "The window must end after it starts."})
+        if data["window_end"] - data["window_start"] > self.MAX_WINDOW:
+            raise serializers.ValidationError({"window_end": "The window cannot be longer than 31 days."})
+        return data
+
     
 """
 NGUYEN Le Diem Quynh lnguye220903@gmail.com
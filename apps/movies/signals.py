@@ -4,19 +4,26 @@ are responsible for sending notifications to users when key events occur, such a
 of movie night invitations, changes in attendance, updates to movie night start times, and 
 movie night cancellations. These notifications are processed asynchronously using Celery tasks.
 
+Handlers do not call the broker: each task call is recorded in the transactional outbox
+(`apps.movies.outbox`) within the transaction of the change, and queued later by `dispatch_outbox`.
+
 Signal Handlers:
 - send_invitation: Triggered when a new movie night invitation is created.
 - send_attendance_change: Triggered when an invitee changes their attendance status.
 - send_movie_night_update: Triggered when the start time of a movie night is updated.
 - send_movie_night_delete: Triggered when a movie night is deleted.
+- refresh_calendar_feeds_*: Mark the ICS feeds of the affected users as changed once the transaction commits.
+- update_rsvp_counts_*: Keep the RSVP counters of a MovieNight in step with its invitations.
+- update_reminders: Keep the reminder schedule of a MovieNight in step with its start time.
 
 """
 
 from django.dispatch import receiver
-from django.db.models.signals import post_save, pre_save, pre_delete
-from apps.movies.models import MovieNightInvitation, MovieNight
-from apps.movies import tasks
+from django.db.models.signals import post_save, pre_save, pre_delete, post_delete
 from django.db import transaction
+from django.utils import timezone
+from apps.movies.models import MovieNightInvitation, MovieNight
+from apps.movies import tasks, outbox, ics
 import logging
 logger = logging.getLogger(__name__)
 
@@ -26,7 +33,7 @@ def send_invitation(sender, instance, created, **kwargs):
     Signal to send an invitation notification when a new MovieNightInvitation is created.
     
     This signal triggers after the MovieNightInvitation object is saved (post_save).
-    It ensures that a Celery task is called to send the invitation asynchronously only after 
+    It records the Celery task call in the outbox, so the invitation is sent asynchronously only after 
     the database transaction is fully committed, ensuring data integrity.
     
     Args:
@@ -35,12 +42,9 @@ def send_invitation(sender, instance, created, **kwargs):
         created: Boolean that indicates if a new record was created (True) or an existing one was updated (False).
         **kwargs: Additional keyword arguments.
     """
-    if created:
-        logger.warning("In send_invitation")
-        # Ensure the task runs only after the transaction is committed.
-        # transaction.on_commit(lambda: tasks.send_invitation.delay(instance.pk))
-        tasks.send_invitation.delay(instance.pk)
-        logger.warning("In send_invitation")
+    # An invitation created already answered (an RSVP to a series occurrence) needs no invitation notification
+    if created and not instance.attendance_confirmed:
+        outbox.publish(tasks.send_invitation, instance.pk)
 
 
 @receiver(pre_save, sender=MovieNightInvitation, dispatch_uid="invitation_updated")
@@ -61,14 +65,12 @@ def send_attendance_change(sender, instance, **kwargs):
         # This is a new invitation, no need to handle attendance change.
         return
     
-    # Retrieve the previous state of the invitation.
-    previous_invitation = MovieNightInvitation.objects.get(pk=instance.pk)
     instance.attendance_confirmed = True  # Automatically confirm attendance upon change.
 
-    # Only notify if the attendance status has changed.
-    if previous_invitation.is_attending != instance.is_attending:
-        # Use Celery to send the notification asynchronously.
-        tasks.send_attendance_change.delay(instance.pk, instance.is_attending)
+    # Only notify if the attendance status has changed (compared with the values loaded from the database).
+    if instance.has_changed("is_attending"):
+        # Record the notification task in the outbox; it is queued once the transaction commits.
+        outbox.publish(tasks.send_attendance_change, instance.pk, instance.is_attending)
 
 
 @receiver(pre_save, sender=MovieNight, dispatch_uid="movie_night_update")
@@ -89,13 +91,10 @@ def send_movie_night_update(sender, instance, **kwargs):
         # This is a new MovieNight, no need to handle updates.
         return
     
-    # Retrieve the previous state of the MovieNight.
-    previous_movie_night = MovieNight.objects.get(pk=instance.pk)
-    
     # Check if the start time has changed, and if so, send an update notification.
-    if previous_movie_night.start_time != instance.start_time:
-        # Use Celery to send the notification asynchronously.
-        tasks.send_movie_night_update.delay(instance.pk, instance.start_time)
+    if instance.has_changed("start_time"):
+        # Record the notification task in the outbox; it is queued once the transaction commits.
+        outbox.publish(tasks.send_movie_night_update, instance.snapshot())
 
 
 @receiver(pre_delete, sender=MovieNight, dispatch_uid="movie_night_update")
@@ -105,15 +104,114 @@ def send_movie_night_delete(sender, instance, **kwargs):
     
     This signal triggers before the MovieNight object is deleted (pre_delete). 
     It sends a cancellation notification using a Celery task, notifying all participants 
-    that the MovieNight has been canceled.
+    that the MovieNight has been canceled. The task receives a snapshot of the movie night,
+    since the row is gone by the time it runs.
     
     Args:
         sender: The model class (MovieNight).
         instance: The actual instance being deleted.
         **kwargs: Additional keyword arguments.
     """
-    # Use Celery to send the deletion notification asynchronously.
-    tasks.send_movie_night_delete.delay(instance.pk)
+    # Record the cancellation task in the outbox; it is queued once the transaction commits.
+    outbox.publish(tasks.send_movie_night_delete, instance.snapshot())
+
+def _attendee_ids(movie_night):
+    return list(movie_night.invites.filter(is_attending=True).values_list("invitee_id", flat=True))
+
+
+@receiver(post_save, sender=MovieNight, dispatch_uid="movie_night_calendar_saved")
+def refresh_calendar_feeds_on_movie_night_save(sender, instance, created, **kwargs):
+    """
+    Signal to mark the ICS feeds of the creator and attending invitees as changed when a MovieNight
+    is created, or when its start time or movie changes.
+    """
+    if created:
+        user_ids = [instance.creator_id]
+    elif instance.has_changed("start_time") or instance.has_changed("movie"):
+        user_ids = [instance.creator_id, *_attendee_ids(instance)]
+    else:
+        return
+    transaction.on_commit(lambda: ics.bump_version(user_ids))
+
+
+@receiver(pre_delete, sender=MovieNight, dispatch_uid="movie_night_calendar_deleted")
+def refresh_calendar_feeds_on_movie_night_delete(sender, instance, **kwargs):
+    """
+    Signal to mark the ICS feeds of the creator and attending invitees as changed when a MovieNight is deleted.
+    Attendees are read before the delete cascades to the invitations.
+    """
+    user_ids = [instance.creator_id, *_attendee_ids(instance)]
+    transaction.on_commit(lambda: ics.bump_version(user_ids))
+
+
+@receiver(post_save, sender=MovieNightInvitation, dispatch_uid="invitation_calendar_saved")
+def refresh_calendar_feed_on_invitation_save(sender, instance, created, **kwargs):
+    """
+    Signal to mark the invitee's ICS feed as changed when they accept or decline an invitation.
+    """
+    if instance.is_attending if created else instance.has_changed("is_attending"):
+        transaction.on_commit(lambda: ics.bump_version([instance.invitee_id]))
+
+
+@receiver(post_delete, sender=MovieNightInvitation, dispatch_uid="invitation_calendar_deleted")
+def refresh_calendar_feed_on_invitation_delete(sender, instance, **kwargs):
+    """
+    Signal to mark the invitee's ICS feed as changed when an accepted invitation is deleted.
+    """
+    if instance.is_attending:
+        transaction.on_commit(lambda: ics.bump_version([instance.invitee_id]))
+
+
+@receiver(pre_save, sender=MovieNight, dispatch_uid="movie_night_reminder_reset")
+def reset_start_notification(sender, instance, **kwargs):
+    """
+    Signal to clear the start notification flag when a MovieNight is moved to a start time still to come.
+    """
+    if instance.pk and instance.has_changed("start_time") and instance.start_time > timezone.now():
+        instance.start_notification_sent = False
+
+
+@receiver(post_save, sender=MovieNight, dispatch_uid="movie_night_reminders_saved")
+def update_reminders(sender, instance, created, **kwargs):
+    """
+    Signal to keep the reminder schedule of a MovieNight in step with it: a new movie night gets one
+    reminder `start_notification_before` its start, a change of that delay moves the matching reminder,
+    and a new start time moves every reminder.
+    """
+    if created:
+        instance.set_reminders([instance.start_notification_before])
+        return
+    if instance.has_changed("start_notification_before"):
+        offsets = set(instance.reminder_offsets) - {instance.previous("start_notification_before")}
+        instance.set_reminders([*offsets, instance.start_notification_before])
+    if instance.has_changed("start_time"):
+        instance.reschedule_reminders()
+
+
+@receiver(post_save, sender=MovieNightInvitation, dispatch_uid="invitation_rsvp_counts_saved")
+def update_rsvp_counts_on_invitation_save(sender, instance, created, **kwargs):
+    """
+    Signal to move the invitation between the RSVP counters of its MovieNight when it is created
+    or its status changes, with one atomic `F()` update.
+    """
+    previous_status = None if created else instance.previous_rsvp_status
+    if previous_status == instance.rsvp_status:
+        return
+    deltas = {instance.rsvp_status: 1}
+    if previous_status:
+        deltas[previous_status] = -1
+    MovieNight.adjust_rsvp_counts(instance.movie_night_id, **deltas)
+
+
+@receiver(post_delete, sender=MovieNightInvitation, dispatch_uid="invitation_rsvp_counts_deleted")
+def update_rsvp_counts_on_invitation_delete(sender, instance, origin=None, **kwargs):
+    """
+    Signal to decrement the RSVP counter of the deleted invitation's status.
+    Skipped when the delete cascades from the MovieNight itself.
+    """
+    if isinstance(origin, MovieNight) or getattr(origin, "model", None) is MovieNight:
+        return
+    MovieNight.adjust_rsvp_counts(instance.movie_night_id, **{instance.rsvp_status: -1})
 
 """
 NGUYEN Le Diem Quynh lnguye220903@gmail.com
@@ -3,25 +3,97 @@ Celery tasks for the movies app, handling background operations like OMDB integr
 
 Tasks:
 - `search_and_save`: Initiates a search through OMDB's API and saves the results.
+- `fill_movie_details`: Hydrates a partial movie record with its full details from OMDB.
+- `fill_movies_details`: Hydrates a group of partial movie records in a single task.
 - `send_invitation`: Sends a movie night invitation notification to a user based on the invitation's primary key.
+- `send_invitations`: Sends the invitation notifications of a group of invitations in a single task.
 - `send_attendance_change`: Sends a notification when an invitee's attendance status changes.
-- `notify_of_starting_soon`: Sends notifications when a movie night is starting soon.
+- `send_reminder`: Sends the start notification of a reminder, run as an ETA task at the reminder's instant.
+- `send_due_reminders`: Sends the overdue reminders whose ETA task was lost.
+- `materialize_series_occurrences`: Stores the occurrences of series whose reminder is due soon.
 - `send_movie_night_update`: Sends notifications when a movie night start time is updated.
+- `dispatch_outbox`: Queues the task calls recorded in the transactional outbox.
 
 Each task utilizes background processing to offload these operations and improve the overall responsiveness of the app.
 """
 
 from celery import shared_task
-from apps.movies import omdb_integration
+from datetime import timedelta
+from apps.movies import omdb_integration, outbox, reminders
 from apps.notifications import notifications
-from apps.movies.models import MovieNightInvitation, MovieNight
+from apps.movies.models import MovieNightInvitation, MovieNight, MovieNightSeries, Movie
+from django.core.cache import cache
 import logging 
 logger = logging.getLogger(__name__)
 
+# A pending hydration is forgotten after this long, even if the worker never cleared it.
+HYDRATION_LOCK_TIMEOUT = 60 * 5
+# Series occurrences are stored this long before their reminder is due
+SERIES_MATERIALIZE_AHEAD = timedelta(hours=1)
+
+
+def hydration_lock_key(movie_pk):
+    return f"movie_hydration:{movie_pk}"
+
+
+def queue_movie_hydration(movie_pk):
+    """
+    Queue `fill_movie_details` for a movie unless a hydration for it is already pending.
+    The cache lock deduplicates concurrent requests for the same movie. Returns False if
+    the task could not be queued.
+    """
+    if not cache.add(hydration_lock_key(movie_pk), True, timeout=HYDRATION_LOCK_TIMEOUT):
+        return True
+    try:
+        fill_movie_details.delay(movie_pk)
+    except Exception as e:
+        logger.error(f"Failed to queue hydration for movie {movie_pk}: {str(e)}")
+        cache.delete(hydration_lock_key(movie_pk))
+        return False
+    return True
+
+
+def queue_movies_hydration(movie_pks):
+    """
+    Queue one grouped `fill_movies_details` task for the movies that have no hydration pending yet.
+    Returns False if the task could not be queued.
+    """
+    movie_pks = [
+        pk for pk in movie_pks
+        if cache.add(hydration_lock_key(pk), True, timeout=HYDRATION_LOCK_TIMEOUT)
+    ]
+    if not movie_pks:
+        return True
+    try:
+        fill_movies_details.delay(movie_pks)
+    except Exception as e:
+        logger.error(f"Failed to queue hydration for movies {movie_pks}: {str(e)}")
+        cache.delete_many([hydration_lock_key(pk) for pk in movie_pks])
+        return False
+    return True
+
+
 @shared_task
 def search_and_save(search):
     return omdb_integration.search_and_save(search)
 
+@shared_task
+def fill_movie_details(movie_pk):
+    try:
+        omdb_integration.fill_movie_details(Movie.objects.get(pk=movie_pk))
+    except Movie.DoesNotExist:
+        logger.error(f"Movie with pk={movie_pk} does not exist")
+    finally:
+        cache.delete(hydration_lock_key(movie_pk))
+
+@shared_task
+def fill_movies_details(movie_pks):
+    try:
+        for movie in Movie.objects.filter(pk__in=movie_pks, is_full_record=False):
+            omdb_integration.fill_movie_details(movie)
+    finally:
+        cache.delete_many([hydration_lock_key(pk) for pk in movie_pks])
+
 @shared_task
 def send_invitation(mni_pk):
     logger.warning(f"Attempting to fetch MovieNightInvitation with pk={mni_pk}")
@@ -31,6 +103,12 @@ def send_invitation(mni_pk):
     except MovieNightInvitation.DoesNotExist:
         logger.error(f"MovieNightInvitation with pk={mni_pk} does not exist")
 
+@shared_task
+def send_invitations(mni_pks):
+    notifications.send_invitations(
+        MovieNightInvitation.objects.filter(pk__in=mni_pks).select_related("movie_night__creator", "invitee")
+    )
+
 @shared_task
 def send_attendance_change(mni_pk, is_attending):
     notifications.send_attendance_change(
@@ -38,20 +116,35 @@ def send_attendance_change(mni_pk, is_attending):
     )
 
 @shared_task
-def notify_of_starting_soon():
-    notifications.notify_of_starting_soon()
+def send_reminder(reminder_pk):
+    return reminders.send(reminder_pk)
 
 @shared_task
-def send_movie_night_update(mn_pk, start_time):
-    notifications.send_movie_night_update(
-        MovieNight.objects.get(pk=mn_pk), start_time
-    )
+def send_due_reminders():
+    return reminders.send_due()
 
 @shared_task
-def send_movie_night_delete(mn_pk):
-    notifications.send_movie_night_delete(
-        MovieNight.objects.get(pk=mn_pk)
-    )
+def materialize_series_occurrences():
+    MovieNightSeries.materialize_due(lookahead=SERIES_MATERIALIZE_AHEAD)
+
+@shared_task
+def send_movie_night_update(snapshot, start_time=None):
+    if not isinstance(snapshot, dict):
+        # Call queued before snapshots were introduced: (mn_pk, start_time)
+        snapshot = MovieNight.objects.get(pk=snapshot).snapshot()
+        snapshot["start_time"] = start_time
+    notifications.send_movie_night_update(snapshot)
+
+@shared_task
+def send_movie_night_delete(snapshot):
+    if not isinstance(snapshot, dict):
+        # Call queued before snapshots were introduced: (mn_pk,)
+        snapshot = MovieNight.objects.get(pk=snapshot).snapshot()
+    notifications.send_movie_night_delete(snapshot)
+
+@shared_task
+def dispatch_outbox():
+    return outbox.dispatch_pending()
 
 """
 NGUYEN Le Diem Quynh lnguye220903@gmail.com
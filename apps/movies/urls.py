@@ -4,12 +4,24 @@ from apps.movies.views import (
     MovieSearchWaitView,
     MovieSearchResultsView,
     MovieDetailView, 
+    MovieBatchView,
+    MoviePosterView,
+    MovieExportView,
     MovieView, 
     MyMovieNightView,
+    MyAgendaView,
+    MovieNightStartTimeSuggestionView,
+    MyMovieNightSeriesView,
+    MovieNightSeriesOccurrencesView,
+    MovieNightSeriesRsvpView,
+    MyCalendarFeedView,
+    MovieNightCalendarFeedView,
     ParticipatingMovieNightView,
     MovieNightDetailView,
     MyMovieNightInvitationView,
     MovieNightInvitationCreateView,
+    MovieNightBulkInvitationView,
+    MovieNightGroupInvitationView,
     InvitedMovieNightView,
     MovieNightInvitationDetailView,
     GenreView,
@@ -23,14 +35,26 @@ urlpatterns = [
     path("movies/search/", MovieSearchView.as_view(), name="movie_search"),
     path("movies/search-wait/<uuid:result_uuid>/", MovieSearchWaitView.as_view(), name="movie_search_wait"),
     path("movies/search-results/", MovieSearchResultsView.as_view(), name="movie_search_results"),
+    path("movies/export/<str:export_format>/", MovieExportView.as_view(), name="movie_export"),
+    path("movies/batch/", MovieBatchView.as_view(), name="movie_batch"),
+    path("movies/<str:pk>/poster/<str:size>/", MoviePosterView.as_view(), name="movie_poster"),
     path("movies/<str:pk>/my-movie-nights/", MyMovieNightForAMovieView.as_view(), name="my_movienight"),
     path("movies/<str:pk>/", MovieDetailView.as_view(), name="movie_detail"),
     path("movies/", cache_page(60*5)(MovieView.as_view()), name="movie_list"),
     path("my-movie-nights/", MyMovieNightView.as_view(), name="my_movienight_list"),
+    path("my-agenda/", MyAgendaView.as_view(), name="my_agenda"),
+    path("my-calendar/", MyCalendarFeedView.as_view(), name="my_calendar"),
+    path("calendar/<str:token>/movie-nights.ics", MovieNightCalendarFeedView.as_view(), name="movienight_calendar_feed"),
+    path("my-movie-night-series/", MyMovieNightSeriesView.as_view(), name="my_movienight_series_list"),
+    path("movie-night-series/<str:pk>/occurrences/", MovieNightSeriesOccurrencesView.as_view(), name="movienight_series_occurrences"),
+    path("movie-night-series/<str:pk>/rsvp/", MovieNightSeriesRsvpView.as_view(), name="movienight_series_rsvp"),
     path("participating-movie-nights/", ParticipatingMovieNightView.as_view(), name="movienight_list"),
     path("movie-nights/invited/", InvitedMovieNightView.as_view(), name="invited_movienight_list"),
+    path("movie-nights/suggest-start-time/", MovieNightStartTimeSuggestionView.as_view(), name="movienight_start_time_suggestion"),
     path('movie-nights/<str:pk>/', MovieNightDetailView.as_view(), name="movienight_detail"),
     path('movie-nights/<str:pk>/invite/', MovieNightInvitationCreateView.as_view(), name="movienight_invitation_create"),
+    path('movie-nights/<str:pk>/invite/bulk/', MovieNightBulkInvitationView.as_view(), name="movienight_invitation_bulk_create"),
+    path('movie-nights/<str:pk>/invite/group/', MovieNightGroupInvitationView.as_view(), name="movienight_invitation_group_create"),
     path('movienight-invitations/', MyMovieNightInvitationView.as_view(), name="movienight_invitation_list"),
     path('movienight-invitations/<str:pk>/', MovieNightInvitationDetailView.as_view(), name="movienight_invitation_detail"),
     path('genres/', GenreView.as_view(), name="genre_list"),
@@ -20,16 +20,22 @@ from apps.movies.serializers import (
     MovieDetailSerializer, 
     MovieNightSerializer, 
     MovieNightInvitationSerializer,
+    MovieNightBulkInvitationSerializer,
+    MovieNightStartTimeSuggestionSerializer,
+    MovieNightSeriesSerializer,
+    MovieNightSeriesRsvpSerializer,
     MovieNightDetailSerializer,
+    ParticipatingMovieNightSerializer,
+    AgendaItemSerializer,
     GenreSerializer, 
     MovieSearchSerializer,
     )
-from apps.movies.models import Movie, MovieNight, MovieNightInvitation, Genre
+from apps.movies.models import Movie, MovieNight, MovieNightInvitation, MovieNightSeries, Genre
 from django.contrib.auth import get_user_model
-from apps.movies.tasks import search_and_save
-from apps.movies.omdb_integration import fill_movie_details
+from apps.movies.tasks import search_and_save, queue_movie_hydration, queue_movies_hydration, send_invitations, send_attendance_change
+from apps.movies import outbox
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import PageNumberPagination, CursorPagination
 from django.core.paginator import Paginator
 from rest_framework import status
 
@@ -39,8 +45,9 @@ from apps.movies.filters import (
     MyMovieNightFilterSet, 
     MovieNightInvitationFilterSet
     )
-from apps.movies.permissions import MovieNightDetailPermission, IsInvitee
-from django.db.models import Q
+from apps.movies.permissions import MovieNightDetailPermission, MovieNightSeriesPermission, IsInvitee
+from django.db.models import Q, Prefetch
+from django.db import transaction, IntegrityError
 from rest_framework.exceptions import PermissionDenied
 from celery.exceptions import TimeoutError
 from django.shortcuts import redirect
@@ -54,6 +61,26 @@ from drf_spectacular.utils import extend_schema, OpenApiExample, OpenApiParamete
 from drf_spectacular.types import OpenApiTypes
 import logging
 from django.core.cache import cache
+from django.conf import settings
+from django.http import FileResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_cache_control
+from apps.movies.posters import get_thumbnail, PosterUnavailable, POSTER_SIZES
+from apps.movies.export import stream_catalog, EXPORT_CONTENT_TYPES
+from apps.movies.agenda import get_agenda_page
+from apps.movies.invitations import invite_chat_group
+from apps.movies.lookups import get_user_invitation
+from apps.movies.scheduling import check_conflicts, connected_user_ids, suggest_start_times
+from apps.movies.models import compute_end_time
+from apps.movies import ics
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from apps.chat.models import ChatGroup
+from django.utils.dateparse import parse_datetime
+from django.utils import timezone
+from datetime import timedelta
+from rest_framework.permissions import IsAdminUser
 
 logger = logging.getLogger(__name__)
 
@@ -215,14 +242,13 @@ class MovieSearchResultsView(APIView):
         if cached_results:
             return Response(cached_results)
 
-        # Fetch results from the database
-        results = Movie.objects.filter(title__icontains=term)
+        # Fetch flat rows from the database, skipping model instantiation and serializer overhead
+        results = Movie.objects.filter(title__icontains=term).values(*MovieSerializer.Meta.fields)
         paginator = PageNumberPagination()
         paginated_results = paginator.paginate_queryset(results, request, view=self)
 
-        # Serialize and cache paginated results for the specific page
-        serialized_results = MovieSerializer(paginated_results, many=True).data
-        paginated_response = paginator.get_paginated_response(serialized_results).data
+        # Cache paginated results for the specific page
+        paginated_response = paginator.get_paginated_response(paginated_results).data
 
         cache.set(cache_key, paginated_response, timeout=3600)
         return Response(paginated_response)
@@ -233,11 +259,12 @@ class MovieDetailView(RetrieveAPIView):
 
     This view:
     - Fetches a movie by its primary key (IMDB ID).
-    - Calls the OMDB API to update movie details if not already fully recorded.
-    - Returns the detailed movie data.
+    - Returns the detailed movie data immediately, even if it is only a partial record.
+    - Queues a deduplicated background task to fetch the full details from OMDB if not already fully recorded.
 
     Returns:
-    - A response containing the movie details or an error if the movie is not found or another issue occurs.
+    - A response containing the movie details with a `hydration` marker: `complete` for full records,
+      `pending` while the full details are being fetched. Clients can re-fetch once it is complete.
     """
     queryset = Movie.objects.all()
     serializer_class = MovieDetailSerializer
@@ -250,19 +277,190 @@ class MovieDetailView(RetrieveAPIView):
 
     def retrieve(self, request, *args, **kwargs):
         movie_detail = self.get_object()
+        serializer = self.get_serializer(movie_detail)
+        movie_data = serializer.data
+
+        if movie_detail.is_full_record:
+            movie_data["hydration"] = "complete"
+        else:
+            # Serve the partial record now; OMDB latency and errors stay off the request path
+            queue_movie_hydration(movie_detail.pk)
+            movie_data["hydration"] = "pending"
+
+        return Response(movie_data)
+    
+
+class MovieBatchView(APIView):
+    """
+    Retrieve the details of several movies in one request.
+
+    This view:
+    - Accepts up to `MAX_BATCH_SIZE` primary keys (`ids`) and/or IMDb IDs (`imdb_ids`), comma-separated.
+    - Fetches all of them in one query with their genres prefetched.
+    - Queues a single grouped hydration task for the movies that are not fully recorded yet.
+
+    Returns:
+    - `results`: the movie details in request order, each with a `hydration` marker (`complete` or `pending`).
+    - `not_found`: the requested identifiers that do not match any movie.
+    """
+    permission_classes = [IsAuthenticated]
+    MAX_BATCH_SIZE = 50
+
+    @staticmethod
+    def split_param(value):
+        return [item.strip() for item in value.split(",") if item.strip()]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name='ids', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, description="Comma-separated movie IDs."),
+            OpenApiParameter(name='imdb_ids', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, description="Comma-separated IMDb IDs."),
+        ],
+        responses={
+            200: OpenApiTypes.OBJECT,
+            400: OpenApiResponse(description="No identifiers, invalid IDs, or more than the maximum batch size."),
+        },
+        description="Retrieve the details of up to 50 movies by ID or IMDb ID in one request.",
+    )
+    def get(self, request, *args, **kwargs):
+        ids = self.split_param(request.query_params.get("ids", ""))
+        imdb_ids = self.split_param(request.query_params.get("imdb_ids", ""))
+
+        if not ids and not imdb_ids:
+            return Response(
+                {"error": "At least one of 'ids' or 'imdb_ids' is required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(ids) + len(imdb_ids) > self.MAX_BATCH_SIZE:
+            return Response(
+                {"error": f"At most {self.MAX_BATCH_SIZE} movies can be requested at once."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         try:
-            fill_movie_details(movie_detail)
+            ids = [int(pk) for pk in ids]
+        except ValueError:
+            return Response(
+                {"error": "'ids' must be a comma-separated list of integers."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        except Exception as e:
-            logger.error(f"Error fetching movie details: {str(e)}")
+        movies = Movie.objects.filter(Q(pk__in=ids) | Q(imdb_id__in=imdb_ids)).prefetch_related("genres")
+        movies_by_pk = {movie.pk: movie for movie in movies}
+        movies_by_imdb_id = {movie.imdb_id: movie for movie in movies_by_pk.values()}
+
+        # Keep request order, skipping duplicates and reporting unknown identifiers
+        ordered_movies, not_found = {}, []
+        for key, lookup in [(pk, movies_by_pk) for pk in ids] + [(imdb_id, movies_by_imdb_id) for imdb_id in imdb_ids]:
+            movie = lookup.get(key)
+            if movie is None:
+                not_found.append(key)
+            else:
+                ordered_movies.setdefault(movie.pk, movie)
+
+        pending = [movie.pk for movie in ordered_movies.values() if not movie.is_full_record]
+        if pending:
+            queue_movies_hydration(pending)
+
+        results = MovieDetailSerializer(list(ordered_movies.values()), many=True).data
+        for movie_data in results:
+            movie_data["hydration"] = "pending" if movie_data["id"] in pending else "complete"
+
+        return Response({"results": results, "not_found": not_found})
+
+
+class MoviePosterView(APIView):
+    """
+    Serve a resized WebP thumbnail of a movie's poster from the local poster cache.
+
+    This view:
+    - Fetches the poster from `Movie.url_poster` on the first request only, and resizes it into every size.
+    - Serves the cached thumbnail with long-lived cache headers and a content-hash ETag (304 on match).
+    - Redirects to the original poster URL if it cannot be fetched, or was evicted before being opened,
+      so clients still get an image.
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    @extend_schema(
+        responses={
+            200: OpenApiResponse(description="The WebP thumbnail.", response=OpenApiTypes.BINARY),
+            302: OpenApiResponse(description="Redirect to the original poster when it cannot be proxied."),
+            304: OpenApiResponse(description="Not modified."),
+            404: OpenApiResponse(description="Unknown movie or size, or the movie has no poster."),
+        },
+        description=f"Serve a WebP thumbnail of a movie poster. Sizes: {', '.join(POSTER_SIZES)}.",
+    )
+    def get(self, request, pk, size):
+        if size not in POSTER_SIZES:
             return Response(
-                {"error": "An unexpected error occurred."},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                {"error": f"Unknown poster size. Allowed sizes are: {', '.join(POSTER_SIZES)}."},
+                status=status.HTTP_404_NOT_FOUND,
             )
-        serializer = self.get_serializer(movie_detail)
-        return Response(serializer.data)
-    
+        movie = get_object_or_404(Movie.objects.only("url_poster"), pk=pk)
+        if not movie.url_poster or not movie.url_poster.startswith(("http://", "https://")):
+            # OMDb uses "N/A" for movies without a poster
+            return Response({"error": "This movie has no poster."}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            path, content_hash = get_thumbnail(movie.url_poster, size)
+        except PosterUnavailable as e:
+            logger.error(str(e))
+            return redirect(movie.url_poster)
+
+        etag = f'"{content_hash}-{size}"'
+        if request.headers.get("If-None-Match") == etag:
+            response = HttpResponseNotModified()
+        else:
+            try:
+                poster = open(path, "rb")
+            except FileNotFoundError:
+                # Evicted since the lookup; the next request regenerates it
+                logger.warning(f"Poster thumbnail {path} was evicted before being served")
+                return redirect(movie.url_poster)
+            response = FileResponse(poster, content_type="image/webp")
+        response["ETag"] = etag
+        patch_cache_control(response, public=True, max_age=settings.POSTER_CACHE_MAX_AGE)
+        return response
+
+
+class MovieExportView(APIView):
+    """
+    Stream the full Movie catalog with genres as NDJSON or CSV, for analytics exports.
 
+    This view:
+    - Reads movies with a server-side cursor and prefetches genres per chunk, so memory stays constant.
+    - Streams the response as it is produced, gzipped if `gzip=true` is passed.
+
+    Permission:
+    - Staff users only.
+    """
+    permission_classes = [IsAdminUser]
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name='gzip', type=OpenApiTypes.BOOL, location=OpenApiParameter.QUERY, description="Gzip the export."),
+        ],
+        responses={
+            200: OpenApiResponse(description="The catalog as NDJSON or CSV.", response=OpenApiTypes.BINARY),
+            404: OpenApiResponse(description="Unknown export format."),
+        },
+        description="Stream the full movie catalog with genres. Formats: ndjson, csv.",
+    )
+    def get(self, request, export_format):
+        if export_format not in EXPORT_CONTENT_TYPES:
+            return Response(
+                {"error": f"Unknown export format. Allowed formats are: {', '.join(EXPORT_CONTENT_TYPES)}."},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        use_gzip = request.query_params.get("gzip", "").lower() == "true"
+        filename = f"movies.{export_format}"
+
+        if use_gzip:
+            response = StreamingHttpResponse(stream_catalog(export_format, use_gzip=True), content_type="application/gzip")
+            filename += ".gz"
+        else:
+            response = StreamingHttpResponse(stream_catalog(export_format), content_type=EXPORT_CONTENT_TYPES[export_format])
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
 
 
 class CustomPaginator(Paginator):
@@ -286,6 +484,12 @@ class CustomPaginator(Paginator):
 class CustomPageNumberPagination(PageNumberPagination):
     django_paginator_class = CustomPaginator
 
+class MovieNightCursorPagination(CursorPagination):
+    """
+    Keyset pagination on `(start_time, id)`: each page is one indexed range scan, with no COUNT.
+    """
+    ordering = ("start_time", "id")
+
 class MovieView(ListAPIView):
     """
     A list view to filter movies based on criteria such as genres, country, year, and runtime.
@@ -304,6 +508,19 @@ class MovieView(ListAPIView):
     serializer_class = MovieSerializer
     pagination_class = CustomPageNumberPagination
 
+    def list(self, request, *args, **kwargs):
+        """
+        Read-only fast path: fetch `.values()` rows for the fields declared on `MovieSerializer`
+        and hand them straight to the renderer. The output schema and pagination are unchanged.
+        """
+        queryset = self.filter_queryset(self.get_queryset()).values(*MovieSerializer.Meta.fields)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(page)
+
+        return Response(list(queryset))
+
 
 ############ MovieNight ##############
 class MyMovieNightForAMovieView(ListCreateAPIView):
@@ -346,7 +563,10 @@ class MyMovieNightForAMovieView(ListCreateAPIView):
     def perform_create(self, serializer):
         """
         Automatically set the creator of the movie night to the current authenticated user.
+        Raises `ScheduleConflict` if it overlaps other movie nights of the user.
         """
+        start_time, movie = serializer.validated_data["start_time"], serializer.validated_data["movie"]
+        check_conflicts(self.request.user, start_time, compute_end_time(start_time, movie))
         # Save with the creator
         serializer.save(creator=self.request.user)
 
@@ -378,6 +598,10 @@ class MyMovieNightView(ListCreateAPIView):
         # Ensure start_notification_before is set to a default value (e.g., 0) if not provided
         if 'start_notification_before' not in serializer.validated_data:
             serializer.validated_data['start_notification_before'] = 0
+
+        # Refuse movie nights overlapping other movie nights of the user
+        start_time, movie = serializer.validated_data["start_time"], serializer.validated_data["movie"]
+        check_conflicts(self.request.user, start_time, compute_end_time(start_time, movie))
             
         serializer.save(creator=self.request.user)
 
@@ -385,11 +609,16 @@ class ParticipatingMovieNightView(ListAPIView):
     """
     View for listing all MovieNight instances where the authenticated user
     is either the creator or a confirmed attendance invitee, with detailed info.
+
+    The feed runs a fixed number of queries whatever the number of rows: movie and creator are
+    joined, participants, pending invitees and reminders are prefetched in one query each, and results are
+    cursor-paginated by start time.
     """
-    serializer_class = MovieNightDetailSerializer
+    serializer_class = ParticipatingMovieNightSerializer
     permission_classes = [IsAuthenticated]
     filterset_class = ParticipatingMovieNightFilterSet
-    ordering_fields = ["start_time", "creator"]
+    pagination_class = MovieNightCursorPagination
+    ordering_fields = ["start_time"]
 
     def get_queryset(self):
         """
@@ -400,38 +629,30 @@ class ParticipatingMovieNightView(ListAPIView):
 
         user = self.request.user
 
-        # Filter for the user being either the creator or a confirmed invitee
-        queryset = MovieNight.objects.filter(
-            Q(creator=user) | 
-            Q(invites__invitee=user, invites__attendance_confirmed=True, invites__is_attending=True)
-        ).distinct()  # Use distinct to avoid duplicates
-
-        return queryset
-
-    def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        
-        # Serialize all movie night instances using MovieNightDetailSerializer
-        movie_nights_data = MovieNightDetailSerializer(queryset, many=True).data
-
-        # Loop through each movie night and add invitation status and movie details
-        for movie_night_data in movie_nights_data:
-            movie_night_instance = MovieNight.objects.get(id=movie_night_data['id'])
-
-            # Fetch the movie details
-            movie = movie_night_instance.movie
-            movie_data = {
-                "title": movie.title if movie else None,
-                "runtime_minutes": movie.runtime_minutes if movie else None,
-            }
-
-            # Add invitation status and movie data to each movie night entry
-            movie_night_data.update({
-
-                "movie": movie_data
-            })
-
-        return Response(movie_nights_data, status=status.HTTP_200_OK)
+        # A subquery instead of a join on invites avoids duplicates, so no DISTINCT is needed
+        attending_movie_nights = MovieNightInvitation.objects.filter(
+            invitee=user, attendance_confirmed=True, is_attending=True
+        ).values("movie_night")
+
+        return MovieNight.objects.filter(
+            Q(creator=user) | Q(pk__in=attending_movie_nights)
+        ).select_related("movie", "creator").prefetch_related(
+            Prefetch(
+                "invites",
+                queryset=MovieNightInvitation.objects.filter(
+                    attendance_confirmed=True, is_attending=True
+                ).select_related("invitee"),
+                to_attr="participant_invites",
+            ),
+            Prefetch(
+                "invites",
+                queryset=MovieNightInvitation.objects.filter(
+                    attendance_confirmed=False
+                ).select_related("invitee"),
+                to_attr="pending_invites",
+            ),
+            "reminders",
+        )
     
 class InvitedMovieNightView(ListAPIView):
     """
@@ -453,6 +674,169 @@ class InvitedMovieNightView(ListAPIView):
         return MovieNight.objects.filter(invites__invitee=user)
 
 
+class MyAgendaView(APIView):
+    """
+    View for the authenticated user's agenda: every movie night they created, are attending, or have a
+    pending invitation to, ordered by start time and tagged with a `role`.
+
+    Each source is read with one bounded, indexed query and the sources are merged lazily, under a
+    keyset cursor on `(start_time, id)`. There is no COUNT; follow `next` until it is null.
+    """
+    permission_classes = [IsAuthenticated]
+    page_size = 20
+    max_page_size = 100
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name='cursor', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY, description="Cursor from the previous page's `next`."),
+            OpenApiParameter(name='page_size', type=OpenApiTypes.INT, location=OpenApiParameter.QUERY, description="Items per page (max 100)."),
+            OpenApiParameter(name='start_from', type=OpenApiTypes.DATETIME, location=OpenApiParameter.QUERY, description="Only include movie nights starting at or after this time."),
+        ],
+        responses={
+            200: AgendaItemSerializer(many=True),
+            400: OpenApiResponse(description="Invalid cursor, page size or start time."),
+        },
+        description="Unified agenda of the movie nights the user created, is attending, or is invited to, ordered by start time.",
+    )
+    def get(self, request, *args, **kwargs):
+        try:
+            page_size = min(int(request.query_params.get("page_size", self.page_size)), self.max_page_size)
+            if page_size < 1:
+                raise ValueError
+        except ValueError:
+            return Response({"error": "'page_size' must be a positive integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        start_from = request.query_params.get("start_from")
+        if start_from:
+            try:
+                # Raises ValueError for a well-formed but out of range value, e.g. month 13
+                start_from = parse_datetime(start_from)
+            except ValueError as e:
+                return Response({"error": f"'start_from' is not a valid datetime: {e}."}, status=status.HTTP_400_BAD_REQUEST)
+            if start_from is None:
+                return Response({"error": "'start_from' must be an ISO 8601 datetime."}, status=status.HTTP_400_BAD_REQUEST)
+            # Naive values are in the local time zone
+            if timezone.is_naive(start_from):
+                start_from = timezone.make_aware(start_from)
+
+        try:
+            movie_nights, next_cursor = get_agenda_page(
+                request.user,
+                page_size,
+                cursor=request.query_params.get("cursor"),
+                start_from=start_from,
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        next_url = None
+        if next_cursor:
+            query_params = request.query_params.copy()
+            query_params["cursor"] = next_cursor
+            next_url = request.build_absolute_uri(f"{request.path}?{query_params.urlencode()}")
+
+        serializer = AgendaItemSerializer(movie_nights, many=True, context={"request": request})
+        return Response({"next": next_url, "results": serializer.data})
+
+
+class MovieNightStartTimeSuggestionView(APIView):
+    """
+    API view suggesting start times for a new movie night.
+
+    This view:
+    - Takes the movie, whose runtime gives the length of the night, a window and the invitees' emails.
+    - Only counts the invitees the user shares a movie night or chat group with. Other emails, including
+      those that match no user, are treated as free and not reported, so the endpoint cannot be used to
+      probe strangers' schedules or which emails are registered.
+    - Loads the movie nights the user and those invitees created or are attending in the window with one query.
+    - Sweeps the merged busy intervals once and returns the earliest free slots where the movie fits.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        request=MovieNightStartTimeSuggestionSerializer,
+        responses={
+            200: OpenApiResponse(description="Suggested `slots`, earliest first."),
+            400: OpenApiResponse(description="Invalid payload."),
+        },
+        description="Suggest start times for a movie night that avoid the creator's and invitees' other movie nights.",
+    )
+    def post(self, request, *args, **kwargs):
+        serializer = MovieNightStartTimeSuggestionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        invitee_ids = User.objects.filter(email__in=data["invitees"]).values("pk")
+        connected_ids = connected_user_ids(request.user, invitee_ids)
+
+        slots = suggest_start_times(
+            [request.user.pk, *connected_ids],
+            data["movie"],
+            data["window_start"],
+            data["window_end"],
+            data["limit"],
+        )
+        return Response({"slots": slots})
+
+
+class MyCalendarFeedView(APIView):
+    """
+    View returning the URL of the authenticated user's ICS calendar feed, to subscribe to from a calendar app.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        responses={200: OpenApiResponse(description="The `url` of the user's ICS feed.")},
+        description="Get the subscription URL of the user's movie night calendar feed.",
+    )
+    def get(self, request, *args, **kwargs):
+        url = reverse("movienight_calendar_feed", kwargs={"token": ics.feed_token(request.user)})
+        return Response({"url": request.build_absolute_uri(url)})
+
+
+class MovieNightCalendarFeedView(APIView):
+    """
+    ICS feed of the movie nights a user created or is attending, for calendar apps.
+
+    This view:
+    - Identifies the user by the signed token in the URL, since calendar apps cannot authenticate.
+    - Answers with 304 when `If-None-Match`/`If-Modified-Since` match the user's change counter,
+      without querying the database.
+    - Serves the rendered feed from the cache until the user's movie nights or invitations change.
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    @extend_schema(
+        responses={
+            200: OpenApiResponse(description="The ICS feed.", response=OpenApiTypes.STR),
+            304: OpenApiResponse(description="Not modified."),
+            404: OpenApiResponse(description="Invalid feed token."),
+        },
+        description="ICS calendar feed of a user's movie nights.",
+    )
+    def get(self, request, token):
+        user_id = ics.user_id_from_token(token)
+        if user_id is None:
+            return Response({"error": "Invalid calendar feed."}, status=status.HTTP_404_NOT_FOUND)
+
+        counter, last_modified = ics.get_version(user_id)
+        etag = f'"{user_id}-{counter}"'
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=int(last_modified.timestamp())
+        )
+        if not_modified is not None:
+            response = not_modified
+        else:
+            response = HttpResponse(
+                ics.get_feed(user_id, counter, last_modified), content_type="text/calendar; charset=utf-8"
+            )
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
 class MovieNightDetailView(RetrieveUpdateDestroyAPIView):
     """
     API view for retrieving, updating, or deleting a specific movie night.
@@ -480,7 +864,7 @@ class MovieNightDetailView(RetrieveUpdateDestroyAPIView):
     """
     serializer_class = MovieNightDetailSerializer
     permission_classes = [IsAuthenticated, MovieNightDetailPermission]
-    queryset = MovieNight.objects.all()
+    queryset = MovieNight.objects.select_related("creator").prefetch_related("reminders")
 
     def retrieve(self, request, *args, **kwargs):
         """
@@ -508,11 +892,8 @@ class MovieNightDetailView(RetrieveUpdateDestroyAPIView):
             "is_attending": False
         }
 
-        # Use filter().first() to efficiently check if an invitation exists
-        invitation = MovieNightInvitation.objects.filter(
-            movie_night=movie_night,
-            invitee=request.user
-        ).first()
+        # Shared with the permission check and the serializer, so no further query
+        invitation = get_user_invitation(request, movie_night)
 
         if invitation:
             invitation_status = {
@@ -532,6 +913,173 @@ class MovieNightDetailView(RetrieveUpdateDestroyAPIView):
         })
 
         return Response(movie_night_data)
+
+    def perform_update(self, serializer):
+        """
+        Refuse a new start time or movie that makes the movie night overlap other movie nights of its creator.
+        """
+        movie_night = serializer.instance
+        if "start_time" in serializer.validated_data or "movie" in serializer.validated_data:
+            start_time = serializer.validated_data.get("start_time", movie_night.start_time)
+            movie = serializer.validated_data.get("movie", movie_night.movie)
+            check_conflicts(
+                movie_night.creator, start_time, compute_end_time(start_time, movie), exclude_pk=movie_night.pk
+            )
+        serializer.save()
+
+
+########## MovieNightSeries ############
+class MyMovieNightSeriesView(ListCreateAPIView):
+    """
+    View for listing the movie night series the authenticated user created or is invited to, and creating new ones.
+
+    This view:
+    - Lists the series the user created or is an invitee of.
+    - Creates a series with the user as its creator. No movie night is stored until an occurrence is
+      RSVPed to or its start notification is due.
+    """
+    serializer_class = MovieNightSeriesSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        user = self.request.user
+        return (
+            MovieNightSeries.objects.filter(Q(creator=user) | Q(invitees=user))
+            .distinct()
+            .select_related("creator")
+            .prefetch_related("invitees")
+            .order_by("start_time", "id")
+        )
+
+    def perform_create(self, serializer):
+        serializer.save(creator=self.request.user)
+
+
+class MovieNightSeriesOccurrencesView(APIView):
+    """
+    View listing the occurrences of a movie night series within a window.
+
+    This view:
+    - Allows only the creator and the invitees of the series.
+    - Expands the recurrence rule for the window only, and reads the stored movie nights of the window
+      with one query, so occurrences nobody answered yet cost no rows.
+    - Returns each occurrence with its movie night id and RSVP counters once it is stored, or null and zeros.
+    """
+    permission_classes = [IsAuthenticated, MovieNightSeriesPermission]
+    default_window = timedelta(days=30)
+    max_window = timedelta(days=366)
+
+    def parse_bound(self, request, name, default):
+        """
+        Return the aware datetime of query parameter `name`, naive values being in the local time zone.
+        """
+        if name not in request.query_params:
+            return default
+        value = parse_datetime(request.query_params[name])
+        if value is None:
+            raise ValueError(f"'{name}' must be an ISO 8601 datetime.")
+        return timezone.make_aware(value) if timezone.is_naive(value) else value
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name='start', type=OpenApiTypes.DATETIME, location=OpenApiParameter.QUERY, description="Start of the window. Defaults to now."),
+            OpenApiParameter(name='end', type=OpenApiTypes.DATETIME, location=OpenApiParameter.QUERY, description="End of the window. Defaults to 30 days after its start, at most 366 days."),
+        ],
+        responses={
+            200: OpenApiResponse(description="The occurrences of the window, in order."),
+            400: OpenApiResponse(description="Invalid window."),
+            403: OpenApiResponse(description="Only the creator and the invitees can list occurrences."),
+            404: OpenApiResponse(description="Series not found."),
+        },
+        description="List the occurrences of a movie night series within a window.",
+    )
+    def get(self, request, pk, *args, **kwargs):
+        series = get_object_or_404(MovieNightSeries, pk=pk)
+        self.check_object_permissions(request, series)
+
+        try:
+            start = self.parse_bound(request, "start", timezone.now())
+            end = self.parse_bound(request, "end", start + self.default_window)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if not start < end <= start + self.max_window:
+            return Response({"error": "The window must end after it starts and last at most 366 days."}, status=status.HTTP_400_BAD_REQUEST)
+
+        stored = {
+            movie_night.series_occurrence: movie_night
+            for movie_night in series.movie_nights.filter(series_occurrence__gte=start, series_occurrence__lt=end)
+        }
+        results = []
+        for occurrence in series.occurrences(start, end):
+            movie_night = stored.get(occurrence)
+            results.append({
+                "occurrence": occurrence,
+                "start_time": movie_night.start_time if movie_night else occurrence,
+                "movie_night": movie_night.pk if movie_night else None,
+                "attending_count": movie_night.attending_count if movie_night else 0,
+                "declined_count": movie_night.declined_count if movie_night else 0,
+                "pending_count": movie_night.pending_count if movie_night else 0,
+            })
+        return Response({"results": results})
+
+
+class MovieNightSeriesRsvpView(APIView):
+    """
+    API view for an invitee of a movie night series to answer one of its occurrences.
+
+    This view:
+    - Allows only the invitees of the series.
+    - Stores the movie night of the occurrence on the first RSVP to it.
+    - Refuses to attend an occurrence overlapping other movie nights of the invitee.
+    - Creates or updates the invitee's invitation, already answered, and notifies the creator.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        request=MovieNightSeriesRsvpSerializer,
+        responses={
+            200: MovieNightInvitationSerializer,
+            201: MovieNightInvitationSerializer,
+            400: OpenApiResponse(description="Invalid payload, or not an upcoming occurrence of the series."),
+            403: OpenApiResponse(description="Only the invitees of the series can RSVP."),
+            404: OpenApiResponse(description="Series not found."),
+            409: OpenApiResponse(description="The occurrence overlaps other movie nights of the user."),
+        },
+        description="RSVP to one occurrence of a movie night series.",
+    )
+    def post(self, request, pk, *args, **kwargs):
+        series = get_object_or_404(MovieNightSeries, pk=pk)
+        if not series.invitees.filter(pk=request.user.pk).exists():
+            raise PermissionDenied("Only the invitees of the series can RSVP.")
+
+        serializer = MovieNightSeriesRsvpSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        occurrence = serializer.validated_data["occurrence"]
+        is_attending = serializer.validated_data["is_attending"]
+        if occurrence <= timezone.now() or not series.is_occurrence(occurrence):
+            return Response({"error": "This is not an upcoming occurrence of the series."}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            movie_night = series.materialize(occurrence)
+            if is_attending:
+                check_conflicts(request.user, movie_night.start_time, movie_night.end_time, exclude_pk=movie_night.pk)
+            invitation, created = MovieNightInvitation.objects.get_or_create(
+                movie_night=movie_night,
+                invitee=request.user,
+                defaults={"attendance_confirmed": True, "is_attending": is_attending},
+            )
+            if created:
+                outbox.publish(send_attendance_change, invitation.pk, is_attending)
+            else:
+                invitation.is_attending = is_attending
+                invitation.save()
+
+        return Response(
+            MovieNightInvitationSerializer(invitation).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+
 ########## MovieNightInvitation ############
 class MyMovieNightInvitationView(ListAPIView):
     """
@@ -569,6 +1117,132 @@ class MovieNightInvitationCreateView(CreateAPIView):
         # Save the invitation
         serializer.save(movie_night=movie_night)
 
+class MovieNightBulkInvitationView(APIView):
+    """
+    API view for inviting several users to a MovieNight in one request.
+
+    This view:
+    - Allows only the creator of the movie night to invite others.
+    - Resolves every email in one query and skips users that are already invited in one query.
+    - Creates the remaining invitations with a single `bulk_create`.
+    - Records one `send_invitations` task for all of the new invitations in the outbox.
+    - Reports emails that could not be invited in `errors`, keyed by email.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        request=MovieNightBulkInvitationSerializer,
+        responses={
+            201: OpenApiResponse(description="Invitations created. Emails that could not be invited are listed in `errors`."),
+            400: OpenApiResponse(description="Invalid payload, or none of the emails could be invited."),
+            403: OpenApiResponse(description="Only the creator can invite others."),
+            404: OpenApiResponse(description="Movie night not found."),
+        },
+        description="Invite a list of users, identified by their emails, to a movie night.",
+    )
+    def post(self, request, pk, *args, **kwargs):
+        movie_night = get_object_or_404(MovieNight, pk=pk)
+        if movie_night.creator != request.user:
+            raise PermissionDenied("Only the creator can invite others.")
+
+        serializer = MovieNightBulkInvitationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        emails = serializer.validated_data["invitees"]
+
+        users = {user.email: user for user in User.objects.filter(email__in=emails)}
+        already_invited = set(
+            MovieNightInvitation.objects.filter(movie_night=movie_night, invitee__in=users.values())
+            .values_list("invitee_id", flat=True)
+        )
+
+        errors = {}
+        invitations = []
+        for email in emails:
+            user = users.get(email)
+            if user is None:
+                errors[email] = f"User with email {email} does not exist."
+            elif user == movie_night.creator:
+                errors[email] = "The creator cannot be invited to their own movie night."
+            elif user.pk in already_invited:
+                errors[email] = "This user has already been invited to this movie night."
+            else:
+                invitations.append(
+                    MovieNightInvitation(movie_night=movie_night, invitee=user, attendance_confirmed=False, is_attending=False)
+                )
+
+        if not invitations:
+            return Response({"invited": [], "errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            with transaction.atomic():
+                # bulk_create skips the post_save signals, so the counters are updated here and
+                # notifications are sent by one task
+                invitations = MovieNightInvitation.objects.bulk_create(invitations)
+                MovieNight.adjust_rsvp_counts(movie_night.pk, pending=len(invitations))
+                outbox.publish(send_invitations, [invitation.pk for invitation in invitations])
+        except IntegrityError:
+            # Another request invited some of these users since the check above
+            return Response(
+                {"error": "Some of these users were invited concurrently. Please retry."},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        return Response(
+            {
+                "invited": MovieNightInvitationSerializer(invitations, many=True).data,
+                "errors": errors,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class MovieNightGroupInvitationView(APIView):
+    """
+    API view for inviting every member of a chat group to a MovieNight.
+
+    This view:
+    - Allows only the creator of the movie night, who must also be a member of the chat group.
+    - Creates the invitations with a single `INSERT ... SELECT`, skipping the creator and members already invited.
+    - Records one `send_invitations` task for all of the new invitations in the outbox.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        request={
+            'application/json': {
+                'type': 'object',
+                'properties': {'group_name': {'type': 'string'}},
+                'required': ['group_name'],
+            }
+        },
+        responses={
+            201: OpenApiResponse(description="Number of members invited."),
+            400: OpenApiResponse(description="Missing 'group_name'."),
+            403: OpenApiResponse(description="Only the creator, as a member of the group, can invite it."),
+            404: OpenApiResponse(description="Movie night or chat group not found."),
+        },
+        description="Invite every member of a chat group to a movie night.",
+    )
+    def post(self, request, pk, *args, **kwargs):
+        movie_night = get_object_or_404(MovieNight, pk=pk)
+        if movie_night.creator != request.user:
+            raise PermissionDenied("Only the creator can invite others.")
+
+        group_name = request.data.get("group_name")
+        if not group_name:
+            return Response({"error": "'group_name' is required."}, status=status.HTTP_400_BAD_REQUEST)
+        chat_group = get_object_or_404(ChatGroup, group_name=group_name)
+        if not chat_group.members.filter(pk=request.user.pk).exists():
+            raise PermissionDenied("You can only invite chat groups you are a member of.")
+
+        with transaction.atomic():
+            invitation_pks = invite_chat_group(movie_night, chat_group)
+            if invitation_pks:
+                outbox.publish(send_invitations, invitation_pks)
+
+        return Response({"invited": len(invitation_pks)}, status=status.HTTP_201_CREATED)
+
+
 class MovieNightInvitationDetailView(RetrieveUpdateDestroyAPIView):
     """
     View for retrieving, updating, or deleting a MovieNightInvitation instance.
@@ -581,6 +1255,18 @@ class MovieNightInvitationDetailView(RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated, IsInvitee]  
     queryset = MovieNightInvitation.objects.all() 
 
+    def perform_update(self, serializer):
+        """
+        Refuse to accept an invitation to a movie night that overlaps other movie nights of the invitee.
+        """
+        invitation = serializer.instance
+        if serializer.validated_data.get("is_attending") and not invitation.is_attending:
+            movie_night = invitation.movie_night
+            check_conflicts(
+                invitation.invitee, movie_night.start_time, movie_night.end_time, exclude_pk=movie_night.pk
+            )
+        serializer.save()
+
 ################# Genre ###################
 class GenreView(ListAPIView):
     """
@@ -0,0 +1,38 @@
+"""
+WebSocket consumer pushing new notifications to the authenticated user.
+
+A client connects to `ws/notifications/?token=<access token>`. Once authenticated it receives:
+- `{"type": "unseen_count", "unseenCount": n}` on connection, so it needs no initial request;
+- `{"type": "notification", "notification": {...}}` for each new notification, as published by `push`.
+
+Connections without a valid token are closed with code 4401.
+"""
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from apps.notifications import push, unseen
+
+
+class NotificationConsumer(AsyncJsonWebsocketConsumer):
+
+    async def connect(self):
+        user = self.scope.get("user")
+        if user is None or not user.is_authenticated:
+            await self.close(code=4401)
+            return
+        self.group_name = push.user_group(user.pk)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        unseen_count = await database_sync_to_async(unseen.get_unseen_count)(user.pk)
+        await self.send_json({"type": "unseen_count", "unseenCount": unseen_count})
+
+    async def disconnect(self, code):
+        if hasattr(self, "group_name"):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        # The socket is push only
+        pass
+
+    async def notification_created(self, event):
+        await self.send_json({"type": "notification", "notification": event["notification"]})
@@ -0,0 +1,45 @@
+"""
+JWT authentication of WebSocket connections.
+
+Browsers cannot set headers on a WebSocket handshake, so the access token of `SIMPLE_JWT` is read
+from the `token` query parameter, or else from an `Authorization: Bearer <token>` header. The user
+is put in `scope["user"]`, or an AnonymousUser if the token is missing or invalid.
+"""
+
+from urllib.parse import parse_qs
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+
+def _raw_token(scope):
+    token = parse_qs(scope.get("query_string", b"").decode()).get("token")
+    if token:
+        return token[0].encode()
+    headers = dict(scope.get("headers", []))
+    authorization = headers.get(b"authorization", b"").split()
+    if len(authorization) == 2 and authorization[0].lower() == b"bearer":
+        return authorization[1]
+    return None
+
+
+@database_sync_to_async
+def get_user(raw_token):
+    authentication = JWTAuthentication()
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return AnonymousUser()
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """
+    Middleware authenticating the WebSocket connection with the JWT access token it carries.
+    """
+
+    async def __call__(self, scope, receive, send):
+        raw_token = _raw_token(scope)
+        scope = dict(scope, user=await get_user(raw_token) if raw_token else AnonymousUser())
+        return await super().__call__(scope, receive, send)
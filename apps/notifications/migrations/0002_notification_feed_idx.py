@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-19 18:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', 'timestamp', 'id'], name='notification_feed_idx'),
+        ),
+    ]
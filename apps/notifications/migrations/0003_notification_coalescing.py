@@ -0,0 +1,46 @@
+# Generated by Django 4.2.16 on 2026-10-19 19:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_notification_feed_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='actors',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='count',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='group_key',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='is_pending',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='members',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', 'group_key', 'timestamp'], name='notification_group_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_pending', True)), fields=['timestamp'], name='notification_pending_idx'),
+        ),
+    ]
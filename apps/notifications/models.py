@@ -18,6 +18,17 @@ class Notification(models.Model):
         ('UPD', 'Update'),
         ('CAN', 'Cancellation'),
     ]
+
+    # Latest actors kept on a coalesced notification
+    MAX_ACTORS = 3
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["recipient", "timestamp", "id"], name="notification_feed_idx"),  # Cursor-paginated feed
+            models.Index(fields=["recipient", "group_key", "timestamp"], name="notification_group_idx"),  # Open groups to coalesce into
+            models.Index(fields=["timestamp"], name="notification_pending_idx", condition=models.Q(is_pending=True)),  # Due digests
+        ]
+
     recipient = models.ForeignKey(UserModel, on_delete=models.CASCADE, related_name="received_notifications")
     sender = models.ForeignKey(UserModel, null=True, blank=True, on_delete=models.SET_NULL, related_name="sent_notifications")
     notification_type = models.CharField(max_length=3, choices=NOTIFICATION_TYPES, db_index=True)  # Indexed for fast lookups
@@ -28,3 +39,32 @@ class Notification(models.Model):
     message = models.TextField(blank=True)
     timestamp = models.DateTimeField(auto_now=True)  # Automatically updated with the current timestamp when changed
     is_seen = models.BooleanField(default=False, db_index=True)
+    # Coalescing: notifications with the same type and group key are merged into one row while it is unseen
+    group_key = models.CharField(max_length=100, blank=True)
+    count = models.PositiveIntegerField(default=1)  # Number of events merged into this notification
+    actors = models.JSONField(default=list, blank=True)  # Emails of the latest actors, most recent first
+    # `[object id, actor email]` of each distinct event merged into a per-actor group, most recent first
+    members = models.JSONField(default=list, blank=True)
+    is_pending = models.BooleanField(default=False)  # Held for the next digest, hidden from the feed until then
+
+    def add_member(self, object_id, email):
+        """
+        Put the event of `object_id` by `email` first in the members, replacing an earlier event of the same object.
+        """
+        self.members = [[object_id, email]] + [member for member in self.members if member[0] != object_id]
+        self._sync_members()
+
+    def remove_member(self, object_id):
+        """
+        Remove the event of `object_id` from the members. Returns False if it was not a member.
+        """
+        members = [member for member in self.members if member[0] != object_id]
+        if len(members) == len(self.members):
+            return False
+        self.members = members
+        self._sync_members()
+        return True
+
+    def _sync_members(self):
+        self.count = len(self.members)
+        self.actors = [email for object_id, email in self.members[:self.MAX_ACTORS]]
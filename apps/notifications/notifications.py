@@ -3,20 +3,166 @@
 This module handles notifications for various movie night events such as invitations, attendance changes, 
 movie night updates, reminders, and cancellations. It uses Django's content types framework and Celery tasks 
 to send asynchronous notifications to users.
+
+Notifications with a group key are coalesced: an event of the same type and group as an unseen
+notification of the recipient from the last `COALESCE_WINDOW` updates that notification (its count, latest
+actors, message and timestamp) instead of adding a row. Types listed in the `NOTIFICATION_DIGEST_TYPES`
+setting are held instead: they are merged into one pending notification per group, hidden from the feed
+until `send_digest` releases them.
 """
 
+from apps.notifications.models import Notification
 from apps.notifications.serializers import NotificationSerializer
+from apps.notifications import push, unseen
 from django.contrib.contenttypes.models import ContentType
 from apps.movies.models import MovieNightInvitation, MovieNight
 from django.contrib.auth import get_user_model
 import logging
+from datetime import timedelta
+from itertools import islice
+from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
-from django.db.models import F
+from django.utils.dateparse import parse_datetime
 
 logger = logging.getLogger(__name__)
 
 User = get_user_model()
 
+# Notifications inserted per INSERT statement by `notify_many`
+NOTIFICATION_BATCH_SIZE = 500
+# Events of the same type and group within this window are merged into one notification
+COALESCE_WINDOW = timedelta(hours=1)
+
+
+def is_digest_type(notification_type):
+    """
+    Returns True if notifications of `notification_type` are held for the periodic digest.
+    """
+    return notification_type in settings.NOTIFICATION_DIGEST_TYPES
+
+
+def open_groups(notification_type, group_key, recipient_ids, now):
+    """
+    Returns the notifications, locked and oldest first, that new `notification_type` events of `group_key`
+    are merged into: the unseen ones from the last `COALESCE_WINDOW`, or for digest types the pending ones.
+    Must be called in a transaction.
+    """
+    queryset = Notification.objects.select_for_update().filter(
+        recipient_id__in=recipient_ids, notification_type=notification_type, group_key=group_key, is_seen=False
+    )
+    if is_digest_type(notification_type):
+        queryset = queryset.filter(is_pending=True)
+    else:
+        queryset = queryset.filter(is_pending=False, timestamp__gte=now - COALESCE_WINDOW)
+    return queryset.order_by("timestamp", "pk")
+
+
+def notify_many(notification_type, model, object_id, message, recipient_ids, sender_id=None, group_key="", batch_size=NOTIFICATION_BATCH_SIZE):
+    """
+    Sends the same notification to every user in `recipient_ids`.
+
+    Args:
+        notification_type (str): One of `Notification.NOTIFICATION_TYPES`.
+        model (Model): The model class of the related object, whose content type is resolved once.
+        object_id (int): The primary key of the related object.
+        message (str): The message of the notification.
+        recipient_ids (iterable): The primary keys of the recipients.
+        sender_id (int): The primary key of the sender, if any.
+        group_key (str): If given, the notification is merged into the open notification of this group
+            of each recipient who has one (see `open_groups`).
+
+    The payload is validated once with `NotificationSerializer`, then the open groups are updated with
+    one `bulk_update` and the other rows inserted with `bulk_create` in chunks of `batch_size`, so the
+    number of queries does not grow with the recipients. Once the transaction commits, the unseen counts
+    of the recipients are bumped and the notifications pushed to their WebSocket, unless they are held
+    for the digest.
+    Returns the number of notifications created or updated.
+    """
+    serializer = NotificationSerializer(
+        data={
+            'notification_type': notification_type,
+            'content_type': ContentType.objects.get_for_model(model).id,
+            'object_id': object_id,
+            'message': message,
+        }
+    )
+    if not serializer.is_valid():
+        logger.error(f"Notification serialization error: {serializer.errors}")
+        return 0
+    is_pending = is_digest_type(notification_type)
+    recipient_ids = list(recipient_ids)
+    # No savepoint: the open groups only need to stay locked until the insert
+    with transaction.atomic(savepoint=False):
+        merged = []
+        if group_key:
+            now = timezone.now()
+            # Oldest first, so a recipient with several open groups is merged into the latest
+            merged = list({
+                notification.recipient_id: notification
+                for notification in open_groups(notification_type, group_key, recipient_ids, now)
+            }.values())
+            for notification in merged:
+                notification.count += 1
+                notification.message = message
+                notification.sender_id = sender_id
+                notification.object_id = object_id
+                notification.is_read = False
+                notification.timestamp = now
+            Notification.objects.bulk_update(
+                merged, ["count", "message", "sender", "object_id", "is_read", "timestamp"], batch_size=batch_size
+            )
+            merged_ids = {notification.recipient_id for notification in merged}
+            recipient_ids = [recipient_id for recipient_id in recipient_ids if recipient_id not in merged_ids]
+        notifications = [
+            Notification(
+                recipient_id=recipient_id,
+                sender_id=sender_id,
+                group_key=group_key,
+                is_pending=is_pending,
+                **serializer.validated_data,
+            )
+            for recipient_id in recipient_ids
+        ]
+        Notification.objects.bulk_create(notifications, batch_size=batch_size)
+        if not is_pending:
+            # bulk_create sends no post_save, so the unseen counts are bumped and the notifications pushed here.
+            # Merged notifications were already unseen, they are only pushed again.
+            transaction.on_commit(lambda: unseen.bump_unseen_counts(recipient_ids))
+            transaction.on_commit(lambda: push.publish(merged + notifications))
+    return len(merged) + len(notifications)
+
+
+def send_digest(batch_size=NOTIFICATION_BATCH_SIZE):
+    """
+    Releases the notifications held for the digest, one batch per transaction.
+
+    Each pending notification already merges all the events of its group since the last digest, so the
+    recipients get one notification per group. The released notifications are stamped with the current
+    time, so they show at the top of the feed; once each batch commits, the unseen counts of their
+    recipients are bumped and the notifications pushed to their WebSocket. Rows are claimed with
+    `SKIP LOCKED`, so concurrent runs release different batches.
+    Returns the number of notifications released.
+    """
+    released = 0
+    while True:
+        with transaction.atomic():
+            notifications = list(
+                Notification.objects.select_for_update(skip_locked=True).filter(is_pending=True).order_by("pk")[:batch_size]
+            )
+            now = timezone.now()
+            for notification in notifications:
+                notification.is_pending = False
+                notification.timestamp = now
+            Notification.objects.bulk_update(notifications, ["is_pending", "timestamp"])
+            recipient_ids = [notification.recipient_id for notification in notifications]
+            # Bound now: within an outer transaction, the callbacks of every batch run after the loop
+            transaction.on_commit(lambda recipient_ids=recipient_ids: unseen.bump_unseen_counts(recipient_ids))
+            transaction.on_commit(lambda notifications=notifications: push.publish(notifications))
+        released += len(notifications)
+        if len(notifications) < batch_size:
+            return released
+
 
 def send_invitation(movie_night_invitation):
     """
@@ -52,6 +198,78 @@ def send_invitation(movie_night_invitation):
         logger.error(f"Notification serialization error: {serializer.errors}")    
 
 
+def send_invitations(movie_night_invitations, batch_size=NOTIFICATION_BATCH_SIZE):
+    """
+    Sends an invitation notification to the invitee of each invitation.
+
+    Args:
+        movie_night_invitations (QuerySet): Invitations with `movie_night__creator` and `invitee` selected.
+        batch_size (int): The number of notifications inserted per statement.
+
+    Used for invitations created in bulk, which do not go through the `post_save` signal. The sender and
+    recipients are taken from the invitations themselves instead of being looked up one by one, and the
+    notifications are inserted with `bulk_create` in batches of `batch_size`, as in `notify_many`. Once
+    each batch commits, the unseen counts of its recipients are bumped and its notifications pushed.
+    Returns the number of notifications created.
+    """
+    content_type = ContentType.objects.get_for_model(MovieNightInvitation)
+    is_pending = is_digest_type('INV')
+    created = 0
+    invitations = movie_night_invitations.iterator(chunk_size=batch_size)
+    while batch := list(islice(invitations, batch_size)):
+        notifications = [
+            Notification(
+                notification_type='INV',
+                content_type=content_type,
+                object_id=movie_night_invitation.id,
+                message=f"{movie_night_invitation.movie_night.creator.email} have invited you to a movie night.",
+                sender_id=movie_night_invitation.movie_night.creator_id,
+                recipient_id=movie_night_invitation.invitee_id,
+                is_pending=is_pending,
+            )
+            for movie_night_invitation in batch
+        ]
+        with transaction.atomic(savepoint=False):
+            Notification.objects.bulk_create(notifications)
+            if not is_pending:
+                # Bound now: within an outer transaction, the callbacks of every batch run after the loop
+                recipient_ids = [notification.recipient_id for notification in notifications]
+                transaction.on_commit(lambda recipient_ids=recipient_ids: unseen.bump_unseen_counts(recipient_ids))
+                transaction.on_commit(lambda notifications=notifications: push.publish(notifications))
+        created += len(notifications)
+    return created
+
+
+def _response_message(email, count, response):
+    if count == 1:
+        return f"{email} have {response} to participate in your movie night."
+    return f"{email} and {count - 1} other(s) have {response} to participate in your movie night."
+
+
+def _response_group(movie_night_id, response):
+    return f"movienight:{movie_night_id}:{response}"
+
+
+def _withdraw_response(recipient, movie_night_invitation, response, now):
+    """
+    Takes the response of `movie_night_invitation` out of the creator's open notification of `response`
+    responses, which is deleted if it was its only response.
+    """
+    group_key = _response_group(movie_night_invitation.movie_night_id, response)
+    notification = open_groups('RES', group_key, [recipient.pk], now).last()
+    if notification is None or not notification.remove_member(movie_night_invitation.pk):
+        return
+    if not notification.members:
+        notification.delete()
+        if not notification.is_pending:
+            transaction.on_commit(lambda: unseen.drop_unseen_counts([recipient.pk]))
+        return
+    notification.message = _response_message(notification.actors[0], notification.count, response)
+    notification.save()
+    if not notification.is_pending:
+        transaction.on_commit(lambda: push.publish([notification]))
+
+
 def send_attendance_change(movie_night_invitation, is_attending):
     """
     Sends a notification when an invitee accepts or refuses a movie night invitation.
@@ -61,6 +279,9 @@ def send_attendance_change(movie_night_invitation, is_attending):
         is_attending (bool): A boolean indicating whether the invitee is attending the movie night.
     
     The function notifies the movie night creator about the invitee's response (accepted or refused).
+    Responses of the same kind to the same movie night are coalesced: while the creator has not seen
+    the notification, it counts the distinct invitations that responded and keeps the latest responders.
+    A response that changes is moved out of the open notification of the other kind.
     """
     try:
         sender = User.objects.get(email=movie_night_invitation.invitee.email)
@@ -72,140 +293,125 @@ def send_attendance_change(movie_night_invitation, is_attending):
     except User.DoesNotExist:
         logger.error("Recipient does not exist")
         return
-    response = "accepted" if is_attending else "refused"
-    serializer = NotificationSerializer(
-        data={
-            'notification_type': 'RES',
-            'content_type': ContentType.objects.get_for_model(MovieNightInvitation).id,
-            'object_id': movie_night_invitation.id,
-            'message': f"{sender.email} have {response} to participate in your movie night."
-        }
-    )
-    if serializer.is_valid():
-        serializer.save(sender=sender, recipient=recipient)
-    else:
-        logger.error(f"Notification serialization error: {serializer.errors}")    
+    response, other_response = ("accepted", "refused") if is_attending else ("refused", "accepted")
+    group_key = _response_group(movie_night_invitation.movie_night_id, response)
+    with transaction.atomic():
+        now = timezone.now()
+        _withdraw_response(recipient, movie_night_invitation, other_response, now)
+        notification = open_groups('RES', group_key, [recipient.pk], now).last()
+        if notification is not None:
+            # Members are keyed by invitation, so an invitee responding again is not counted twice
+            notification.add_member(movie_night_invitation.pk, sender.email)
+            notification.sender = sender
+            notification.content_object = movie_night_invitation
+            notification.message = _response_message(sender.email, notification.count, response)
+            notification.is_read = False
+            notification.save()
+            if not notification.is_pending:
+                transaction.on_commit(lambda: push.publish([notification]))
+            return
+        serializer = NotificationSerializer(
+            data={
+                'notification_type': 'RES',
+                'content_type': ContentType.objects.get_for_model(MovieNightInvitation).id,
+                'object_id': movie_night_invitation.id,
+                'message': _response_message(sender.email, 1, response)
+            }
+        )
+        if serializer.is_valid():
+            serializer.save(
+                sender=sender,
+                recipient=recipient,
+                group_key=group_key,
+                actors=[sender.email],
+                members=[[movie_night_invitation.pk, sender.email]],
+                is_pending=is_digest_type('RES'),
+            )
+        else:
+            logger.error(f"Notification serialization error: {serializer.errors}")    
+
+
+def _snapshot_start_time(snapshot):
+    start_time = snapshot["start_time"]
+    return parse_datetime(start_time) if isinstance(start_time, str) else start_time
 
 
-def send_movie_night_update(movie_night, start_time):
+def send_movie_night_update(snapshot):
     """
     Sends a notification to all invitees who accepted the invitation, informing them about 
     the updated start time for the movie night.
     
     Args:
-        movie_night (MovieNight): The movie night instance.
-        start_time (datetime): The new start time for the movie night.
+        snapshot (dict): The movie night snapshot built by `MovieNight.snapshot` when the start time changed.
     
-    The function notifies the invitees of the updated start time for the event.
+    The function notifies the invitees of the updated start time for the event. Sender and recipients
+    are taken from the snapshot, so no query is needed to find them. Successive changes are coalesced
+    into the unseen update notification of each invitee, which then carries the latest start time.
     """
-    try:
-        sender = User.objects.get(email=movie_night.creator.email)
-    except User.DoesNotExist:
-        logger.error("Sender does not exist")
-        return
+    start_time = _snapshot_start_time(snapshot)
+    notify_many(
+        'UPD',
+        MovieNight,
+        snapshot["id"],
+        f"{snapshot['creator_email']} have changed start time for a movie night to {start_time}.",
+        snapshot["attendee_ids"],
+        sender_id=snapshot["creator_id"],
+        group_key=f"movienight:{snapshot['id']}",
+    )
 
-    recipients = [
-        invite.invitee for invite in movie_night.invites.filter(is_attending=True)
-    ]
-    
-    for recipient in recipients:
-        serializer = NotificationSerializer(
-            data={
-                'notification_type': 'UPD',
-                'content_type': ContentType.objects.get_for_model(MovieNight).id,
-                'object_id': movie_night.id,
-                'message': f"{sender.email} have changed start time for a movie night to {start_time}."
-            }
-        )
-        if serializer.is_valid():
-            
-            serializer.save(sender=sender, recipient=recipient)
-        else:
-            logger.error(f"Notification serialization error: {serializer.errors}")   
+
+def _format_offset(offset):
+    """
+    Returns `offset` in words, e.g. "1 day, 2 hours", to the minute.
+    """
+    hours, seconds = divmod(offset.seconds, 3600)
+    parts = [(offset.days, "day"), (hours, "hour"), (seconds // 60, "minute")]
+    return ", ".join(f"{value} {unit}{'s' if value > 1 else ''}" for value, unit in parts if value)
 
 
-def send_starting_notification(movie_night):
+def send_starting_notification(movie_night, offset):
     """
     Sends a notification reminding the creator and invitees that the movie night is starting soon.
     
     Args:
         movie_night (MovieNight): The movie night instance.
+        offset (timedelta): The offset of the reminder before the start of the movie night.
     
     The function sends notifications to the creator and all accepted invitees, reminding them 
-    that the movie night is starting soon.
-    """
-    recipients = [
-        invite.invitee for invite in movie_night.invites.filter(is_attending=True)
-    ]
-    recipients.append(movie_night.creator)
-    
-    for recipient in recipients:
-        serializer = NotificationSerializer(
-            data={
-                'notification_type': 'REM',
-                'content_type': ContentType.objects.get_for_model(MovieNight).id,
-                'object_id': movie_night.id,
-                'message': f"The movie night that you have participated will start soon."
-            }
-        )
-        if serializer.is_valid():
-            serializer.save(recipient=recipient)
-        else:
-            logger.error(f"Notification serialization error: {serializer.errors}")       
-    movie_night.start_notification_sent = True
-    movie_night.save()
-
-
-def notify_of_starting_soon():
+    that the movie night is starting in `offset`, so the reminders of one schedule can be told apart.
     """
-    Sends notifications for movie nights that are starting soon.
-    
-    The function finds all movie nights that have not sent a starting notification yet
-    and are within the 'start_notification_before' window. It then sends a reminder
-    notification to the creator and accepted invitees.
-    """
-    movie_nights = MovieNight.objects.filter(
-        start_notification_sent=False,
-        start_time__lt=timezone.now() + F('start_notification_before')
+    recipient_ids = list(movie_night.invites.filter(is_attending=True).values_list("invitee_id", flat=True))
+    recipient_ids.append(movie_night.creator_id)
+    delay = _format_offset(offset)
+    message = (
+        f"The movie night that you have participated will start in {delay}." if delay
+        else "The movie night that you have participated is starting now."
     )
-
-    for movie_night in movie_nights:
-        send_starting_notification(movie_night)
+    notify_many('REM', MovieNight, movie_night.id, message, recipient_ids)
+    # A targeted update, so a stale instance never overwrites a concurrent change of the movie night
+    MovieNight.objects.filter(pk=movie_night.pk).update(start_notification_sent=True)
+    movie_night.start_notification_sent = True
 
 
-def send_movie_night_delete(movie_night):
+def send_movie_night_delete(snapshot):
     """
     Sends a cancellation notification to all invitees when a movie night is canceled.
     
     Args:
-        movie_night (MovieNight): The movie night instance.
+        snapshot (dict): The movie night snapshot built by `MovieNight.snapshot` before it was deleted.
     
     The function notifies all accepted invitees that the movie night has been canceled.
+    It reads nothing from the deleted movie night, everything comes from the snapshot.
     """
-    try:
-        sender = User.objects.get(email=movie_night.creator.email)
-    except User.DoesNotExist:
-        logger.error("Sender does not exist")
-        return
-
-    recipients = [
-        invite.invitee for invite in movie_night.invites.filter(is_attending=True)
-    ]
-
-    formatted_start_time = movie_night.start_time.strftime('%Y-%m-%d %H:%M:%S')
-    for recipient in recipients:
-        serializer = NotificationSerializer(
-            data={
-                'notificcation_type': 'CAN',
-                'content_type': ContentType.objects.get_for_model(MovieNight).id,
-                'object_id': movie_night.id,
-                'message': f"{sender.email} have canceled a movie night ({movie_night.movie} at {formatted_start_time})."
-            }
-        )
-        if serializer.is_valid():
-            serializer.save(sender=sender, recipient=recipient)
-        else:
-            logger.error(f"Notification serialization error: {serializer.errors}")
+    formatted_start_time = _snapshot_start_time(snapshot).strftime('%Y-%m-%d %H:%M:%S')
+    notify_many(
+        'CAN',
+        MovieNight,
+        snapshot["id"],
+        f"{snapshot['creator_email']} have canceled a movie night ({snapshot['title']} at {formatted_start_time}).",
+        snapshot["attendee_ids"],
+        sender_id=snapshot["creator_id"],
+    )
 
 """
 NGUYEN Le Diem Quynh lnguye220903@gmail.com
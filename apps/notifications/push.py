@@ -0,0 +1,54 @@
+"""
+Real-time push of new notifications to the WebSocket of their recipient.
+
+Each connected user is subscribed to a personal group of the channel layer (see `consumers`).
+`publish` sends one message per notification to the group of its recipient. It is called once the
+transaction creating the notifications commits, so clients are never told about rolled-back rows.
+Pushing is best effort: a client that missed a message gets the notification from the feed.
+"""
+
+import logging
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+logger = logging.getLogger(__name__)
+
+
+def user_group(user_id):
+    """
+    Returns the name of the channel layer group of `user_id`.
+    """
+    return f"notifications.user.{user_id}"
+
+
+def payload(notification):
+    """
+    Returns the message pushed for `notification`: the fields of the feed that need no further query.
+    """
+    return {
+        "id": notification.id,
+        "notification_type": notification.notification_type,
+        "content_type": notification.content_type_id,
+        "object_id": notification.object_id,
+        "message": notification.message,
+        "timestamp": notification.timestamp.isoformat(),
+        "is_read": notification.is_read,
+        "is_seen": notification.is_seen,
+        "count": notification.count,
+        "actors": notification.actors,
+    }
+
+
+def publish(notifications):
+    """
+    Push each notification in `notifications` to the group of its recipient.
+    """
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    group_send = async_to_sync(channel_layer.group_send)
+    for notification in notifications:
+        try:
+            group_send(user_group(notification.recipient_id), {"type": "notification.created", "notification": payload(notification)})
+        except Exception as e:
+            logger.error(f"Failed to push notification {notification.id}: {str(e)}")
@@ -1,12 +1,62 @@
+from collections import defaultdict
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Manager
 from rest_framework import serializers
 from apps.notifications.models import Notification
 from apps.movies.models import MovieNight, MovieNightInvitation
 from apps.movies.serializers import MovieNightInvitationSerializer, MovieNightSerializer
 
+# Relations read by the nested serializer of each type of related object
+CONTENT_OBJECT_RELATED = {
+    MovieNight: ["creator"],
+    MovieNightInvitation: ["invitee"],
+}
+
+
+def prefetch_content_objects(notifications):
+    """
+    Load the related objects of `notifications` with one query per content type, joined with the
+    relations their nested serializer reads, and cache them on the notifications.
+    """
+    field = Notification._meta.get_field("content_object")
+    ids_by_type = defaultdict(set)
+    for notification in notifications:
+        if notification.content_type_id is not None and notification.object_id is not None:
+            ids_by_type[notification.content_type_id].add(notification.object_id)
+
+    objects = {}
+    for content_type_id, ids in ids_by_type.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        if model is None:
+            continue
+        queryset = model._base_manager.filter(pk__in=ids).select_related(*CONTENT_OBJECT_RELATED.get(model, []))
+        objects.update({(content_type_id, obj.pk): obj for obj in queryset})
+
+    for notification in notifications:
+        if notification.content_type_id is not None:
+            # Objects deleted since are cached as None, so they are not looked up again
+            field.set_cached_value(notification, objects.get((notification.content_type_id, notification.object_id)))
+
+
+class NotificationListSerializer(serializers.ListSerializer):
+    """
+    List serializer for notifications, which loads the related objects of the whole list in batches.
+    """
+
+    def to_representation(self, data):
+        notifications = list(data.all() if isinstance(data, Manager) else data)
+        prefetch_content_objects(notifications)
+        return super().to_representation(notifications)
+
+
 class NotificationSerializer(serializers.ModelSerializer):
     """
     Serializer for Notification model. Serializes notification data including sender, recipient,
     and related content object.
+
+    `count` is the number of events coalesced into the notification and `actors` the emails of the
+    latest ones. Lists load their related objects in batches (see `prefetch_content_objects`); querysets should
+    select `recipient` and `sender__profile`, so a page takes a constant number of queries.
     """
     recipient_email = serializers.EmailField(source='recipient.email', read_only=True)
     sender_email = serializers.EmailField(source='sender.email', read_only=True, allow_null=True)
@@ -26,9 +76,12 @@ class NotificationSerializer(serializers.ModelSerializer):
             'message', 
             'timestamp',
             'is_seen',
-            'sender_avatar_url'
+            'sender_avatar_url',
+            'count',
+            'actors',
         ]
-        read_only_fields = ['timestamp', 'sender_avatar_url']
+        list_serializer_class = NotificationListSerializer
+        read_only_fields = ['timestamp', 'sender_avatar_url', 'count', 'actors']
 
     def get_sender_avatar_url(self, obj):
         sender = obj.sender
@@ -58,7 +111,7 @@ class NotificationSerializer(serializers.ModelSerializer):
         elif isinstance(content_object, MovieNightInvitation):
             # Get the serialized data and include the movie_night.id field
             invitation_data = MovieNightInvitationSerializer(content_object).data
-            invitation_data['movie_night_id'] = content_object.movie_night.id
+            invitation_data['movie_night_id'] = content_object.movie_night_id
             return invitation_data
         
         # Default behavior for other content types
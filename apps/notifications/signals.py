@@ -0,0 +1,25 @@
+"""
+Signal handlers of the notifications app.
+
+- notification_created: Bumps the cached unseen count of the recipient of a new notification and pushes it
+  to their WebSocket, once the transaction commits. Notifications held for the digest are skipped.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from apps.notifications.models import Notification
+from apps.notifications import push, unseen
+
+
+@receiver(post_save, sender=Notification, dispatch_uid="notification_unseen_count")
+def notification_created(sender, instance, created, **kwargs):
+    """
+    Signal to count a new unseen notification in the cached unseen count of its recipient, and to push
+    it to the recipient's WebSocket. Notifications inserted in bulk do not send it; `notify_many` does both itself.
+    """
+    if not created or instance.is_pending:
+        return
+    if not instance.is_seen:
+        transaction.on_commit(lambda: unseen.bump_unseen_counts([instance.recipient_id]))
+    transaction.on_commit(lambda: push.publish([instance]))
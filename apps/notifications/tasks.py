@@ -0,0 +1,20 @@
+"""
+Celery tasks for the notifications app.
+
+Tasks:
+- `reconcile_unseen_counts`: Counts again the cached unseen counts of the users whose notifications changed recently.
+- `send_notification_digest`: Releases the notifications held for the digest.
+"""
+
+from celery import shared_task
+from apps.notifications import notifications, unseen
+
+
+@shared_task
+def reconcile_unseen_counts():
+    return unseen.reconcile_unseen_counts()
+
+
+@shared_task
+def send_notification_digest():
+    return notifications.send_digest()
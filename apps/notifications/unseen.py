@@ -0,0 +1,87 @@
+"""
+Per-user count of unseen notifications, kept in the cache.
+
+The notification feed returns the count with every page, so it is not counted from the database on
+each request:
+
+- It is bumped once the transaction creating notifications commits: by the `post_save` signal for
+  notifications saved one by one, and by `notify_many` for notifications inserted in bulk.
+- It is decreased when an unseen notification is deleted, e.g. a coalesced response withdrawn.
+- It is set to 0 when the user marks all their notifications as seen.
+- Notifications held for the digest are not counted until they are released.
+- A missing counter is counted from the database on first read. `reconcile_unseen_counts`, run
+  periodically, counts again the users whose notifications changed recently, which repairs
+  increments lost to a race with a reset.
+"""
+
+from collections import Counter
+from datetime import timedelta
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+from apps.notifications.models import Notification
+
+UNSEEN_COUNT_TIMEOUT = 60 * 60 * 24
+# Users whose notifications changed within this window are reconciled
+RECONCILE_WINDOW = timedelta(minutes=20)
+
+
+def _key(user_id):
+    return f"notifications_unseen:{user_id}"
+
+
+def get_unseen_count(user_id):
+    """
+    Return the number of unseen notifications of `user_id`, counted from the database only if the counter is missing.
+    """
+    count = cache.get(_key(user_id))
+    if count is None:
+        count = Notification.objects.filter(recipient_id=user_id, is_seen=False, is_pending=False).count()
+        cache.add(_key(user_id), count, timeout=UNSEEN_COUNT_TIMEOUT)
+    return count
+
+
+def bump_unseen_counts(user_ids):
+    """
+    Add one to the counter of each user in `user_ids`, once per occurrence.
+    """
+    for user_id, created in Counter(user_ids).items():
+        try:
+            cache.incr(_key(user_id), created)
+        except ValueError:
+            # No counter yet: it is counted from the database on first read
+            pass
+
+
+def drop_unseen_counts(user_ids):
+    """
+    Subtract one from the counter of each user in `user_ids`, once per occurrence, for unseen notifications deleted.
+    """
+    for user_id, deleted in Counter(user_ids).items():
+        try:
+            cache.decr(_key(user_id), deleted)
+        except ValueError:
+            pass
+
+
+def reset_unseen_count(user_id):
+    cache.set(_key(user_id), 0, timeout=UNSEEN_COUNT_TIMEOUT)
+
+
+def reconcile_unseen_counts(window=RECONCILE_WINDOW):
+    """
+    Count again the unseen notifications of the users who received or updated notifications within
+    `window`, in two queries. Returns the number of users reconciled.
+    """
+    recent = Notification.objects.filter(timestamp__gte=timezone.now() - window)
+    user_ids = set(recent.values_list("recipient_id", flat=True).distinct())
+    if not user_ids:
+        return 0
+    counts = dict(
+        Notification.objects.filter(recipient_id__in=user_ids, is_seen=False, is_pending=False)
+        .order_by()
+        .values_list("recipient_id")
+        .annotate(count=Count("pk"))
+    )
+    cache.set_many({_key(user_id): counts.get(user_id, 0) for user_id in user_ids}, timeout=UNSEEN_COUNT_TIMEOUT)
+    return len(user_ids)
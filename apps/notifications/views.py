@@ -10,14 +10,36 @@ from apps.notifications.models import Notification
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from rest_framework import status
+from rest_framework.pagination import CursorPagination
 from rest_framework.views import APIView
+from apps.notifications import unseen
+
+
+class NotificationCursorPagination(CursorPagination):
+    """
+    Keyset pagination on `(timestamp, id)`, newest first, or oldest first with `?ordering=timestamp`:
+    each page is one range scan of the `notification_feed_idx` index, with no COUNT.
+    """
+    ordering = ("-timestamp", "-id")
+
+    def get_ordering(self, request, queryset, view):
+        if request.query_params.get("ordering") == "timestamp":
+            return ("timestamp", "id")
+        return self.ordering
 
 
 class MyNotificationView(ListAPIView):
+    """
+    View for listing the notifications of the authenticated user, one cursor page at a time.
+
+    Each page also carries `unseenCount`, the number of unseen notifications, read from a counter
+    kept in the cache (see `apps.notifications.unseen`).
+    """
     serializer_class = NotificationSerializer
     filter_fields = ["is_read", "notification_type"]
     ordering_fields = ["timestamp"]
     permission_classes = [IsAuthenticated]
+    pagination_class = NotificationCursorPagination
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -42,10 +64,14 @@ class MyNotificationView(ListAPIView):
                 description="Unauthorized. The user must be authenticated to access notifications.",
             ),
         },
-        description="Retrieve a list of notifications for the authenticated user. The results can be filtered based on `is_read` and `notification_type` and ordered based on `timestamp` ."
+        description="Retrieve the notifications of the authenticated user, cursor-paginated, with the number of unseen notifications in `unseenCount`. The results can be filtered based on `is_read` and `notification_type` and ordered based on `timestamp` ."
     )
     def get_queryset(self):
-        queryset = Notification.objects.filter(recipient=self.request.user)
+        # Notifications held for the digest are not shown until it is sent
+        queryset = (
+            Notification.objects.filter(recipient=self.request.user, is_pending=False)
+            .select_related("recipient", "sender__profile")
+        )
         
         # Apply the 'is_read' filter if present in the query parameters
         is_read = self.request.query_params.get('is_read')
@@ -58,25 +84,16 @@ class MyNotificationView(ListAPIView):
         if notification_type:
             queryset = queryset.filter(notification_type=notification_type)
 
-        # Apply ordering based on 'timestamp' or '-timestamp'
-        ordering = self.request.query_params.get('ordering')
-        if ordering in ['timestamp', '-timestamp']:
-            queryset = queryset.order_by(ordering)
-        else:
-            queryset = queryset.order_by('-timestamp')  # Default to descending order
-
+        # Ordering on 'timestamp' or '-timestamp' is applied by the cursor pagination
         return queryset
+
     def list(self, request, *args, **kwargs):
         queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        
-        # Calculate unseen count
-        unseen_count = Notification.objects.filter(recipient=request.user, is_seen=False).count()
-        
-        return Response({
-            'results': serializer.data,
-            'unseenCount': unseen_count
-        })
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        response = self.get_paginated_response(serializer.data)
+        response.data['unseenCount'] = unseen.get_unseen_count(request.user.pk)
+        return response
 class MarkReadNotificationView(UpdateAPIView):
     """
     API view to mark a specific notification as read.
@@ -146,10 +163,12 @@ class MarkAllAsSeenView(APIView):
         Marks all notifications as seen for the authenticated user.
         """
         # Fetch all unread notifications for the authenticated user
-        notifications = Notification.objects.filter(recipient=request.user, is_seen=False)
+        notifications = Notification.objects.filter(recipient=request.user, is_seen=False, is_pending=False)
         # Update the is_seen field for these notifications
         if notifications.exists():
             notifications.update(is_seen=True)
+            unseen.reset_unseen_count(request.user.pk)
             return Response({"message": "All notifications marked as seen."}, status=status.HTTP_200_OK)
         else:
+            unseen.reset_unseen_count(request.user.pk)
             return Response({"message": "No unseen notifications found."}, status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
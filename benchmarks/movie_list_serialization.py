@@ -0,0 +1,74 @@
+"""
+Micro-benchmark for the movie list endpoints (`MovieView`, `MovieSearchResultsView`).
+
+It compares the original path (model instances rendered through `MovieSerializer`) with the
+`.values()` fast path, both rendered to JSON with DRF's `JSONRenderer`, on pages of `--rows` movies.
+
+Usage (runs against a throw-away SQLite test database):
+    USE_SQLITE_FOR_TESTS=True python -m benchmarks.movie_list_serialization --rows 1000 --repeat 20
+"""
+
+import argparse
+import os
+import timeit
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "movienight.settings")
+os.environ.setdefault("DJANGO_CONFIGURATION", "Dev")
+
+import configurations
+
+configurations.setup()
+
+from django.db import connection
+from rest_framework.renderers import JSONRenderer
+from apps.movies.models import Movie
+from apps.movies.serializers import MovieSerializer
+
+
+def serializer_path(rows):
+    movies = Movie.objects.all()[:rows]
+    return JSONRenderer().render(MovieSerializer(movies, many=True).data)
+
+
+def values_path(rows):
+    movies = Movie.objects.values(*MovieSerializer.Meta.fields)[:rows]
+    return JSONRenderer().render(list(movies))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000, help="Number of movies per page.")
+    parser.add_argument("--repeat", type=int, default=20, help="Number of timed runs per path.")
+    args = parser.parse_args()
+
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        Movie.objects.bulk_create(
+            Movie(
+                imdb_id=f"tt{i:07d}",
+                title=f"Benchmark Movie {i}",
+                year=1950 + i % 70,
+                plot="",
+                country="",
+                imdb_rating=(i % 100) / 10,
+                url_poster=f"https://example.com/posters/{i}.jpg",
+            )
+            for i in range(args.rows)
+        )
+
+        # Both paths must emit the same payload
+        assert serializer_path(args.rows) == values_path(args.rows)
+
+        serializer_time = min(timeit.repeat(lambda: serializer_path(args.rows), number=1, repeat=args.repeat))
+        values_time = min(timeit.repeat(lambda: values_path(args.rows), number=1, repeat=args.repeat))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    print(f"rows per page:       {args.rows}")
+    print(f"MovieSerializer:     {serializer_time * 1000:.2f} ms")
+    print(f".values() fast path: {values_time * 1000:.2f} ms")
+    print(f"speedup:             {serializer_time / values_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
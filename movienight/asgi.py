@@ -1,7 +1,8 @@
 """
 ASGI config for movienight project.
 
-It exposes the ASGI callable as a module-level variable named ``application``.
+It exposes the ASGI callable as a module-level variable named ``application``: HTTP requests go to
+Django, WebSocket connections (the notification push) to Channels, authenticated with a JWT.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
@@ -9,8 +10,20 @@ https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
-
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'movienight.settings')
+os.environ.setdefault('DJANGO_CONFIGURATION', 'Prod')
+
+from configurations.asgi import get_asgi_application  # noqa: E402
+
+# Set up Django before importing the consumers, which import models
+django_asgi_application = get_asgi_application()
+
+from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
+from channels.security.websocket import AllowedHostsOriginValidator  # noqa: E402
+from apps.notifications.middleware import JWTAuthMiddleware  # noqa: E402
+from apps.notifications.routing import websocket_urlpatterns  # noqa: E402
 
-application = get_asgi_application()
+application = ProtocolTypeRouter({
+    "http": django_asgi_application,
+    "websocket": AllowedHostsOriginValidator(JWTAuthMiddleware(URLRouter(websocket_urlpatterns))),
+})
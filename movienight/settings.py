@@ -71,6 +71,7 @@ class Dev(Configuration):
         'rest_framework_simplejwt',
         'drf_spectacular',
         'djoser',
+        'channels',
         'apps.movienight_auth',  # Contains custom user model
         "django_celery_results",
         "django_celery_beat",
@@ -115,6 +116,7 @@ class Dev(Configuration):
     ]
 
     WSGI_APPLICATION = 'movienight.wsgi.application'
+    ASGI_APPLICATION = 'movienight.asgi.application'
 
 
     # Database configuration
@@ -305,6 +307,11 @@ class Dev(Configuration):
 
     OMDB_KEY = os.getenv('OMDB_KEY', "e1406b6f")
 
+    # Poster proxy: on-disk WebP thumbnail cache, evicted LRU beyond the size limit
+    POSTER_CACHE_DIR = os.getenv('POSTER_CACHE_DIR', os.path.join(BASE_DIR, 'poster_cache'))
+    POSTER_CACHE_MAX_BYTES = int(os.getenv('POSTER_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+    POSTER_CACHE_MAX_AGE = 60 * 60 * 24 * 30
+
     CACHE_TTL = 60 * 60
     CACHES = {
         "default": {
@@ -317,6 +324,25 @@ class Dev(Configuration):
         }        
     }
 
+    # Channel layer of the notification WebSocket, in memory for tests
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels_redis.core.RedisChannelLayer",
+            "CONFIG": {
+                "hosts": [os.getenv('REDIS_URL_CHANNELS', 'redis://redis:6379/2')],
+            },
+        }
+    }
+    if os.getenv('USE_SQLITE_FOR_TESTS') == 'True' or 'pytest' in sys.argv:
+        CHANNEL_LAYERS = {
+            "default": {
+                "BACKEND": "channels.layers.InMemoryChannelLayer",
+            }
+        }
+
+    # Low-priority notification types held for the hourly digest instead of being sent right away, e.g. RES
+    NOTIFICATION_DIGEST_TYPES = values.ListValue([])
+
     SESSION_ENGINE = "django.contrib.sessions.backends.cache"
     SESSION_CACHE_ALIAS = "default"
 
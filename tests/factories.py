@@ -4,9 +4,10 @@ Defines factories for generating test data corresponding to models.
 import factory
 from factory.django import DjangoModelFactory
 from django.contrib.auth import get_user_model
-from movies.models import Genre, SearchTerm, Movie, MovieNight, MovieNightInvitation
+from movies.models import Genre, SearchTerm, Movie, MovieNight, MovieNightInvitation, MovieNightSeries
 from movienight_profile.models import UserProfile
 from notifications.models import Notification
+from chat.models import ChatGroup, Membership
 from django.utils import timezone 
 from factory import Faker
 UserModel = get_user_model()
@@ -85,7 +86,7 @@ class MovieNightFactory(DjangoModelFactory):
         model = MovieNight
 
     movie = factory.SubFactory(MovieFactory)
-    start_time = factory.Faker('future_datetime')
+    start_time = factory.Faker('future_datetime', tzinfo=timezone.get_current_timezone())
     creator = factory.SubFactory(UserFactory)
 
 
@@ -98,6 +99,34 @@ class MovieNightInvitationFactory(DjangoModelFactory):
     attendance_confirmed = False
     is_attending = False
 
+class MovieNightSeriesFactory(DjangoModelFactory):
+    class Meta:
+        model = MovieNightSeries
+
+    movie = factory.SubFactory(MovieFactory, runtime_minutes=120)
+    creator = factory.SubFactory(UserFactory)
+    start_time = factory.LazyFunction(lambda: timezone.now().replace(second=0, microsecond=0) + timezone.timedelta(days=1))
+    rrule = "FREQ=WEEKLY"
+
+    @factory.post_generation
+    def invitees(self, create, extracted, **kwargs):
+        if create and extracted:
+            self.invitees.set(extracted)
+
+class ChatGroupFactory(DjangoModelFactory):
+    class Meta:
+        model = ChatGroup
+
+    groupchat_name = factory.Sequence(lambda n: f"Chat group {n}")
+
+
+class MembershipFactory(DjangoModelFactory):
+    class Meta:
+        model = Membership
+
+    user = factory.SubFactory(UserFactory)
+    chat_group = factory.SubFactory(ChatGroupFactory)
+
 from django.contrib.contenttypes.models import ContentType
 
 class NotificationFactory(DjangoModelFactory):
@@ -9,13 +9,16 @@ Includes:
 Classes:
 - TestMyMovieNightInvitation: Tests for listing and filtering invitations.
 - TestMovieNightInvitationCreateView: Tests for creating invitations.
+- TestMovieNightBulkInvitationView: Tests for creating invitations in bulk.
+- TestMovieNightGroupInvitationView: Tests for inviting a whole chat group.
 """
 
 import pytest
 from django.urls import reverse
 from rest_framework import status
 from movies.models import MovieNightInvitation
-from tests.factories import UserFactory, MovieNightFactory, MovieNightInvitationFactory
+from movies.outbox import dispatch_pending
+from tests.factories import UserFactory, MovieFactory, MovieNightFactory, MovieNightInvitationFactory, ChatGroupFactory, MembershipFactory
 from django.utils import timezone
 from datetime import timedelta
 import logging
@@ -188,6 +191,201 @@ class TestMovieNightInvitationCreateView:
         assert "non_field_errors" in response.data
         assert "must make a unique set" in str(response.data["non_field_errors"])
 
+@pytest.mark.django_db
+@patch('movies.views.send_invitations.delay')
+@patch('movies.tasks.send_invitation.delay')
+class TestMovieNightBulkInvitationView:
+
+    def test_bulk_invite_as_creator(self, mock_send_invitation, mock_send_invitations, authenticated_client, user):
+        """
+        Test that the creator can invite several users at once, with one batched notification task.
+        """
+        movie_night = MovieNightFactory(creator=user)
+        invitees = [UserFactory() for _ in range(3)]
+
+        url = reverse('movienight_invitation_bulk_create', kwargs={'pk': movie_night.pk})
+        response = authenticated_client.post(url, {"invitees": [invitee.email for invitee in invitees]}, format='json')
+        dispatch_pending()
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(response.data['invited']) == 3
+        assert response.data['errors'] == {}
+        invitations = MovieNightInvitation.objects.filter(movie_night=movie_night)
+        assert set(invitations.values_list('invitee_id', flat=True)) == {invitee.pk for invitee in invitees}
+        mock_send_invitation.assert_not_called()
+        mock_send_invitations.assert_called_once()
+        assert sorted(mock_send_invitations.call_args.args[0]) == sorted(invitations.values_list('pk', flat=True))
+
+    def test_bulk_invite_reports_errors_per_email(self, mock_send_invitation, mock_send_invitations, authenticated_client, user):
+        """
+        Test that unknown, already invited and creator emails are reported while the others are invited.
+        """
+        movie_night = MovieNightFactory(creator=user)
+        already_invited = MovieNightInvitationFactory(movie_night=movie_night).invitee
+        new_invitee = UserFactory()
+
+        url = reverse('movienight_invitation_bulk_create', kwargs={'pk': movie_night.pk})
+        data = {"invitees": [new_invitee.email, already_invited.email, "nobody@example.com", user.email, new_invitee.email]}
+        response = authenticated_client.post(url, data, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert [invitation['invitee'] for invitation in response.data['invited']] == [new_invitee.email]
+        assert set(response.data['errors']) == {already_invited.email, "nobody@example.com", user.email}
+        assert MovieNightInvitation.objects.filter(movie_night=movie_night).count() == 2
+
+    def test_bulk_invite_constant_queries(self, mock_send_invitation, mock_send_invitations, authenticated_client, user, django_assert_max_num_queries):
+        """
+        Test that the number of queries does not grow with the number of invitees.
+        """
+        movie_night = MovieNightFactory(creator=user)
+        emails = [UserFactory().email for _ in range(20)]
+
+        url = reverse('movienight_invitation_bulk_create', kwargs={'pk': movie_night.pk})
+        with django_assert_max_num_queries(9):
+            response = authenticated_client.post(url, {"invitees": emails}, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(response.data['invited']) == 20
+        movie_night.refresh_from_db()
+        assert movie_night.pending_count == 20
+
+    def test_bulk_invite_nothing_to_invite(self, mock_send_invitation, mock_send_invitations, authenticated_client, user):
+        """
+        Test that a request where no email can be invited is rejected and queues nothing.
+        """
+        movie_night = MovieNightFactory(creator=user)
+
+        url = reverse('movienight_invitation_bulk_create', kwargs={'pk': movie_night.pk})
+        response = authenticated_client.post(url, {"invitees": ["nobody@example.com"]}, format='json')
+        dispatch_pending()
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "nobody@example.com" in response.data['errors']
+        mock_send_invitations.assert_not_called()
+
+    def test_bulk_invite_as_non_creator(self, mock_send_invitation, mock_send_invitations, authenticated_client):
+        """
+        Test that a user who is not the creator cannot invite others.
+        """
+        movie_night = MovieNightFactory()
+
+        url = reverse('movienight_invitation_bulk_create', kwargs={'pk': movie_night.pk})
+        response = authenticated_client.post(url, {"invitees": [UserFactory().email]}, format='json')
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert not MovieNightInvitation.objects.filter(movie_night=movie_night).exists()
+
+    def test_bulk_invite_invalid_payload(self, mock_send_invitation, mock_send_invitations, authenticated_client, user):
+        """
+        Test that an empty list or a malformed email is rejected.
+        """
+        movie_night = MovieNightFactory(creator=user)
+        url = reverse('movienight_invitation_bulk_create', kwargs={'pk': movie_night.pk})
+
+        assert authenticated_client.post(url, {"invitees": []}, format='json').status_code == status.HTTP_400_BAD_REQUEST
+        assert authenticated_client.post(url, {"invitees": ["not-an-email"]}, format='json').status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+@patch('movies.views.send_invitations.delay')
+@patch('movies.tasks.send_invitation.delay')
+class TestMovieNightGroupInvitationView:
+
+    def test_group_invite_skips_creator_and_existing_invitees(self, mock_send_invitation, mock_send_invitations, authenticated_client, user):
+        """
+        Test that every member is invited once, except the creator and members already invited.
+        """
+        movie_night = MovieNightFactory(creator=user)
+        chat_group = ChatGroupFactory()
+        MembershipFactory(chat_group=chat_group, user=user)
+        members = [MembershipFactory(chat_group=chat_group).user for _ in range(5)]
+        MovieNightInvitationFactory(movie_night=movie_night, invitee=members[0])
+        MembershipFactory()  # Member of another group
+        dispatch_pending()
+        mock_send_invitation.reset_mock()
+
+        url = reverse('movienight_invitation_group_create', kwargs={'pk': movie_night.pk})
+        response = authenticated_client.post(url, {"group_name": chat_group.group_name}, format='json')
+        dispatch_pending()
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['invited'] == 4
+        invitations = MovieNightInvitation.objects.filter(movie_night=movie_night)
+        assert set(invitations.values_list('invitee_id', flat=True)) == {member.pk for member in members}
+        new_pks = invitations.exclude(invitee=members[0]).values_list('pk', flat=True)
+        mock_send_invitations.assert_called_once()
+        assert sorted(mock_send_invitations.call_args.args[0]) == sorted(new_pks)
+        mock_send_invitation.assert_not_called()
+
+    def test_group_invite_twice_is_a_no_op(self, mock_send_invitation, mock_send_invitations, authenticated_client, user):
+        """
+        Test that inviting the same group again creates nothing and queues no notification.
+        """
+        movie_night = MovieNightFactory(creator=user)
+        chat_group = ChatGroupFactory()
+        MembershipFactory(chat_group=chat_group, user=user)
+        MembershipFactory(chat_group=chat_group)
+
+        url = reverse('movienight_invitation_group_create', kwargs={'pk': movie_night.pk})
+        authenticated_client.post(url, {"group_name": chat_group.group_name}, format='json')
+        response = authenticated_client.post(url, {"group_name": chat_group.group_name}, format='json')
+        dispatch_pending()
+
+        assert response.data['invited'] == 0
+        assert mock_send_invitations.call_count == 1
+        assert MovieNightInvitation.objects.filter(movie_night=movie_night).count() == 1
+
+    def test_group_invite_constant_queries(self, mock_send_invitation, mock_send_invitations, authenticated_client, user, django_assert_max_num_queries):
+        """
+        Test that the number of queries does not grow with the size of the group.
+        """
+        movie_night = MovieNightFactory(creator=user)
+        chat_group = ChatGroupFactory()
+        MembershipFactory(chat_group=chat_group, user=user)
+        for _ in range(30):
+            MembershipFactory(chat_group=chat_group)
+
+        url = reverse('movienight_invitation_group_create', kwargs={'pk': movie_night.pk})
+        with django_assert_max_num_queries(9):
+            response = authenticated_client.post(url, {"group_name": chat_group.group_name}, format='json')
+
+        assert response.data['invited'] == 30
+        movie_night.refresh_from_db()
+        assert movie_night.pending_count == 30
+
+    def test_group_invite_requires_group_membership(self, mock_send_invitation, mock_send_invitations, authenticated_client, user):
+        """
+        Test that the creator cannot invite a group they are not a member of.
+        """
+        movie_night = MovieNightFactory(creator=user)
+        chat_group = MembershipFactory().chat_group
+
+        url = reverse('movienight_invitation_group_create', kwargs={'pk': movie_night.pk})
+        response = authenticated_client.post(url, {"group_name": chat_group.group_name}, format='json')
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert not MovieNightInvitation.objects.filter(movie_night=movie_night).exists()
+
+    def test_group_invite_as_non_creator(self, mock_send_invitation, mock_send_invitations, authenticated_client, user):
+        """
+        Test that a user who is not the creator cannot invite a group.
+        """
+        movie_night = MovieNightFactory()
+        chat_group = MembershipFactory(user=user).chat_group
+
+        url = reverse('movienight_invitation_group_create', kwargs={'pk': movie_night.pk})
+        response = authenticated_client.post(url, {"group_name": chat_group.group_name}, format='json')
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_group_invite_unknown_group(self, mock_send_invitation, mock_send_invitations, authenticated_client, user):
+        movie_night = MovieNightFactory(creator=user)
+        url = reverse('movienight_invitation_group_create', kwargs={'pk': movie_night.pk})
+
+        assert authenticated_client.post(url, {"group_name": "no-such-group"}, format='json').status_code == status.HTTP_404_NOT_FOUND
+        assert authenticated_client.post(url, {}, format='json').status_code == status.HTTP_400_BAD_REQUEST
+
+
 @pytest.mark.django_db
 @patch('movies.tasks.send_invitation.delay')
 class TestMovieNightInvitationDetailView:
@@ -234,6 +432,25 @@ class TestMovieNightInvitationDetailView:
         invitation.refresh_from_db()
         assert invitation.is_attending is True
         assert invitation.attendance_confirmed is True
+
+    def test_update_invitation_accept_overlapping(self, mock_send_invitation, authenticated_client, user):
+        """
+        Test that accepting an invitation to a movie night overlapping one the invitee created is refused.
+        """
+        movie = MovieFactory(runtime_minutes=120)
+        start_time = timezone.now() + timedelta(days=1)
+        own = MovieNightFactory(creator=user, movie=movie, start_time=start_time)
+        invitation = MovieNightInvitationFactory(
+            invitee=user, movie_night=MovieNightFactory(movie=movie, start_time=start_time + timedelta(hours=1))
+        )
+
+        url = reverse('movienight_invitation_detail', kwargs={'pk': invitation.pk})
+        response = authenticated_client.patch(url, {"is_attending": True}, format='json')
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert [conflict['id'] for conflict in response.data['conflicts']] == [own.id]
+        invitation.refresh_from_db()
+        assert invitation.is_attending is False
     
     """
     Same for refused case
@@ -0,0 +1,202 @@
+"""
+Test cases for the MovieNightSeries API views:
+
+1. **TestMyMovieNightSeriesView**:
+   - Tests for creating series with a validated recurrence rule and listing the series of the user.
+
+2. **TestMovieNightSeriesOccurrencesView**:
+   - Tests that occurrences are expanded within the window, with the stored movie nights merged in.
+
+3. **TestMovieNightSeriesRsvpView**:
+   - Tests that an RSVP stores the occurrence as a movie night and answers the invitee's invitation.
+"""
+
+import pytest
+from datetime import timedelta
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from drf_spectacular.generators import SchemaGenerator
+from unittest.mock import patch
+from movies.models import MovieNight, MovieNightInvitation, MovieNightSeries
+from movies.outbox import dispatch_pending
+from tests.factories import UserFactory, MovieFactory, MovieNightFactory, MovieNightSeriesFactory
+
+
+def nth_occurrence(series, n):
+    """Start of the n-th occurrence after the first, which keeps its local time across DST changes."""
+    found = list(series.occurrences(series.start_time, series.start_time + timedelta(days=31 * (n + 1))))
+    return found[n]
+
+
+@pytest.mark.django_db
+class TestMyMovieNightSeriesView:
+
+    def test_create_series(self, authenticated_client, user):
+        invitee = UserFactory()
+        data = {
+            "movie": MovieFactory().id,
+            "start_time": timezone.now() + timedelta(days=1),
+            "rrule": "rrule:freq=weekly;byday=fr",
+            "invitees": [invitee.email],
+        }
+        response = authenticated_client.post(reverse('my_movienight_series_list'), data, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        series = MovieNightSeries.objects.get()
+        assert series.creator == user
+        assert series.rrule == "FREQ=WEEKLY;BYDAY=FR"
+        assert list(series.invitees.all()) == [invitee]
+        assert not MovieNight.objects.exists()
+
+    def test_create_series_unsupported_rule(self, authenticated_client):
+        data = {"movie": MovieFactory().id, "start_time": timezone.now() + timedelta(days=1), "rrule": "FREQ=HOURLY"}
+        response = authenticated_client.post(reverse('my_movienight_series_list'), data, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'rrule' in response.data
+
+    def test_create_series_until_too_far(self, authenticated_client):
+        """Rejects an UNTIL giving more occurrences than the COUNT limit."""
+        data = {
+            "movie": MovieFactory().id,
+            "start_time": timezone.now() + timedelta(days=1),
+            "rrule": "FREQ=DAILY;UNTIL=99991231",
+        }
+        response = authenticated_client.post(reverse('my_movienight_series_list'), data, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'rrule' in response.data
+        assert not MovieNightSeries.objects.exists()
+
+    def test_list_series(self, authenticated_client, user):
+        created = MovieNightSeriesFactory(creator=user)
+        invited = MovieNightSeriesFactory(invitees=[user])
+        MovieNightSeriesFactory()
+
+        response = authenticated_client.get(reverse('my_movienight_series_list'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert {series['id'] for series in response.data['results']} == {created.id, invited.id}
+
+
+@pytest.mark.django_db
+@patch('movies.tasks.send_invitation.delay')
+class TestMovieNightSeriesOccurrencesView:
+
+    def test_list_occurrences(self, mock_send_invitation, authenticated_client, user):
+        """
+        Test that occurrences of the window are listed and that stored ones carry their movie night and counters.
+        """
+        series = MovieNightSeriesFactory(creator=user, rrule="FREQ=DAILY")
+        stored = series.materialize(nth_occurrence(series, 1))
+        url = reverse('movienight_series_occurrences', kwargs={'pk': series.pk})
+
+        response = authenticated_client.get(url, {
+            "start": series.start_time.isoformat(),
+            "end": (nth_occurrence(series, 2) + timedelta(hours=1)).isoformat(),
+        })
+
+        assert response.status_code == status.HTTP_200_OK
+        results = response.data['results']
+        assert [result['occurrence'] for result in results] == [nth_occurrence(series, day) for day in range(3)]
+        assert [result['movie_night'] for result in results] == [None, stored.pk, None]
+        assert MovieNight.objects.count() == 1
+
+    def test_list_occurrences_forbidden(self, mock_send_invitation, authenticated_client):
+        series = MovieNightSeriesFactory()
+        response = authenticated_client.get(reverse('movienight_series_occurrences', kwargs={'pk': series.pk}))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_list_occurrences_invalid_window(self, mock_send_invitation, authenticated_client, user):
+        series = MovieNightSeriesFactory(creator=user)
+        url = reverse('movienight_series_occurrences', kwargs={'pk': series.pk})
+
+        response = authenticated_client.get(url, {"start": "not a date"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = authenticated_client.get(url, {"end": (timezone.now() + timedelta(days=400)).isoformat()})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = authenticated_client.get(url, {"start": "2024-13-45T00:00:00"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_list_occurrences_schema(self, mock_send_invitation):
+        """
+        Test that the endpoint documents its window parameters and error responses.
+        """
+        schema = SchemaGenerator().get_schema(request=None, public=True)
+        operation = next(
+            path["get"] for url, path in schema["paths"].items()
+            if "movie-night-series" in url and url.endswith("/occurrences/")
+        )
+
+        assert {"start", "end"} <= {parameter["name"] for parameter in operation["parameters"]}
+        assert {"200", "400", "403", "404"} <= set(operation["responses"])
+
+
+@pytest.mark.django_db
+@patch('movies.tasks.send_invitation.delay')
+@patch('movies.tasks.send_attendance_change.delay')
+class TestMovieNightSeriesRsvpView:
+
+    def rsvp(self, client, series, occurrence, is_attending=True):
+        url = reverse('movienight_series_rsvp', kwargs={'pk': series.pk})
+        return client.post(url, {"occurrence": occurrence, "is_attending": is_attending}, format='json')
+
+    def test_rsvp_stores_occurrence(self, mock_send_attendance_change, mock_send_invitation, authenticated_client, user):
+        series = MovieNightSeriesFactory(invitees=[user])
+        occurrence = nth_occurrence(series, 1)
+
+        response = self.rsvp(authenticated_client, series, occurrence)
+        dispatch_pending()
+
+        assert response.status_code == status.HTTP_201_CREATED
+        movie_night = MovieNight.objects.get()
+        assert movie_night.series == series
+        assert movie_night.start_time == occurrence
+        invitation = MovieNightInvitation.objects.get()
+        assert (invitation.invitee, invitation.attendance_confirmed, invitation.is_attending) == (user, True, True)
+        movie_night.refresh_from_db()
+        assert movie_night.attending_count == 1
+        mock_send_attendance_change.assert_called_once_with(invitation.pk, True)
+        mock_send_invitation.assert_not_called()
+
+    def test_rsvp_again_updates_invitation(self, mock_send_attendance_change, mock_send_invitation, authenticated_client, user):
+        series = MovieNightSeriesFactory(invitees=[user, UserFactory()])
+        occurrence = nth_occurrence(series, 1)
+        self.rsvp(authenticated_client, series, occurrence)
+
+        response = self.rsvp(authenticated_client, series, occurrence, is_attending=False)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert MovieNight.objects.count() == 1
+        invitation = MovieNightInvitation.objects.get()
+        assert invitation.is_attending is False
+
+    def test_rsvp_not_an_occurrence(self, mock_send_attendance_change, mock_send_invitation, authenticated_client, user):
+        series = MovieNightSeriesFactory(invitees=[user])
+
+        response = self.rsvp(authenticated_client, series, series.start_time + timedelta(days=1))
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not MovieNight.objects.exists()
+
+    def test_rsvp_not_invited(self, mock_send_attendance_change, mock_send_invitation, authenticated_client):
+        series = MovieNightSeriesFactory()
+
+        response = self.rsvp(authenticated_client, series, series.start_time)
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_rsvp_overlapping(self, mock_send_attendance_change, mock_send_invitation, authenticated_client, user):
+        """
+        Test that attending an occurrence that overlaps another movie night of the user stores nothing.
+        """
+        series = MovieNightSeriesFactory(invitees=[user])
+        MovieNightFactory(creator=user, movie=MovieFactory(runtime_minutes=120), start_time=series.start_time + timedelta(hours=1))
+
+        response = self.rsvp(authenticated_client, series, series.start_time)
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert not MovieNight.objects.filter(series=series).exists()
@@ -24,11 +24,13 @@ import pytest
 from django.urls import reverse
 from rest_framework import status
 from movies.models import MovieNight, MovieNightInvitation
-from tests.factories import UserFactory, MovieFactory, MovieNightFactory, MovieNightInvitationFactory
+from movies.scheduling import busy_intervals, find_conflicts
+from tests.factories import UserFactory, MovieFactory, MovieNightFactory, MovieNightInvitationFactory, MembershipFactory
 from django.utils import timezone
 from datetime import timedelta
 import logging
 from unittest.mock import patch
+from django.core.cache import cache
 
 logger = logging.getLogger(__name__)
 @pytest.mark.django_db
@@ -76,7 +78,41 @@ class TestMyMovieNightView:
         assert movie_night.creator == user
         assert movie_night.start_notification_before == timedelta(seconds=1800)
         assert movie_night.start_notification_sent == False
-    
+        assert movie_night.reminder_offsets == [timedelta(seconds=1800)]
+
+    def test_my_movie_night_create_with_reminder_offsets(self, authenticated_client, user):
+        """
+        Test that a movie night can be created with several reminders, given in any order.
+        """
+        url = reverse('my_movienight_list')
+        data = {
+            "movie": MovieFactory().id,
+            "start_time": timezone.now() + timedelta(days=2),
+            "start_notification_before": 1800,
+            "reminder_offsets": ["00:15:00", "1 00:00:00", "00:15:00"],
+        }
+        response = authenticated_client.post(url, data, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        movie_night = MovieNight.objects.get(pk=response.data["id"])
+        assert movie_night.reminder_offsets == [timedelta(days=1), timedelta(minutes=15)]
+
+    def test_my_movie_night_create_too_many_reminders(self, authenticated_client, user):
+        """
+        Test that a reminder schedule longer than MAX_REMINDERS is refused.
+        """
+        url = reverse('my_movienight_list')
+        data = {
+            "movie": MovieFactory().id,
+            "start_time": timezone.now() + timedelta(days=2),
+            "start_notification_before": 1800,
+            "reminder_offsets": [f"00:0{minutes}:00" for minutes in range(6)],
+        }
+        response = authenticated_client.post(url, data, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "reminder_offsets" in response.data
+
     def test_my_movie_night_create_unauthenticated(self, any_client):
         """
         Test that a new movie night cannot be created by the unauthenticated user.
@@ -123,9 +159,10 @@ class TestParticipatingMovieNightView:
 
         # Assert that only the movie nights where the user is the creator or a confirmed invitee are listed
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 2
-        assert any(movie["id"] == movie_night1.id for movie in response.data)  # user is the creator
-        assert any(movie["id"] == movie_night2.id for movie in response.data)  # user is a confirmed invitee
+        results = response.data['results']
+        assert len(results) == 2
+        assert any(movie["id"] == movie_night1.id for movie in results)  # user is the creator
+        assert any(movie["id"] == movie_night2.id for movie in results)  # user is a confirmed invitee
 
     def test_participating_movie_nights_empty(self, mock_send_invitation, authenticated_client):
         """
@@ -140,7 +177,470 @@ class TestParticipatingMovieNightView:
 
         # Assert that no movie nights are listed since the user is neither the creator nor a confirmed invitee
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data ) == 0
+        assert len(response.data['results']) == 0
+
+    def test_participating_movie_nights_constant_queries(self, mock_send_invitation, authenticated_client, user, django_assert_num_queries):
+        """
+        Test that the feed runs the same number of queries whatever the number of movie nights.
+        """
+        movie = MovieFactory()
+        for _ in range(10):
+            movie_night = MovieNightFactory(creator=user, start_time=timezone.now(), movie=movie)
+            MovieNightInvitationFactory(movie_night=movie_night, attendance_confirmed=True, is_attending=True)
+            MovieNightInvitationFactory(movie_night=movie_night)
+
+        url = reverse('movienight_list')
+        with django_assert_num_queries(4):  # Movie nights, participants, pending invitees, reminders
+            response = authenticated_client.get(url)
+
+        results = response.data['results']
+        assert len(results) == 10
+        assert len(results[0]['participants']) == 1
+        assert len(results[0]['pending_invitees']) == 1
+        assert set(results[0]['movie']) == {"title", "runtime_minutes"}
+
+    def test_participating_movie_nights_cursor_pagination(self, mock_send_invitation, authenticated_client, user):
+        """
+        Test that the feed is cursor-paginated in start time order.
+        """
+        movie = MovieFactory()
+        for days in range(25):
+            MovieNightFactory(creator=user, start_time=timezone.now() + timedelta(days=days), movie=movie)
+
+        response = authenticated_client.get(reverse('movienight_list'))
+        next_page = authenticated_client.get(response.data['next'])
+
+        first, second = response.data['results'], next_page.data['results']
+        assert len(first) == 20 and len(second) == 5
+        start_times = [movie_night['start_time'] for movie_night in first + second]
+        assert start_times == sorted(start_times)
+
+
+@pytest.mark.django_db
+@patch('movies.tasks.send_invitation.delay')
+class TestMyAgendaView:
+
+    def test_my_agenda_roles_in_start_time_order(self, mock_send_invitation, authenticated_client, user):
+        """
+        Test that the agenda merges created, attending and invited movie nights in start time order.
+        """
+        now = timezone.now()
+        invited = MovieNightFactory(start_time=now + timedelta(days=1))
+        invitation = MovieNightInvitationFactory(movie_night=invited, invitee=user)
+        created = MovieNightFactory(creator=user, start_time=now + timedelta(days=2))
+        attending = MovieNightFactory(start_time=now + timedelta(days=3))
+        MovieNightInvitationFactory(movie_night=attending, invitee=user, attendance_confirmed=True, is_attending=True)
+
+        # Refused invitations and unrelated movie nights are not part of the agenda
+        refused = MovieNightFactory(start_time=now + timedelta(days=4))
+        MovieNightInvitationFactory(movie_night=refused, invitee=user, attendance_confirmed=True, is_attending=False)
+        MovieNightFactory(start_time=now + timedelta(days=5))
+
+        response = authenticated_client.get(reverse('my_agenda'))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['next'] is None
+        results = response.data['results']
+        assert [item['id'] for item in results] == [invited.id, created.id, attending.id]
+        assert [item['role'] for item in results] == ["invited", "creator", "attending"]
+        assert results[0]['invitation_id'] == invitation.id
+        assert results[1]['invitation_id'] is None
+
+    def test_my_agenda_cursor_pagination(self, mock_send_invitation, authenticated_client, user):
+        """
+        Test that following `next` walks the whole agenda once, in order, across sources.
+        """
+        movie = MovieFactory()
+        now = timezone.now()
+        expected = []
+        for days in range(12):
+            if days % 2:
+                movie_night = MovieNightFactory(creator=user, start_time=now + timedelta(days=days), movie=movie)
+            else:
+                movie_night = MovieNightFactory(start_time=now + timedelta(days=days), movie=movie)
+                MovieNightInvitationFactory(movie_night=movie_night, invitee=user)
+            expected.append(movie_night.id)
+
+        ids = []
+        url = f"{reverse('my_agenda')}?page_size=5"
+        while url:
+            response = authenticated_client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            ids += [item['id'] for item in response.data['results']]
+            url = response.data['next']
+
+        assert ids == expected
+
+    def test_my_agenda_start_from(self, mock_send_invitation, authenticated_client, user):
+        """
+        Test that `start_from` skips movie nights starting earlier.
+        """
+        now = timezone.now()
+        MovieNightFactory(creator=user, start_time=now + timedelta(days=1))
+        later = MovieNightFactory(creator=user, start_time=now + timedelta(days=3))
+
+        start_from = (now + timedelta(days=2)).isoformat()
+        response = authenticated_client.get(reverse('my_agenda'), {'start_from': start_from})
+
+        assert [item['id'] for item in response.data['results']] == [later.id]
+
+    def test_my_agenda_constant_queries(self, mock_send_invitation, authenticated_client, user, django_assert_num_queries):
+        """
+        Test that a page costs one query per source whatever its size.
+        """
+        movie = MovieFactory()
+        for days in range(10):
+            MovieNightFactory(creator=user, start_time=timezone.now() + timedelta(days=days), movie=movie)
+            movie_night = MovieNightFactory(start_time=timezone.now() + timedelta(days=days), movie=movie)
+            MovieNightInvitationFactory(movie_night=movie_night, invitee=user)
+
+        with django_assert_num_queries(3):
+            response = authenticated_client.get(reverse('my_agenda'))
+
+        assert len(response.data['results']) == 20
+
+    def test_my_agenda_invalid_parameters(self, mock_send_invitation, authenticated_client):
+        """
+        Test that malformed cursors, page sizes and start times are rejected.
+        """
+        url = reverse('my_agenda')
+        assert authenticated_client.get(url, {'cursor': 'not-a-cursor'}).status_code == status.HTTP_400_BAD_REQUEST
+        assert authenticated_client.get(url, {'page_size': '0'}).status_code == status.HTTP_400_BAD_REQUEST
+        assert authenticated_client.get(url, {'start_from': 'tomorrow'}).status_code == status.HTTP_400_BAD_REQUEST
+        assert authenticated_client.get(url, {'start_from': '2024-13-45T00:00:00'}).status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_my_agenda_naive_start_from(self, mock_send_invitation, authenticated_client, user):
+        """
+        Test that a `start_from` without offset is read in the local time zone.
+        """
+        now = timezone.localtime()
+        MovieNightFactory(creator=user, start_time=now + timedelta(days=1))
+        later = MovieNightFactory(creator=user, start_time=now + timedelta(days=3))
+
+        start_from = (now + timedelta(days=2)).replace(tzinfo=None).isoformat()
+        response = authenticated_client.get(reverse('my_agenda'), {'start_from': start_from})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [item['id'] for item in response.data['results']] == [later.id]
+
+    def test_my_agenda_full_pages_across_duplicates(self, mock_send_invitation, authenticated_client, user):
+        """
+        Test that a movie night found in several sources is listed once, and pages stay full.
+        """
+        movie = MovieFactory()
+        now = timezone.now()
+        expected = []
+        for days in range(7):
+            movie_night = MovieNightFactory(creator=user, start_time=now + timedelta(days=days), movie=movie)
+            if days < 4:
+                # The creator is also attending their own movie night
+                MovieNightInvitationFactory(movie_night=movie_night, invitee=user, attendance_confirmed=True, is_attending=True)
+            expected.append(movie_night.id)
+
+        pages = []
+        url = f"{reverse('my_agenda')}?page_size=3"
+        while url:
+            response = authenticated_client.get(url)
+            pages.append([item['id'] for item in response.data['results']])
+            url = response.data['next']
+
+        assert pages == [expected[:3], expected[3:6], expected[6:]]
+
+    def test_my_agenda_unauthenticated(self, mock_send_invitation, any_client):
+        response = any_client.get(reverse('my_agenda'))
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+@patch('movies.tasks.send_invitation.delay')
+class TestMovieNightCalendarFeedView:
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        cache.clear()
+
+    def feed_url(self, authenticated_client):
+        return authenticated_client.get(reverse('my_calendar')).data['url']
+
+    def test_calendar_feed_lists_created_and_attending(self, mock_send_invitation, authenticated_client, any_client, user):
+        """
+        Test that the feed lists the movie nights the user created or accepted, and nothing else.
+        """
+        created = MovieNightFactory(creator=user, start_time=timezone.now() + timedelta(days=1))
+        attending = MovieNightFactory(start_time=timezone.now() + timedelta(days=2))
+        MovieNightInvitationFactory(movie_night=attending, invitee=user, attendance_confirmed=True, is_attending=True)
+        pending = MovieNightFactory(start_time=timezone.now() + timedelta(days=3))
+        MovieNightInvitationFactory(movie_night=pending, invitee=user)
+
+        response = any_client.get(self.feed_url(authenticated_client))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == "text/calendar; charset=utf-8"
+        assert response['ETag'] and response['Last-Modified']
+        body = response.content.decode()
+        assert body.startswith("BEGIN:VCALENDAR\r\n")
+        assert f"UID:movienight-{created.pk}@movienight" in body
+        assert f"UID:movienight-{attending.pk}@movienight" in body
+        assert f"UID:movienight-{pending.pk}@movienight" not in body
+
+    def test_calendar_feed_not_modified_without_queries(self, mock_send_invitation, authenticated_client, any_client, user, django_assert_num_queries):
+        """
+        Test that a poll with a matching ETag gets a 304 without touching the database.
+        """
+        MovieNightFactory(creator=user)
+        url = self.feed_url(authenticated_client)
+        etag = any_client.get(url)['ETag']
+
+        with django_assert_num_queries(0):
+            response = any_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_calendar_feed_changes_after_accepting(self, mock_send_invitation, authenticated_client, any_client, user, django_capture_on_commit_callbacks):
+        """
+        Test that accepting an invitation changes the ETag and the cached feed.
+        """
+        url = self.feed_url(authenticated_client)
+        etag = any_client.get(url)['ETag']
+        movie_night = MovieNightFactory()
+        invitation = MovieNightInvitationFactory(movie_night=movie_night, invitee=user)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            invitation.is_attending = True
+            invitation.save()
+
+        response = any_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'] != etag
+        assert f"UID:movienight-{movie_night.pk}@movienight" in response.content.decode()
+
+    def test_calendar_feed_invalid_token(self, mock_send_invitation, any_client):
+        url = reverse('movienight_calendar_feed', kwargs={'token': '1:forged'})
+        assert any_client.get(url).status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+@patch('movies.tasks.send_invitation.delay')
+class TestMovieNightScheduleConflicts:
+
+    def test_end_time_is_stored(self, mock_send_invitation, user):
+        movie_night = MovieNightFactory(creator=user, movie=MovieFactory(runtime_minutes=95))
+        movie_night.refresh_from_db()
+        assert movie_night.end_time == movie_night.start_time + timedelta(minutes=95)
+
+    def test_movie_night_without_end_time_is_not_a_conflict(self, mock_send_invitation, user):
+        """
+        Test that a movie night with no stored end time never overlaps, on any database backend.
+        """
+        start_time = timezone.now() + timedelta(days=1)
+        movie_night = MovieNightFactory(creator=user, movie=MovieFactory(runtime_minutes=120), start_time=start_time)
+        MovieNight.objects.filter(pk=movie_night.pk).update(end_time=None)
+
+        assert find_conflicts(user, start_time + timedelta(days=1), start_time + timedelta(days=2)) == []
+        assert list(busy_intervals([user.pk], start_time + timedelta(days=1), start_time + timedelta(days=2))) == []
+
+    def test_create_overlapping_movie_night(self, mock_send_invitation, authenticated_client, user):
+        """
+        Test that creating a movie night overlapping one of the user's is refused with the conflicting nights.
+        """
+        movie = MovieFactory(runtime_minutes=120)
+        start_time = timezone.now() + timedelta(days=1)
+        existing = MovieNightFactory(creator=user, movie=movie, start_time=start_time)
+
+        data = {"movie": movie.id, "start_time": start_time + timedelta(minutes=90), "start_notification_before": 1800}
+        response = authenticated_client.post(reverse('my_movienight_list'), data, format='json')
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert [conflict['id'] for conflict in response.data['conflicts']] == [existing.id]
+        assert MovieNight.objects.filter(creator=user).count() == 1
+
+    def test_create_back_to_back_movie_night(self, mock_send_invitation, authenticated_client, user):
+        """
+        Test that a movie night starting when another one ends is not a conflict.
+        """
+        movie = MovieFactory(runtime_minutes=120)
+        start_time = timezone.now() + timedelta(days=1)
+        MovieNightFactory(creator=user, movie=movie, start_time=start_time)
+
+        data = {"movie": movie.id, "start_time": start_time + timedelta(minutes=120), "start_notification_before": 1800}
+        response = authenticated_client.post(reverse('my_movienight_list'), data, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_create_overlapping_attended_movie_night(self, mock_send_invitation, authenticated_client, user):
+        """
+        Test that movie nights the user accepted count as conflicts, pending invitations do not.
+        """
+        movie = MovieFactory(runtime_minutes=120)
+        start_time = timezone.now() + timedelta(days=1)
+        attending = MovieNightFactory(movie=movie, start_time=start_time)
+        MovieNightInvitationFactory(movie_night=attending, invitee=user, attendance_confirmed=True, is_attending=True)
+        pending = MovieNightFactory(movie=movie, start_time=start_time)
+        MovieNightInvitationFactory(movie_night=pending, invitee=user)
+
+        data = {"movie": movie.id, "start_time": start_time + timedelta(minutes=30), "start_notification_before": 1800}
+        response = authenticated_client.post(reverse('my_movienight_list'), data, format='json')
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert [conflict['id'] for conflict in response.data['conflicts']] == [attending.id]
+
+    def test_update_into_overlap(self, mock_send_invitation, authenticated_client, user):
+        """
+        Test that moving a movie night onto another one is refused, and that it never conflicts with itself.
+        """
+        movie = MovieFactory(runtime_minutes=120)
+        start_time = timezone.now() + timedelta(days=1)
+        MovieNightFactory(creator=user, movie=movie, start_time=start_time)
+        movie_night = MovieNightFactory(creator=user, movie=movie, start_time=start_time + timedelta(days=1))
+        url = reverse('movienight_detail', kwargs={'pk': movie_night.pk})
+
+        response = authenticated_client.patch(url, {"start_time": start_time + timedelta(hours=1)}, format='json')
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+        response = authenticated_client.patch(url, {"start_time": movie_night.start_time + timedelta(minutes=30)}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+@patch('movies.tasks.send_invitation.delay')
+class TestMovieNightStartTimeSuggestionView:
+
+    def suggest(self, client, movie, window_start, window_end, invitees=(), limit=5):
+        data = {
+            "movie": movie.id,
+            "window_start": window_start,
+            "window_end": window_end,
+            "invitees": list(invitees),
+            "limit": limit,
+        }
+        return client.post(reverse('movienight_start_time_suggestion'), data, format='json')
+
+    def test_suggest_around_commitments(self, mock_send_invitation, authenticated_client, user):
+        """
+        Test that suggestions avoid the nights the user created and the invitees are attending,
+        but not the ones an invitee has only been invited to.
+        """
+        movie = MovieFactory(runtime_minutes=120)
+        window_start = timezone.now().replace(microsecond=0) + timedelta(days=1)
+        window_end = window_start + timedelta(hours=10)
+        invitee = UserFactory()
+        own = MovieNightFactory(creator=user, movie=movie, start_time=window_start + timedelta(hours=1))
+        MovieNightInvitationFactory(movie_night=own, invitee=invitee)
+        attending = MovieNightFactory(movie=movie, start_time=window_start + timedelta(hours=4))
+        MovieNightInvitationFactory(movie_night=attending, invitee=invitee, attendance_confirmed=True, is_attending=True)
+        pending = MovieNightFactory(movie=movie, start_time=window_start + timedelta(hours=7))
+        MovieNightInvitationFactory(movie_night=pending, invitee=invitee)
+
+        response = self.suggest(authenticated_client, movie, window_start, window_end, [invitee.email])
+
+        assert response.status_code == status.HTTP_200_OK
+        # Busy from +1h to +3h and from +4h to +6h: only the gap after +6h is long enough
+        slots = response.data['slots']
+        assert len(slots) == 1
+        assert slots[0]['start_time'] == window_start + timedelta(hours=6)
+        assert slots[0]['end_time'] == window_start + timedelta(hours=8)
+        assert slots[0]['free_until'] == window_end
+
+    def test_suggest_limit_and_overlapping_busy_intervals(self, mock_send_invitation, authenticated_client, user):
+        """
+        Test that overlapping busy intervals are merged and that at most `limit` slots are returned.
+        """
+        movie = MovieFactory(runtime_minutes=60)
+        window_start = timezone.now().replace(microsecond=0) + timedelta(days=1)
+        window_end = window_start + timedelta(hours=12)
+        other = UserFactory()
+        group = MembershipFactory(user=user).chat_group
+        MembershipFactory(user=other, chat_group=group)
+        MovieNightFactory(creator=user, movie=movie, start_time=window_start + timedelta(hours=2))
+        MovieNightFactory(creator=other, movie=MovieFactory(runtime_minutes=180), start_time=window_start + timedelta(minutes=150))
+
+        response = self.suggest(authenticated_client, movie, window_start, window_end, [other.email], limit=2)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [slot['start_time'] for slot in response.data['slots']] == [
+            window_start,
+            window_start + timedelta(minutes=330),
+        ]
+        assert response.data['slots'][0]['free_until'] == window_start + timedelta(hours=2)
+
+    def test_suggest_unknown_invitee(self, mock_send_invitation, authenticated_client):
+        """
+        Test that unknown emails are treated as free without being reported.
+        """
+        movie = MovieFactory(runtime_minutes=90)
+        window_start = timezone.now() + timedelta(days=1)
+
+        response = self.suggest(
+            authenticated_client, movie, window_start, window_start + timedelta(hours=3), ["nobody@example.com"]
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert 'errors' not in response.data
+        assert len(response.data['slots']) == 1
+
+    def test_suggest_ignores_unconnected_users(self, mock_send_invitation, authenticated_client, user):
+        """
+        Test that only users sharing a movie night or chat group with the requester count as busy,
+        including users invited to the same movie night as the requester.
+        """
+        movie = MovieFactory(runtime_minutes=60)
+        window_start = timezone.now().replace(microsecond=0) + timedelta(days=1)
+        window_end = window_start + timedelta(hours=3)
+        stranger, co_invitee = UserFactory(), UserFactory()
+        MovieNightFactory(creator=stranger, movie=movie, start_time=window_start)
+        shared = MovieNightFactory(movie=movie, start_time=window_start + timedelta(days=2))
+        MovieNightInvitationFactory(movie_night=shared, invitee=user)
+        MovieNightInvitationFactory(movie_night=shared, invitee=co_invitee)
+        MovieNightFactory(creator=co_invitee, movie=movie, start_time=window_start + timedelta(hours=1))
+
+        response = self.suggest(
+            authenticated_client, movie, window_start, window_end, [stranger.email, co_invitee.email]
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        # The stranger's night at the start of the window is ignored, the co-invitee's one is not
+        assert [slot['start_time'] for slot in response.data['slots']] == [
+            window_start,
+            window_start + timedelta(hours=2),
+        ]
+
+    def test_suggest_invalid_window(self, mock_send_invitation, authenticated_client):
+        movie = MovieFactory(runtime_minutes=90)
+        window_start = timezone.now() + timedelta(days=1)
+
+        response = self.suggest(authenticated_client, movie, window_start, window_start - timedelta(hours=1))
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = self.suggest(authenticated_client, movie, window_start, window_start + timedelta(days=60))
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        past_start = timezone.now() - timedelta(hours=1)
+        response = self.suggest(authenticated_client, movie, past_start, past_start + timedelta(hours=3))
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'window_start' in response.data
+
+    def test_suggest_query_count_does_not_grow_with_invitees(
+        self, mock_send_invitation, authenticated_client, user, django_assert_max_num_queries
+    ):
+        """
+        Test that the invitees' commitments are loaded with a constant number of queries.
+        """
+        movie = MovieFactory(runtime_minutes=90)
+        window_start = timezone.now() + timedelta(days=1)
+        invitees = UserFactory.create_batch(20)
+        group = MembershipFactory(user=user).chat_group
+        for index, invitee in enumerate(invitees):
+            MembershipFactory(user=invitee, chat_group=group)
+            MovieNightFactory(creator=invitee, movie=movie, start_time=window_start + timedelta(hours=index))
+
+        with django_assert_max_num_queries(5):
+            response = self.suggest(
+                authenticated_client, movie, window_start, window_start + timedelta(days=2),
+                [invitee.email for invitee in invitees],
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['slots'][0]['start_time'] >= window_start + timedelta(hours=20, minutes=30)
 
 
 @pytest.mark.django_db
@@ -211,9 +711,9 @@ class TestParticipatingMovieNightViewOrderingAndFiltering:
         assert response.status_code == status.HTTP_200_OK
 
         # Verify that the results are ordered by start_time
-        results = response.data
+        results = response.data['results']
         assert len(results) == 2
-        assert results[0]['start_time'] > results[1]['start_time']
+        assert results[0]['start_time'] < results[1]['start_time']
 
     def test_participating_movie_night_filter_by_creator(self, authenticated_client, user):
         """
@@ -236,7 +736,7 @@ class TestParticipatingMovieNightViewOrderingAndFiltering:
         assert response.status_code == status.HTTP_200_OK
 
         # Verify that only movie nights, where user confirmed to attend, created by the other_user are returned
-        results = response.data
+        results = response.data['results']
         logger.warning (response.data)
         assert len(results) == 1
         assert results[0]['id'] == movie_night1.id
@@ -292,6 +792,40 @@ class TestMovieNightDetailView:
         assert response.data['creator'] == movie_creator.email
         assert response.data['is_creator'] is False
 
+    def test_movie_night_detail_view_invitee_queries(self, mock_send_invitation, authenticated_client, user, django_assert_max_num_queries):
+        """
+        Test that the permission check, the invitation status and the participant lists share one invitation query.
+        """
+        movie_night = MovieNightFactory(creator=UserFactory())
+        MovieNightInvitationFactory(movie_night=movie_night, invitee=user, attendance_confirmed=True, is_attending=True)
+        others = UserFactory.create_batch(3)
+        for other in others:
+            MovieNightInvitationFactory(movie_night=movie_night, invitee=other, attendance_confirmed=True, is_attending=True)
+        MovieNightInvitationFactory(movie_night=movie_night)
+
+        url = reverse('movienight_detail', kwargs={'pk': movie_night.pk})
+        with django_assert_max_num_queries(3):
+            response = authenticated_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['invitation_status']['is_attending'] is True
+        assert response.data['participants'] == [user.email] + [other.email for other in others]
+        assert response.data['pending_invitees'] == []
+
+    def test_movie_night_detail_view_creator_queries(self, mock_send_invitation, authenticated_client, user, django_assert_max_num_queries):
+        movie_night = MovieNightFactory(creator=user)
+        pending = MovieNightInvitationFactory(movie_night=movie_night)
+        attending = MovieNightInvitationFactory(movie_night=movie_night, attendance_confirmed=True, is_attending=True)
+
+        url = reverse('movienight_detail', kwargs={'pk': movie_night.pk})
+        with django_assert_max_num_queries(3):
+            response = authenticated_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['invitation_status']['is_invited'] is False
+        assert response.data['participants'] == [attending.invitee.email]
+        assert response.data['pending_invitees'] == [pending.invitee.email]
+
     def test_movie_night_detail_view_unconfirmed_invitee(self, mock_send_invitation, authenticated_client, user):
         """
         Test that an invited user who has not confirmed attendance can still access the movie night details.
@@ -364,6 +898,21 @@ class TestMovieNightDetailView:
         movie_night.refresh_from_db()
         assert movie_night.start_time == new_start_time
 
+    def test_movie_night_update_reminder_offsets(self, mock_send_invitation, authenticated_client, user):
+        """
+        Test that the creator can replace the reminder schedule, which the detail view returns.
+        """
+        movie_night = MovieNightFactory(creator=user, start_time=timezone.now() + timedelta(days=3))
+
+        url = reverse('movienight_detail', kwargs={'pk': movie_night.pk})
+        response = authenticated_client.patch(url, {"reminder_offsets": ["00:15:00", "1 00:00:00"]}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["reminder_offsets"] == ["1 00:00:00", "00:15:00"]
+        assert sorted(movie_night.reminders.values_list("fire_at", flat=True)) == [
+            movie_night.start_time - timedelta(days=1), movie_night.start_time - timedelta(minutes=15)
+        ]
+
     def test_movie_night_update_as_non_creator(self, mock_send_invitation, authenticated_client):
         """
         Test that a non-creator cannot update the movie night.
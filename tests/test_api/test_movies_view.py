@@ -12,7 +12,7 @@ This file contains test cases for the following functionalities:
    - Handling exceptions that occur during the detail fetch process.
    - Handling authentication and authorization: Unauthenticated User cannot view movie detail.
 
-Each test is designed to mock the necessary components (e.g., `search_and_save`, `fill_movie_details`, and `Movie.objects.filter`) to isolate the logic being tested and avoid actual database or API calls.
+Each test is designed to mock the necessary components (e.g., `search_and_save`, the `fill_movie_details` task, and `Movie.objects.filter`) to isolate the logic being tested and avoid actual database or API calls.
 """
 import pytest
 from tests.factories import MovieFactory, GenreFactory
@@ -21,6 +21,15 @@ from rest_framework import status
 from unittest import mock
 import uuid
 from celery.exceptions import TimeoutError
+from movies.models import Movie
+from movies.serializers import MovieSerializer
+from django.core.cache import cache
+from movies import posters
+from movies.posters import PosterUnavailable, get_thumbnail
+from PIL import Image
+import requests
+import io
+import os
 import logging
 
 logger = logging.getLogger(__name__)
@@ -200,10 +209,15 @@ class TestMovieSearchResultsView:
         assert response.data['error'] == "Search term is required."
 
 class TestMovieDetailView:
+    @pytest.fixture(autouse=True)
+    def clear_hydration_locks(self):
+        """Hydration locks live in the cache and would leak between tests."""
+        cache.clear()
+
     def test_movie_detail_view_authenticated(self, authenticated_client, sample_movie, mocker):
         """Returns movie details successfully."""
-        # Mock fill_movie_details to prevent actual API calls
-        mocker.patch('movies.views.fill_movie_details')
+        # Mock the hydration task to prevent actual API calls
+        mocker.patch('movies.tasks.fill_movie_details.delay')
 
         url = reverse('movie_detail', kwargs={'pk': sample_movie.pk})
         response = authenticated_client.get(url)
@@ -212,26 +226,255 @@ class TestMovieDetailView:
         assert response.data['imdb_id'] == sample_movie.imdb_id
         assert response.data['title'] == sample_movie.title
 
+    def test_movie_detail_view_partial_record_queues_hydration(self, authenticated_client, sample_movie, mocker):
+        """Returns the partial record with a pending marker and queues hydration once."""
+        mock_delay = mocker.patch('movies.tasks.fill_movie_details.delay')
+
+        url = reverse('movie_detail', kwargs={'pk': sample_movie.pk})
+        response = authenticated_client.get(url)
+        authenticated_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['hydration'] == "pending"
+        mock_delay.assert_called_once_with(sample_movie.pk)
+
+    def test_movie_detail_view_full_record(self, authenticated_client, mocker):
+        """Returns a full record as complete without queueing hydration."""
+        mock_delay = mocker.patch('movies.tasks.fill_movie_details.delay')
+        movie = MovieFactory(is_full_record=True)
+
+        url = reverse('movie_detail', kwargs={'pk': movie.pk})
+        response = authenticated_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['hydration'] == "complete"
+        mock_delay.assert_not_called()
+
     def test_movie_detail_view_exception(self, authenticated_client, sample_movie, mocker):
-        """Returns 500 error on internal exception."""
-        # Mock fill_movie_details to raise an exception
-        mocker.patch('movies.views.fill_movie_details', side_effect=Exception('Test Exception'))
+        """Still serves the partial record when the hydration task cannot be queued."""
+        # Mock the hydration task to raise an exception
+        mocker.patch('movies.tasks.fill_movie_details.delay', side_effect=Exception('Test Exception'))
 
         url = reverse('movie_detail', kwargs={'pk': sample_movie.pk})
         response = authenticated_client.get(url)
 
-        assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
-        assert response.data['error'] == 'An unexpected error occurred.'
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['hydration'] == "pending"
 
     def test_movie_detail_view_unauthenticated(self, any_client, sample_movie, mocker):
         """Returns 401 error - Unauthenticated""" 
-        mocker.patch("movies.views.fill_movie_details")
+        mocker.patch("movies.tasks.fill_movie_details.delay")
 
         url = reverse('movie_detail', kwargs={'pk': sample_movie.pk})
         response = any_client.get(url)
 
         assert response.status_code == status.HTTP_401_UNAUTHORIZED   
 
+@pytest.mark.django_db
+class TestMovieBatchView:
+    @pytest.fixture(autouse=True)
+    def clear_hydration_locks(self):
+        """Hydration locks live in the cache and would leak between tests."""
+        cache.clear()
+
+    def test_movie_batch_by_ids_and_imdb_ids(self, authenticated_client, mocker):
+        """Returns the requested movies in request order and reports unknown identifiers."""
+        mocker.patch('movies.tasks.fill_movies_details.delay')
+        movie1 = MovieFactory(imdb_id="tt001", is_full_record=True)
+        movie2 = MovieFactory(imdb_id="tt002")
+
+        url = reverse('movie_batch') + f"?ids={movie2.pk},999&imdb_ids=tt001,tt404"
+        response = authenticated_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [movie['id'] for movie in response.data['results']] == [movie2.pk, movie1.pk]
+        assert response.data['not_found'] == [999, "tt404"]
+
+    def test_movie_batch_queues_one_grouped_hydration(self, authenticated_client, mocker):
+        """Queues one task for all partial records and marks them as pending."""
+        mock_delay = mocker.patch('movies.tasks.fill_movies_details.delay')
+        full = MovieFactory(is_full_record=True)
+        partials = MovieFactory.create_batch(3, genres=[GenreFactory()])
+
+        ids = ",".join(str(movie.pk) for movie in [full] + partials)
+        response = authenticated_client.get(reverse('movie_batch') + f"?ids={ids}")
+
+        assert response.status_code == status.HTTP_200_OK
+        mock_delay.assert_called_once_with([movie.pk for movie in partials])
+        hydration = {movie['id']: movie['hydration'] for movie in response.data['results']}
+        assert hydration[full.pk] == "complete"
+        assert all(hydration[movie.pk] == "pending" for movie in partials)
+
+    def test_movie_batch_constant_queries(self, authenticated_client, mocker, django_assert_max_num_queries):
+        """Fetches movies and genres in a fixed number of queries."""
+        mocker.patch('movies.tasks.fill_movies_details.delay')
+        movies = MovieFactory.create_batch(10, is_full_record=True, genres=[GenreFactory()])
+
+        ids = ",".join(str(movie.pk) for movie in movies)
+        with django_assert_max_num_queries(2):
+            response = authenticated_client.get(reverse('movie_batch') + f"?ids={ids}")
+
+        assert len(response.data['results']) == 10
+
+    def test_movie_batch_too_many(self, authenticated_client):
+        """Returns 400 when more than the maximum batch size is requested."""
+        ids = ",".join(str(pk) for pk in range(51))
+        response = authenticated_client.get(reverse('movie_batch') + f"?ids={ids}")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_movie_batch_invalid_ids(self, authenticated_client):
+        """Returns 400 for missing or non-integer ids."""
+        assert authenticated_client.get(reverse('movie_batch')).status_code == status.HTTP_400_BAD_REQUEST
+        response = authenticated_client.get(reverse('movie_batch') + "?ids=abc")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+def make_poster_bytes(width=600, height=900):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), color=(200, 30, 30)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+def make_poster_response(mocker, content, headers=None):
+    return mocker.Mock(
+        content=content,
+        headers=headers or {},
+        iter_content=lambda chunk_size: [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)],
+    )
+
+@pytest.mark.django_db
+class TestMoviePosterView:
+    @pytest.fixture(autouse=True)
+    def poster_cache(self, settings, tmp_path):
+        settings.POSTER_CACHE_DIR = str(tmp_path)
+        settings.POSTER_CACHE_MAX_BYTES = 10 * 1024 * 1024
+        return tmp_path
+
+    @pytest.fixture
+    def mock_fetch(self, mocker):
+        response = make_poster_response(mocker, make_poster_bytes())
+        return mocker.patch('movies.posters.requests.get', return_value=response)
+
+    def test_poster_served_as_resized_webp(self, any_client, mock_fetch):
+        """Fetches the poster once and serves a cached WebP thumbnail with cache headers."""
+        movie = MovieFactory(url_poster="https://example.com/poster.jpg")
+        url = reverse('movie_poster', kwargs={'pk': movie.pk, 'size': 'small'})
+
+        response = any_client.get(url)
+        any_client.get(reverse('movie_poster', kwargs={'pk': movie.pk, 'size': 'large'}))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == "image/webp"
+        assert "max-age" in response['Cache-Control']
+        image = Image.open(io.BytesIO(b"".join(response.streaming_content)))
+        assert image.format == "WEBP"
+        assert image.width == 154
+        mock_fetch.assert_called_once()
+
+    def test_poster_not_modified(self, any_client, mock_fetch):
+        """Returns 304 when the client already has the thumbnail."""
+        movie = MovieFactory(url_poster="https://example.com/poster.jpg")
+        url = reverse('movie_poster', kwargs={'pk': movie.pk, 'size': 'medium'})
+
+        etag = any_client.get(url)['ETag']
+        response = any_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_poster_unknown_size_or_missing_poster(self, any_client, mock_fetch):
+        """Returns 404 for unknown sizes and movies without a poster."""
+        movie = MovieFactory(url_poster="N/A")
+
+        response = any_client.get(reverse('movie_poster', kwargs={'pk': movie.pk, 'size': 'huge'}))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        response = any_client.get(reverse('movie_poster', kwargs={'pk': movie.pk, 'size': 'small'}))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        mock_fetch.assert_not_called()
+
+    def test_poster_fetch_failure_redirects(self, any_client, mocker):
+        """Falls back to the original poster URL when the poster cannot be fetched."""
+        mocker.patch('movies.posters.requests.get', side_effect=requests.ConnectionError())
+        movie = MovieFactory(url_poster="https://example.com/poster.jpg")
+
+        response = any_client.get(reverse('movie_poster', kwargs={'pk': movie.pk, 'size': 'small'}))
+
+        assert response.status_code == status.HTTP_302_FOUND
+        assert response.url == "https://example.com/poster.jpg"
+
+    def test_poster_evicted_before_open_redirects(self, any_client, poster_cache, mocker):
+        """Falls back to the original poster URL when the thumbnail is evicted before the view opens it."""
+        mocker.patch('movies.views.get_thumbnail', return_value=(str(poster_cache / "evicted.webp"), "abc"))
+        movie = MovieFactory(url_poster="https://example.com/poster.jpg")
+
+        response = any_client.get(reverse('movie_poster', kwargs={'pk': movie.pk, 'size': 'small'}))
+
+        assert response.status_code == status.HTTP_302_FOUND
+        assert response.url == "https://example.com/poster.jpg"
+
+    def test_poster_cache_evicts_least_recently_used(self, settings, poster_cache, mocker):
+        """Evicts the oldest thumbnails once the cache exceeds its size limit."""
+        mocker.patch('movies.posters.requests.get', side_effect=[
+            make_poster_response(mocker, make_poster_bytes(600, 900)),
+            make_poster_response(mocker, make_poster_bytes(601, 900)),
+        ])
+        old_path, _ = get_thumbnail("https://example.com/old.jpg", "large")
+        os.utime(old_path, (0, 0))
+        settings.POSTER_CACHE_MAX_BYTES = sum(
+            os.path.getsize(os.path.join(root, name))
+            for root, dirs, files in os.walk(poster_cache) for name in files if name.endswith(".webp")
+        )
+
+        new_path, _ = get_thumbnail("https://example.com/new.jpg", "large")
+
+        assert os.path.exists(new_path)
+        assert not os.path.exists(old_path)
+
+    def test_poster_cache_walked_only_over_limit(self, mocker):
+        """Only walks the cache on the first miss while the tracked size stays under the limit."""
+        mocker.patch('movies.posters.requests.get', side_effect=[
+            make_poster_response(mocker, make_poster_bytes(600, 900)),
+            make_poster_response(mocker, make_poster_bytes(601, 900)),
+        ])
+        walk = mocker.spy(posters.os, 'walk')
+
+        get_thumbnail("https://example.com/first.jpg", "small")
+        get_thumbnail("https://example.com/second.jpg", "small")
+
+        assert walk.call_count == 1
+
+    def test_poster_too_large_redirects(self, any_client, mocker):
+        """Aborts downloads larger than the byte cap and falls back to the original poster URL."""
+        mocker.patch('movies.posters.POSTER_MAX_BYTES', 1024)
+        mocker.patch('movies.posters.requests.get', return_value=make_poster_response(mocker, make_poster_bytes()))
+        movie = MovieFactory(url_poster="https://example.com/poster.jpg")
+
+        response = any_client.get(reverse('movie_poster', kwargs={'pk': movie.pk, 'size': 'small'}))
+
+        assert response.status_code == status.HTTP_302_FOUND
+        with pytest.raises(PosterUnavailable):
+            get_thumbnail("https://example.com/huge.jpg", "small")
+
+    def test_poster_too_large_content_length(self, mocker):
+        """Rejects posters whose declared length is over the byte cap without reading them."""
+        response = make_poster_response(mocker, b"", headers={"Content-Length": str(posters.POSTER_MAX_BYTES + 1)})
+        mocker.patch('movies.posters.requests.get', return_value=response)
+
+        with pytest.raises(PosterUnavailable):
+            get_thumbnail("https://example.com/huge.jpg", "small")
+        response.close.assert_called_once()
+
+    def test_poster_evicted_twice_raises(self, mock_fetch, mocker):
+        """Retries a thumbnail evicted before it is served once, then gives up."""
+        mocker.patch('movies.posters.os.utime', side_effect=FileNotFoundError())
+
+        with pytest.raises(PosterUnavailable):
+            get_thumbnail("https://example.com/poster.jpg", "small")
+
+    def test_poster_fetch_lock_released(self, mock_fetch):
+        """Drops the per-URL lock once no request holds it."""
+        get_thumbnail("https://example.com/poster.jpg", "small")
+
+        assert posters._fetch_locks == {}
+
 @pytest.mark.django_db
 class TestMovieView:
     
@@ -291,6 +534,20 @@ class TestMovieView:
         assert response.data["results"][0]['year'] == 2020  # The movie with the latest year should be first
         assert response.data["results"][1]['year'] == 2018  # The older movie should be second
 
+    def test_movie_list_view_matches_serializer_schema(self, any_client):
+        """
+        Test that the `.values()` fast path emits exactly what `MovieSerializer` would.
+        """
+        MovieFactory(title="Movie 1", year=2018)
+        MovieFactory(title="Movie 2", year=2020)
+
+        url = reverse('movie_list') + "?ordering=title"
+        response = any_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        expected = MovieSerializer(Movie.objects.order_by("title"), many=True).data
+        assert response.json()["results"] == expected
+
     def test_movie_list_view_empty(self, any_client):
         """
         Test that the movie list view returns an empty list when there are no matching results.
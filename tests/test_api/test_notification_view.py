@@ -17,12 +17,23 @@ import pytest
 from django.urls import reverse
 from rest_framework import status
 from notifications.models import Notification
-from tests.factories import UserFactory, NotificationFactory
+from tests.factories import (
+    UserFactory, UserProfileFactory, NotificationFactory, MovieFactory, MovieNightFactory, MovieNightInvitationFactory
+)
+from unittest.mock import patch
 from django.utils import timezone
+from django.core.cache import cache
+from notifications import unseen
 import logging
 
 logger = logging.getLogger(__name__)
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Unseen counts are cached per user id, and ids are reused between tests
+    cache.clear()
+
+
 @pytest.mark.django_db
 class TestMyNotificationView:
     def test_list_notifications(self, authenticated_client, user):
@@ -109,6 +120,73 @@ class TestMyNotificationView:
         assert results[1]['id'] == notification2.id  # Second most recent
         assert results[2]['id'] == notification1.id  # Oldest notification
 
+    @patch("movies.tasks.send_invitation.delay")
+    def test_list_notifications_constant_queries(self, mock_send_invitation, authenticated_client, user, django_assert_max_num_queries):
+        """
+        Test that listing notifications runs the same queries whatever their number and related objects.
+        """
+        movie = MovieFactory()
+        for _ in range(25):
+            sender = UserProfileFactory(avatar_url="https://example.com/avatar.png").user
+            movie_night = MovieNightFactory(movie=movie)
+            NotificationFactory(recipient=user, sender=sender, content_object=movie_night)
+            NotificationFactory(
+                recipient=user, sender=sender, notification_type="RES",
+                content_object=MovieNightInvitationFactory(movie_night=movie_night, invitee=sender),
+            )
+
+        url = reverse('my_notifications')
+        # Page of notifications with recipient and sender profile, movie nights, invitations, unseen count
+        with django_assert_max_num_queries(4):
+            response = authenticated_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        results = response.data['results']
+        assert len(results) == 20
+        assert all(result['sender_avatar_url'] == "https://example.com/avatar.png" for result in results)
+        invitation_result = next(result for result in results if result['notification_type'] == "RES")
+        assert invitation_result['content_object']['movie_night_id'] is not None
+
+
+    def test_list_notifications_cursor_pagination(self, authenticated_client, user):
+        """
+        Test that notifications are paginated with a cursor, newest first, without repeating any.
+        """
+        movie_night = MovieNightFactory()
+        notifications = [NotificationFactory(recipient=user, content_object=movie_night) for _ in range(25)]
+
+        response = authenticated_client.get(reverse('my_notifications'))
+        assert response.status_code == status.HTTP_200_OK
+        first_page = [result['id'] for result in response.data['results']]
+        assert response.data['next'] is not None
+
+        response = authenticated_client.get(response.data['next'])
+        second_page = [result['id'] for result in response.data['results']]
+
+        assert first_page + second_page == [notification.id for notification in reversed(notifications)]
+        assert response.data['next'] is None
+        assert response.data['unseenCount'] == 25
+
+    def test_unseen_count_is_cached(self, authenticated_client, user, django_capture_on_commit_callbacks):
+        """
+        Test that the unseen count is counted once, bumped by new notifications and repaired by reconciliation.
+        """
+        movie_night = MovieNightFactory()
+        NotificationFactory(recipient=user, content_object=movie_night)
+        NotificationFactory(recipient=user, content_object=movie_night, is_seen=True)
+        url = reverse('my_notifications')
+        assert authenticated_client.get(url).data['unseenCount'] == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            NotificationFactory(recipient=user, content_object=movie_night)
+        assert authenticated_client.get(url).data['unseenCount'] == 2
+
+        # Changes made behind the counter's back are only picked up by the reconciliation
+        Notification.objects.filter(recipient=user).update(is_seen=True)
+        assert authenticated_client.get(url).data['unseenCount'] == 2
+        assert unseen.reconcile_unseen_counts() == 1
+        assert authenticated_client.get(url).data['unseenCount'] == 0
+
 
 @pytest.mark.django_db
 class TestMarkReadNotificationView:
@@ -180,6 +258,7 @@ class TestMarkAllAsSeenView:
         # Create notifications for the authenticated user
         NotificationFactory(recipient=user, is_seen=False)
         NotificationFactory(recipient=user, is_seen=False)
+        assert unseen.get_unseen_count(user.pk) == 2  # Cached until the reset
 
         url = reverse('mark_all_seen')  # Ensure this matches your URL name
         response = authenticated_client.patch(url)
@@ -190,6 +269,7 @@ class TestMarkAllAsSeenView:
         # Fetch all notifications and check that they are now marked as seen
         notifications = Notification.objects.filter(recipient=user)
         assert all(notification.is_seen for notification in notifications)  # All should be seen
+        assert unseen.get_unseen_count(user.pk) == 0
 
     def test_no_unseen_notifications(self, authenticated_client, user):
         """
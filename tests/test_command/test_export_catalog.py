@@ -0,0 +1,79 @@
+"""
+Tests for the catalog export: the `export_catalog` management command and the `movie_export` endpoint.
+"""
+import csv
+import gzip
+import io
+import json
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from tests.factories import MovieFactory, GenreFactory, UserFactory
+
+
+@pytest.fixture
+def catalog(db):
+    action = GenreFactory(name="action")
+    drama = GenreFactory(name="drama")
+    return [
+        MovieFactory(title="Movie 1", genres=[action, drama]),
+        MovieFactory(title="Movie 2", genres=[drama]),
+    ]
+
+
+@pytest.mark.django_db
+class TestExportCatalogCommand:
+
+    def test_export_ndjson(self, catalog, tmp_path):
+        """Every movie is written as one JSON line with its genres."""
+        output = tmp_path / "movies.ndjson"
+        call_command("export_catalog", "--format", "ndjson", "--output", str(output), "--chunk-size", "1")
+
+        rows = [json.loads(line) for line in output.read_text().splitlines()]
+        assert [row["title"] for row in rows] == ["Movie 1", "Movie 2"]
+        assert sorted(rows[0]["genres"]) == ["action", "drama"]
+
+    def test_export_csv_gzip(self, catalog, tmp_path):
+        """The CSV export can be gzipped and keeps a header row."""
+        output = tmp_path / "movies.csv.gz"
+        call_command("export_catalog", "--format", "csv", "--gzip", "--output", str(output))
+
+        rows = list(csv.DictReader(io.StringIO(gzip.decompress(output.read_bytes()).decode())))
+        assert len(rows) == 2
+        assert rows[1]["genres"] == "drama"
+
+
+@pytest.mark.django_db
+class TestMovieExportView:
+
+    def test_export_requires_staff(self, authenticated_client):
+        """Regular users cannot export the catalog."""
+        response = authenticated_client.get(reverse("movie_export", kwargs={"export_format": "csv"}))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_export_streams_ndjson(self, api_client, catalog, django_assert_max_num_queries):
+        """The export is streamed with a constant number of queries."""
+        api_client.force_authenticate(user=UserFactory(is_staff=True))
+        response = api_client.get(reverse("movie_export", kwargs={"export_format": "ndjson"}))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        with django_assert_max_num_queries(2):
+            content = b"".join(response.streaming_content).decode()
+        assert len(content.splitlines()) == 2
+
+    def test_export_gzip(self, api_client, catalog):
+        """`gzip=true` streams a gzip attachment."""
+        api_client.force_authenticate(user=UserFactory(is_staff=True))
+        response = api_client.get(reverse("movie_export", kwargs={"export_format": "csv"}) + "?gzip=true")
+
+        assert response["Content-Type"] == "application/gzip"
+        assert response["Content-Disposition"].endswith('.csv.gz"')
+        content = gzip.decompress(b"".join(response.streaming_content)).decode()
+        assert content.startswith("id,imdb_id,title")
+
+    def test_export_unknown_format(self, api_client):
+        api_client.force_authenticate(user=UserFactory(is_staff=True))
+        response = api_client.get(reverse("movie_export", kwargs={"export_format": "xml"}))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,39 @@
+"""
+Tests for the `repair_rsvp_counts` management command.
+"""
+import io
+import pytest
+from django.core.management import call_command
+from movies.models import MovieNight
+from tests.factories import MovieNightFactory, MovieNightInvitationFactory
+
+
+@pytest.mark.django_db
+class TestRepairRsvpCountsCommand:
+
+    def test_repair_rsvp_counts(self):
+        """Counters that drifted from the invitations are recomputed, the others are left alone."""
+        drifted = MovieNightFactory()
+        MovieNightInvitationFactory(movie_night=drifted, attendance_confirmed=True, is_attending=True)
+        MovieNightInvitationFactory(movie_night=drifted, attendance_confirmed=True, is_attending=False)
+        MovieNight.objects.filter(pk=drifted.pk).update(attending_count=0, declined_count=0, pending_count=3)
+        MovieNightFactory()
+
+        stdout = io.StringIO()
+        call_command("repair_rsvp_counts", stdout=stdout)
+
+        drifted.refresh_from_db()
+        assert (drifted.attending_count, drifted.declined_count, drifted.pending_count) == (1, 1, 0)
+        assert "1 movie night(s)" in stdout.getvalue()
+
+    def test_repair_rsvp_counts_single_movie_night(self):
+        """Only the given movie nights are repaired."""
+        first, second = MovieNightFactory(), MovieNightFactory()
+        MovieNight.objects.filter(pk__in=[first.pk, second.pk]).update(pending_count=2)
+
+        call_command("repair_rsvp_counts", "--movie-night", str(first.pk), stdout=io.StringIO())
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        assert first.pending_count == 0
+        assert second.pending_count == 2
@@ -0,0 +1,65 @@
+"""
+Tests for the notification WebSocket consumer.
+
+- `test_connect_without_token`: Ensures connections without a token are refused.
+- `test_connect_with_invalid_token`: Ensures connections with an invalid token are refused.
+- `test_push_new_notification`: Ensures an authenticated user gets their unseen count, then their new notifications only.
+"""
+import pytest
+from channels.db import database_sync_to_async
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.core.cache import cache
+from rest_framework_simplejwt.tokens import AccessToken
+from notifications.middleware import JWTAuthMiddleware
+from notifications.routing import websocket_urlpatterns
+from tests.factories import UserFactory, MovieNightFactory, NotificationFactory
+
+application = JWTAuthMiddleware(URLRouter(websocket_urlpatterns))
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Unseen counts are cached per user id, and ids are reused between tests
+    cache.clear()
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_connect_without_token():
+    communicator = WebsocketCommunicator(application, "/ws/notifications/")
+    connected, code = await communicator.connect()
+
+    assert not connected
+    assert code == 4401
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_connect_with_invalid_token():
+    communicator = WebsocketCommunicator(application, "/ws/notifications/?token=invalid")
+    connected, code = await communicator.connect()
+
+    assert not connected
+    assert code == 4401
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_push_new_notification():
+    user, other_user = await database_sync_to_async(UserFactory.create_batch)(2)
+    movie_night = await database_sync_to_async(MovieNightFactory)()
+    communicator = WebsocketCommunicator(application, f"/ws/notifications/?token={AccessToken.for_user(user)}")
+    connected, _ = await communicator.connect()
+    assert connected
+    assert await communicator.receive_json_from() == {"type": "unseen_count", "unseenCount": 0}
+
+    await database_sync_to_async(NotificationFactory)(recipient=other_user, content_object=movie_night)
+    notification = await database_sync_to_async(NotificationFactory)(recipient=user, content_object=movie_night, notification_type="UPD")
+
+    message = await communicator.receive_json_from()
+    assert message["type"] == "notification"
+    assert message["notification"]["id"] == notification.id
+    assert message["notification"]["notification_type"] == "UPD"
+    assert await communicator.receive_nothing()
+    await communicator.disconnect()
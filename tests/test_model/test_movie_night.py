@@ -3,7 +3,8 @@ Test cases for MoviNight model.
 """
 
 import pytest
-from tests.factories import MovieNightFactory
+from datetime import timedelta
+from tests.factories import MovieNightFactory, MovieNightInvitationFactory
 from movies.models import MovieNight
 
 
@@ -19,6 +20,67 @@ class TestMovieNight:
         assert self.movienight.movie is not None
         assert self.movienight.creator is not None
 
+    def test_movienight_tracks_start_time(self):
+        movie_night = MovieNight.objects.get(pk=self.movienight.pk)
+        original = movie_night.start_time
+        assert not movie_night.has_changed("start_time")
+
+        movie_night.start_time = original + timedelta(hours=1)
+        assert movie_night.has_changed("start_time")
+        assert movie_night.previous("start_time") == original
+
+        movie_night.save()
+        assert not movie_night.has_changed("start_time")
+
+    def test_movienight_tracks_deferred_start_time(self):
+        start_time = MovieNight.objects.get(pk=self.movienight.pk).start_time
+        movie_night = MovieNight.objects.only("id").get(pk=self.movienight.pk)
+        assert movie_night.previous("start_time") == start_time
+
+    def rsvp_counts(self):
+        self.movienight.refresh_from_db()
+        return (self.movienight.attending_count, self.movienight.declined_count, self.movienight.pending_count)
+
+    def test_movienight_rsvp_counts_follow_invitations(self):
+        invitation = MovieNightInvitationFactory(movie_night=self.movienight)
+        MovieNightInvitationFactory(movie_night=self.movienight, attendance_confirmed=True, is_attending=True)
+        assert self.rsvp_counts() == (1, 0, 1)
+
+        invitation.is_attending = True
+        invitation.save()
+        assert self.rsvp_counts() == (2, 0, 0)
+
+        invitation.is_attending = False
+        invitation.save()
+        assert self.rsvp_counts() == (1, 1, 0)
+
+        invitation.delete()
+        assert self.rsvp_counts() == (1, 0, 0)
+
+    def test_movienight_save_keeps_rsvp_counts(self):
+        movie_night = MovieNight.objects.get(pk=self.movienight.pk)
+        MovieNightInvitationFactory(movie_night=self.movienight)
+
+        # The instance still holds the counters from before the invitation
+        movie_night.start_time += timedelta(hours=1)
+        movie_night.save()
+        assert self.rsvp_counts() == (0, 0, 1)
+
+    def test_movienight_delete_with_invitations(self):
+        MovieNightInvitationFactory(movie_night=self.movienight)
+        self.movienight.delete()
+        assert not MovieNight.objects.filter(pk=self.movienight.pk).exists()
+
+    def test_recompute_rsvp_counts(self):
+        MovieNightInvitationFactory(movie_night=self.movienight)
+        other = MovieNightFactory()
+        MovieNight.objects.filter(pk=self.movienight.pk).update(pending_count=5, declined_count=2)
+
+        assert MovieNight.recompute_rsvp_counts() == 1
+        assert self.rsvp_counts() == (0, 0, 1)
+        other.refresh_from_db()
+        assert (other.attending_count, other.declined_count, other.pending_count) == (0, 0, 0)
+
 """
 NGUYEN Le Diem Quynh lnguye220903@gmail.com
 """
\ No newline at end of file
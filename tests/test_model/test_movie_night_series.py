@@ -0,0 +1,115 @@
+"""
+Test cases for MovieNightSeries model and its recurrence rules.
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from django.utils import timezone
+from tests.factories import MovieNightSeriesFactory
+from movies.models import MovieNight
+from movies.recurrence import parse_rrule, occurrences
+
+PARIS = ZoneInfo("Europe/Paris")
+
+
+class TestRecurrenceRule:
+
+    def test_parse_rrule(self):
+        rule = parse_rrule("RRULE:FREQ=WEEKLY;INTERVAL=2;BYDAY=FR,MO;COUNT=10")
+        assert rule == {"FREQ": "WEEKLY", "INTERVAL": 2, "BYDAY": ["MO", "FR"], "COUNT": 10}
+
+    @pytest.mark.parametrize("text", [
+        "FREQ=YEARLY",
+        "INTERVAL=2",
+        "FREQ=WEEKLY;BYHOUR=20",
+        "FREQ=DAILY;BYDAY=MO",
+        "FREQ=WEEKLY;BYDAY=XX",
+        "FREQ=WEEKLY;COUNT=0",
+        "FREQ=WEEKLY;COUNT=2;UNTIL=20300101",
+        "FREQ=WEEKLY;UNTIL=tomorrow",
+        "FREQ=WEEKLY;FREQ=DAILY",
+    ])
+    def test_parse_rrule_unsupported(self, text):
+        with pytest.raises(ValueError):
+            parse_rrule(text)
+
+    def test_parse_rrule_until_bounded_by_max_count(self):
+        """An UNTIL is rejected once it gives more than MAX_COUNT occurrences from the start."""
+        dtstart = datetime(2030, 1, 1, 20, 0, tzinfo=PARIS)
+        assert parse_rrule("FREQ=DAILY;UNTIL=20310101", dtstart)["UNTIL"].year == 2031
+        with pytest.raises(ValueError):
+            parse_rrule("FREQ=DAILY;UNTIL=99991231", dtstart)
+
+    def test_occurrences_keep_local_time_across_dst(self):
+        # Europe/Paris leaves summer time on the last Sunday of October
+        dtstart = datetime(2030, 10, 18, 20, 0, tzinfo=PARIS)
+        found = list(occurrences("FREQ=WEEKLY", dtstart, dtstart, dtstart + timedelta(days=15)))
+        assert [occurrence.astimezone(PARIS).hour for occurrence in found] == [20, 20, 20]
+        # One hour more between the occurrences around the change
+        assert found[2].timestamp() - found[1].timestamp() == timedelta(days=7, hours=1).total_seconds()
+
+    def test_occurrences_of_long_running_series(self):
+        """Skipping whole periods of an open-ended rule gives the same occurrences as iterating from the start."""
+        dtstart = datetime(2020, 1, 3, 20, 0, tzinfo=PARIS)
+        window_start = datetime(2031, 3, 1, tzinfo=PARIS)
+        window_end = window_start + timedelta(days=28)
+        found = list(occurrences("FREQ=WEEKLY;INTERVAL=2;BYDAY=FR,SU", dtstart, window_start, window_end))
+        expected = [
+            occurrence
+            for occurrence in occurrences("FREQ=WEEKLY;INTERVAL=2;BYDAY=FR,SU;UNTIL=20310401", dtstart, window_start, window_end)
+        ]
+        assert found == expected
+        assert len(found) == 4
+
+
+@pytest.mark.django_db
+class TestMovieNightSeries:
+
+    def test_series_ends_at(self):
+        series = MovieNightSeriesFactory(rrule="FREQ=DAILY;COUNT=3")
+        assert series.ends_at == list(series.occurrences(series.start_time, series.start_time + timedelta(days=3)))[-1]
+        assert series.ends_at > series.start_time + timedelta(days=1)
+        assert MovieNightSeriesFactory().ends_at is None
+
+    def test_series_ends_at_until(self):
+        series = MovieNightSeriesFactory(rrule="FREQ=WEEKLY;UNTIL=20991231", start_time=datetime(2099, 12, 1, 20, 0, tzinfo=PARIS))
+        assert series.ends_at == datetime(2099, 12, 29, 20, 0, tzinfo=PARIS)
+
+    def test_series_occurrences_are_not_stored(self):
+        series = MovieNightSeriesFactory(rrule="FREQ=WEEKLY;COUNT=4")
+        found = list(series.occurrences(series.start_time, series.start_time + timedelta(days=365)))
+        assert len(found) == 4
+        assert series.is_occurrence(found[1])
+        assert not series.is_occurrence(found[1] + timedelta(hours=1))
+        assert not MovieNight.objects.exists()
+
+    def test_materialize(self):
+        series = MovieNightSeriesFactory()
+        occurrence = list(series.occurrences(series.start_time, series.start_time + timedelta(days=8)))[1]
+
+        movie_night = series.materialize(occurrence)
+        assert series.materialize(occurrence) == movie_night
+        assert movie_night.start_time == occurrence
+        assert movie_night.creator == series.creator
+        assert movie_night.movie == series.movie
+        assert movie_night.end_time == occurrence + timedelta(minutes=120)
+
+    def test_materialize_due(self):
+        """Only occurrences whose start notification is due are stored, once."""
+        now = timezone.now().replace(microsecond=0)
+        series = MovieNightSeriesFactory(
+            start_time=now + timedelta(minutes=20), rrule="FREQ=DAILY", start_notification_before=timedelta(minutes=30)
+        )
+        MovieNightSeriesFactory(start_time=now + timedelta(hours=2), start_notification_before=timedelta(minutes=30))
+
+        assert series.__class__.materialize_due(now) == 1
+        assert series.__class__.materialize_due(now) == 0
+        movie_night = MovieNight.objects.get()
+        assert movie_night.series == series
+        assert movie_night.start_time == now + timedelta(minutes=20)
+        assert movie_night.start_notification_before == timedelta(minutes=30)
+
+"""
+NGUYEN Le Diem Quynh lnguye220903@gmail.com
+"""
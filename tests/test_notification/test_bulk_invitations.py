@@ -0,0 +1,59 @@
+"""
+Tests for the notifications of invitations created in bulk.
+
+- `test_send_invitations_in_batches`: Ensures the notifications are inserted with one query per batch, not per invitation.
+- `test_send_invitations_counts_and_pushes`: Ensures the unseen counts are bumped and the notifications pushed once committed.
+"""
+import pytest
+from django.core.cache import cache
+from movies.models import MovieNightInvitation
+from notifications.models import Notification
+from notifications.notifications import send_invitations
+from notifications.unseen import get_unseen_count
+from tests.factories import MovieNightFactory, MovieNightInvitationFactory
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Unseen counts are cached per user id, and ids are reused between tests
+    cache.clear()
+
+
+@pytest.fixture
+def invitations():
+    movie_night = MovieNightFactory()
+    created = MovieNightInvitationFactory.create_batch(12, movie_night=movie_night)
+    return MovieNightInvitation.objects.filter(pk__in=[invitation.pk for invitation in created]).select_related(
+        "movie_night__creator", "invitee"
+    )
+
+
+@pytest.mark.django_db
+class TestSendInvitations:
+
+    def test_send_invitations_in_batches(self, invitations, django_assert_max_num_queries):
+        Notification.objects.all().delete()
+
+        # Content type, SELECT the invitations, then one INSERT per batch of 5
+        with django_assert_max_num_queries(5):
+            created = send_invitations(invitations, batch_size=5)
+
+        assert created == 12
+        notifications = Notification.objects.filter(notification_type='INV')
+        assert notifications.count() == 12
+        assert set(notifications.values_list("object_id", flat=True)) == {invitation.pk for invitation in invitations}
+        creator = invitations[0].movie_night.creator
+        assert set(notifications.values_list("message", flat=True)) == {f"{creator.email} have invited you to a movie night."}
+        assert set(notifications.values_list("sender_id", flat=True)) == {creator.pk}
+
+    def test_send_invitations_counts_and_pushes(self, invitations, mocker, django_capture_on_commit_callbacks):
+        Notification.objects.all().delete()
+        invitee = invitations[0].invitee
+        assert get_unseen_count(invitee.pk) == 0
+        publish = mocker.patch('notifications.notifications.push.publish')
+
+        with django_capture_on_commit_callbacks(execute=True):
+            send_invitations(invitations, batch_size=5)
+
+        assert get_unseen_count(invitee.pk) == 1
+        assert [len(call.args[0]) for call in publish.call_args_list] == [5, 5, 2]
@@ -0,0 +1,164 @@
+"""
+Tests for the coalescing of notifications and the notification digest.
+
+- `test_responses_are_coalesced`: Ensures responses to one movie night make one notification with a count and the latest actors.
+- `test_accepted_and_refused_are_separate`: Ensures acceptances and refusals are not merged together.
+- `test_repeated_response_is_not_counted_twice`: Ensures an invitee responding again is not counted twice.
+- `test_changed_response_beyond_latest_actors`: Ensures responses are counted per invitation, beyond the latest actors shown.
+- `test_changed_response_is_withdrawn`: Ensures a changed response leaves the notification of the other kind, deleted once empty.
+- `test_seen_notification_is_not_reopened`: Ensures a notification the recipient has seen starts a new group.
+- `test_old_notification_is_not_reopened`: Ensures a notification older than the window starts a new group.
+- `test_notify_many_coalesces_in_constant_queries`: Ensures grouped bulk notifications update the open groups in a few queries.
+- `test_digest_holds_notifications`: Ensures digest types are hidden and uncounted until the digest releases them, merged.
+- `test_digest_in_batches`: Ensures the digest releases every pending notification, in bounded batches.
+"""
+import pytest
+from datetime import timedelta
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from movies.models import MovieNight
+from notifications.models import Notification
+from notifications.notifications import send_attendance_change, notify_many, send_digest, COALESCE_WINDOW
+from notifications.unseen import get_unseen_count
+from tests.factories import MovieNightFactory, MovieNightInvitationFactory, UserFactory
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Unseen counts are cached per user id, and ids are reused between tests
+    cache.clear()
+
+
+@pytest.fixture
+def movie_night():
+    return MovieNightFactory()
+
+
+@pytest.mark.django_db
+class TestCoalescing:
+
+    def test_responses_are_coalesced(self, movie_night):
+        invitations = MovieNightInvitationFactory.create_batch(5, movie_night=movie_night)
+        for invitation in invitations:
+            send_attendance_change(invitation, True)
+
+        notification = Notification.objects.get(recipient=movie_night.creator, notification_type='RES')
+        assert notification.count == 5
+        assert notification.actors == [invitation.invitee.email for invitation in invitations[:-4:-1]]
+        assert notification.content_object == invitations[-1]
+        assert notification.message == f"{invitations[-1].invitee.email} and 4 other(s) have accepted to participate in your movie night."
+
+    def test_accepted_and_refused_are_separate(self, movie_night):
+        accepted, refused = MovieNightInvitationFactory.create_batch(2, movie_night=movie_night)
+        send_attendance_change(accepted, True)
+        send_attendance_change(refused, False)
+
+        notifications = Notification.objects.filter(recipient=movie_night.creator).order_by("pk")
+        assert [notification.count for notification in notifications] == [1, 1]
+        assert notifications[1].message == f"{refused.invitee.email} have refused to participate in your movie night."
+
+    def test_repeated_response_is_not_counted_twice(self, movie_night):
+        invitation = MovieNightInvitationFactory(movie_night=movie_night)
+        send_attendance_change(invitation, True)
+        send_attendance_change(invitation, True)
+
+        notification = Notification.objects.get(recipient=movie_night.creator)
+        assert notification.count == 1
+        assert notification.actors == [invitation.invitee.email]
+
+    def test_changed_response_beyond_latest_actors(self, movie_night):
+        first, *others = MovieNightInvitationFactory.create_batch(4, movie_night=movie_night)
+        for invitation in [first, *others]:
+            send_attendance_change(invitation, True)
+        send_attendance_change(first, False)
+        send_attendance_change(first, True)
+
+        notification = Notification.objects.get(recipient=movie_night.creator)
+        assert notification.count == 4
+        assert notification.actors == [first.invitee.email, others[2].invitee.email, others[1].invitee.email]
+        assert notification.message == f"{first.invitee.email} and 3 other(s) have accepted to participate in your movie night."
+
+    def test_changed_response_is_withdrawn(self, movie_night, django_capture_on_commit_callbacks):
+        first, second = MovieNightInvitationFactory.create_batch(2, movie_night=movie_night)
+        send_attendance_change(first, True)
+        send_attendance_change(second, True)
+        with django_capture_on_commit_callbacks(execute=True):
+            send_attendance_change(second, False)
+
+        accepted, refused = Notification.objects.filter(recipient=movie_night.creator).order_by("pk")
+        assert (accepted.count, accepted.actors) == (1, [first.invitee.email])
+        assert accepted.message == f"{first.invitee.email} have accepted to participate in your movie night."
+        assert (refused.count, refused.actors) == (1, [second.invitee.email])
+
+        assert get_unseen_count(movie_night.creator.pk) == 2
+        with django_capture_on_commit_callbacks(execute=True):
+            send_attendance_change(first, False)
+
+        # The accepted notification lost its only response
+        notification = Notification.objects.get(recipient=movie_night.creator)
+        assert notification.count == 2
+        assert get_unseen_count(movie_night.creator.pk) == 1
+
+    def test_seen_notification_is_not_reopened(self, movie_night):
+        first, second = MovieNightInvitationFactory.create_batch(2, movie_night=movie_night)
+        send_attendance_change(first, True)
+        Notification.objects.update(is_seen=True)
+        send_attendance_change(second, True)
+
+        assert Notification.objects.filter(recipient=movie_night.creator).count() == 2
+
+    def test_old_notification_is_not_reopened(self, movie_night):
+        first, second = MovieNightInvitationFactory.create_batch(2, movie_night=movie_night)
+        send_attendance_change(first, True)
+        Notification.objects.update(timestamp=timezone.now() - COALESCE_WINDOW - timedelta(minutes=1))
+        send_attendance_change(second, True)
+
+        assert Notification.objects.filter(recipient=movie_night.creator).count() == 2
+
+    def test_notify_many_coalesces_in_constant_queries(self, movie_night, django_assert_max_num_queries):
+        recipient_ids = [user.pk for user in UserFactory.create_batch(30)]
+        notify_many('UPD', MovieNight, movie_night.pk, "First change.", recipient_ids[:20], group_key="movienight:1")
+
+        # Content type validation, SELECT open groups, UPDATE them, INSERT the others
+        with django_assert_max_num_queries(4):
+            notify_many('UPD', MovieNight, movie_night.pk, "Second change.", recipient_ids, group_key="movienight:1")
+
+        notifications = Notification.objects.filter(notification_type='UPD')
+        assert notifications.count() == 30
+        assert set(notifications.values_list("message", flat=True)) == {"Second change."}
+        assert sorted(notifications.values_list("count", flat=True)) == [1] * 10 + [2] * 20
+
+    def test_digest_holds_notifications(self, movie_night, settings, api_client, django_capture_on_commit_callbacks):
+        settings.NOTIFICATION_DIGEST_TYPES = ["RES"]
+        for invitation in MovieNightInvitationFactory.create_batch(3, movie_night=movie_night):
+            send_attendance_change(invitation, True)
+
+        notification = Notification.objects.get(recipient=movie_night.creator)
+        assert notification.is_pending
+        assert notification.count == 3
+        assert get_unseen_count(movie_night.creator.pk) == 0
+        api_client.force_authenticate(user=movie_night.creator)
+        assert api_client.get(reverse('my_notifications')).data['results'] == []
+
+        with django_capture_on_commit_callbacks(execute=True):
+            assert send_digest() == 1
+        notification.refresh_from_db()
+        assert not notification.is_pending
+        assert get_unseen_count(movie_night.creator.pk) == 1
+        results = api_client.get(reverse('my_notifications')).data['results']
+        assert [(result['id'], result['count']) for result in results] == [(notification.pk, 3)]
+        assert send_digest() == 0
+
+    def test_digest_in_batches(self, settings, django_capture_on_commit_callbacks):
+        settings.NOTIFICATION_DIGEST_TYPES = ["UPD"]
+        recipient_ids = [user.pk for user in UserFactory.create_batch(5)]
+        movie_night = MovieNightFactory()
+        notify_many('UPD', MovieNight, movie_night.pk, "Changed.", recipient_ids, group_key="movienight:1")
+
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            assert send_digest(batch_size=2) == 5
+
+        assert not Notification.objects.filter(is_pending=True).exists()
+        assert len(callbacks) == 6  # Unseen counts and push of each of the three batches
+        assert [get_unseen_count(recipient_id) for recipient_id in recipient_ids] == [1] * 5
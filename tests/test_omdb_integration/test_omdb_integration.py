@@ -6,11 +6,14 @@ Tests include:
 2. Fetching and updating movie details from OMDb, including validation.
 3. Skipping recent searches and creating new movies from OMDb results.
 4. Correct logging behavior in various scenarios.
+5. Marking the calendar feeds of the movie's nights as changed when its runtime or title is filled in.
 
 Mocks are used for the OMDb client, database operations, and logging to isolate function behavior.
 """
 import pytest
-from tests.factories import MovieFactory, SearchTermFactory
+from django.core.cache import cache
+from tests.factories import MovieFactory, SearchTermFactory, MovieNightFactory, MovieNightInvitationFactory
+from movies import ics
 from movies.omdb_integration import fill_movie_details, search_and_save
 from django.utils.timezone import now
 
@@ -97,6 +100,37 @@ class TestFillMovieDetails:
             "Failed to update movie details: %s", mock_serializer.errors
         )
 
+    def test_fill_movie_details_refreshes_calendar_feeds(self, mocker, django_capture_on_commit_callbacks):
+        """
+        Test that filling in the runtime and title marks the feeds of the creators and attendees of the
+        movie's nights as changed, so they are not served from the cache with the old end time and title.
+        """
+        cache.clear()
+        movie_night = MovieNightFactory(movie=self.movie)
+        attendee = MovieNightInvitationFactory(movie_night=movie_night, attendance_confirmed=True, is_attending=True).invitee
+        outsider = MovieNightFactory().creator
+        user_ids = [movie_night.creator_id, attendee.pk, outsider.pk]
+        versions = {user_id: ics.get_version(user_id)[0] for user_id in user_ids}
+
+        mocker.patch('movies.omdb_integration.get_client_from_settings')
+        mock_serializer = mocker.Mock()
+        mock_serializer.is_valid.return_value = True
+
+        def save(**kwargs):
+            self.movie.runtime_minutes, self.movie.title = 148, "Inception (2010)"
+            self.movie.save()
+
+        mock_serializer.save.side_effect = save
+        mocker.patch('movies.omdb_integration.MovieDetailSerializer', return_value=mock_serializer)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            fill_movie_details(self.movie)
+
+        assert ics.get_version(movie_night.creator_id)[0] != versions[movie_night.creator_id]
+        assert ics.get_version(attendee.pk)[0] != versions[attendee.pk]
+        assert ics.get_version(outsider.pk)[0] == versions[outsider.pk]
+
+
 class TestSearchAndSave:
     @pytest.fixture(autouse=True)
     def setup(self, mocker):
@@ -0,0 +1,38 @@
+"""
+Tests for the transactional outbox that carries the Celery task calls of the movie night signals.
+
+- `test_dispatch_in_order`: Ensures events are queued in the order they were recorded, across batches.
+- `test_dispatch_failure_keeps_events`: Ensures an event the broker rejects, and every later one, stays in the outbox.
+"""
+import pytest
+from unittest import mock
+from movies import tasks
+from movies.models import OutboxEvent
+from movies.outbox import publish, dispatch_pending
+
+
+@pytest.mark.django_db
+class TestOutbox:
+
+    @mock.patch('movies.tasks.send_movie_night_delete.delay')
+    def test_dispatch_in_order(self, mock_delay):
+        for pk in range(5):
+            publish(tasks.send_movie_night_delete, pk)
+
+        assert dispatch_pending(batch_size=2) == 5
+
+        assert [call.args for call in mock_delay.call_args_list] == [(pk,) for pk in range(5)]
+        assert not OutboxEvent.objects.exists()
+
+    @mock.patch('movies.tasks.send_movie_night_delete.delay')
+    def test_dispatch_failure_keeps_events(self, mock_delay):
+        for pk in range(3):
+            publish(tasks.send_movie_night_delete, pk)
+        mock_delay.side_effect = [None, ConnectionError("broker down"), None]
+
+        assert dispatch_pending() == 1
+        assert list(OutboxEvent.objects.order_by('pk').values_list('args', flat=True)) == [[1], [2]]
+
+        mock_delay.side_effect = None
+        assert dispatch_pending() == 2
+        assert not OutboxEvent.objects.exists()
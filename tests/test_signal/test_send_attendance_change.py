@@ -13,6 +13,7 @@ import pytest
 from movies.models import MovieNightInvitation
 from unittest import mock
 from tests.factories import MovieNightFactory
+from movies.outbox import dispatch_pending
 
 @pytest.mark.django_db
 class TestSendAttendanceChange:
@@ -46,10 +47,43 @@ class TestSendAttendanceChange:
         # Update the invitation's attendance
         invitation.is_attending = True
         invitation.save()
+        dispatch_pending()
 
         # Assert that the task was triggered with the correct arguments
         mock_task.assert_called_once_with(invitation.pk, True)            
 
+    def test_send_attendance_change_signal_unchanged(self, mocker, user):
+        """
+        Test that `send_attendance_change.delay` is not called when the attendance did not change.
+        """
+        mock_task = mocker.patch("movies.tasks.send_attendance_change.delay")
+        invitation = MovieNightInvitation.objects.create(
+            invitee=user, movie_night=MovieNightFactory(), is_attending=True
+        )
+
+        invitation = MovieNightInvitation.objects.get(pk=invitation.pk)
+        invitation.save()
+        dispatch_pending()
+
+        mock_task.assert_not_called()
+
+    def test_send_attendance_change_signal_does_not_reread_row(self, mocker, user, django_assert_num_queries):
+        """
+        Test that saving a loaded invitation only runs the UPDATE, the previous state comes from the tracker.
+        """
+        mock_task = mocker.patch("movies.tasks.send_attendance_change.delay")
+        invitation = MovieNightInvitation.objects.create(
+            invitee=user, movie_night=MovieNightFactory(), is_attending=False
+        )
+        invitation = MovieNightInvitation.objects.get(pk=invitation.pk)
+
+        invitation.is_attending = True
+        with django_assert_num_queries(5):  # SAVEPOINT, UPDATE, outbox INSERT, RSVP counters UPDATE, RELEASE SAVEPOINT
+            invitation.save()
+        dispatch_pending()
+
+        mock_task.assert_called_once_with(invitation.pk, True)
+
 """
 NGUYEN Le Diem Quynh lnguye220903@gmail.com
 """
\ No newline at end of file
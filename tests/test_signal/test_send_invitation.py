@@ -3,12 +3,14 @@ Test for the MovieNightInvitation signal that triggers a notification when an in
 
 - `test_send_invitation_signal`: Ensures that the `send_invitation.delay` task is called 
   when a new `MovieNightInvitation` is created.
+- `test_send_invitation_signal_rolled_back`: Ensures that no task is queued for a rolled-back invitation.
   
 """
 
 import pytest
 from django.db.models.signals import post_save
 from movies.models import MovieNightInvitation
+from movies.outbox import dispatch_pending
 from django.db import transaction
 from unittest import mock
 from tests.factories import MovieNightFactory, UserFactory
@@ -33,7 +35,26 @@ class TestSendInvitationSignal:
                 attendance_confirmed=False
             )
         
-        transaction.on_commit(lambda: mock_delay.assert_called_once())
+        # The task call is recorded in the outbox and queued by the dispatcher
+        mock_delay.assert_not_called()
+        dispatch_pending()
+        mock_delay.assert_called_once()
+
+    @mock.patch('movies.tasks.send_invitation.delay')
+    def test_send_invitation_signal_rolled_back(self, mock_delay):
+        """
+        Test that no task is queued for an invitation whose transaction is rolled back.
+        """
+        movie_night = MovieNightFactory()
+        invitee = UserFactory()
+
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                MovieNightInvitation.objects.create(movie_night=movie_night, invitee=invitee)
+                raise RuntimeError("rollback")
+
+        dispatch_pending()
+        mock_delay.assert_not_called()
 
 """
 NGUYEN Le Diem Quynh lnguye220903@gmail.com
@@ -1,6 +1,9 @@
 import pytest
 from django.db.models.signals import pre_delete
-from tests.factories import MovieNightFactory
+from tests.factories import MovieNightFactory, MovieNightInvitationFactory, UserFactory
+from notifications.models import Notification
+from notifications.notifications import send_movie_night_delete
+from movies.outbox import dispatch_pending
 from unittest import mock
 
 @pytest.mark.django_db
@@ -16,9 +19,45 @@ class TestSendMovieNightDeleteSignal:
 
         # Delete the MovieNight, which should trigger the signal
         movie_night.delete()
+        dispatch_pending()
 
-        # Assert that the task was triggered with the correct argument
-        mock_task.assert_called_once_with(movie_night_pk)
+        # Assert that the task was triggered with a snapshot of the deleted movie night
+        mock_task.assert_called_once()
+        snapshot, = mock_task.call_args.args
+        assert snapshot["id"] == movie_night_pk
+        assert snapshot["attendee_ids"] == []
+
+    @mock.patch('movies.tasks.send_invitation.delay')
+    def test_send_movie_night_delete_notifies_attendees_after_delete(self, mock_send_invitation):
+        """
+        Test that the cancellation reaches attending invitees although the movie night row is gone.
+        """
+        movie_night = MovieNightFactory()
+        attending = MovieNightInvitationFactory(movie_night=movie_night, attendance_confirmed=True, is_attending=True).invitee
+        MovieNightInvitationFactory(movie_night=movie_night)  # Pending invitees are not notified
+        title = movie_night.movie.title
+
+        movie_night.delete()
+        dispatch_pending()
+
+        notification = Notification.objects.get(notification_type='CAN')
+        assert notification.recipient == attending
+        assert notification.sender == movie_night.creator
+        assert title in notification.message
+
+    def test_send_movie_night_delete_constant_queries(self, django_assert_max_num_queries):
+        """
+        Test that notifying attendees of a cancellation costs the same queries however many they are.
+        """
+        movie_night = MovieNightFactory()
+        snapshot = movie_night.snapshot()
+        snapshot["attendee_ids"] = [user.pk for user in UserFactory.create_batch(50)]
+
+        # Content type validation, bulk INSERT
+        with django_assert_max_num_queries(2):
+            send_movie_night_delete(snapshot)
+
+        assert Notification.objects.filter(notification_type='CAN', object_id=movie_night.pk).count() == 50
 
 """
 NGUYEN Le Diem Quynh lnguye220903@gmail.com
@@ -2,7 +2,7 @@
 Test for the MovieNight signal that triggers a notification when a movie night start time is updated.
 
 - `test_send_movie_night_update_signal`: Ensures that the `send_movie_night_update.delay` 
-  task is called when a `MovieNight` instance's start time is modified.
+  task is called with a snapshot of the movie night when its start time is modified.
 
 """
 import pytest
@@ -10,6 +10,8 @@ from movies.models import MovieNight
 from unittest import mock
 from django.utils import timezone
 from tests.factories import MovieFactory
+from movies.outbox import dispatch_pending
+from django.core.serializers.json import DjangoJSONEncoder
 
 
 @pytest.mark.django_db
@@ -31,9 +33,34 @@ def test_send_movie_night_update_signal(mocker, user):
     new_time = timezone.now() + timezone.timedelta(days=1)
     movie_night.start_time = new_time
     movie_night.save()
+    dispatch_pending()
 
-    # Assert that the task was triggered with the correct arguments
-    mock_task.assert_called_once_with(movie_night.pk, new_time)
+    # Assert that the task was triggered with a snapshot of the movie night (serialized as JSON by the outbox)
+    mock_task.assert_called_once()
+    snapshot, = mock_task.call_args.args
+    assert snapshot["id"] == movie_night.pk
+    assert snapshot["start_time"] == DjangoJSONEncoder().default(new_time)
+    assert snapshot["creator_id"] == user.pk
+    assert snapshot["title"] == movie_night.movie.title
+
+
+@pytest.mark.django_db
+def test_send_movie_night_update_signal_unchanged(mocker, user, django_assert_num_queries):
+    """
+    Test that saving a movie night without changing its start time sends nothing and does not re-read the row.
+    """
+    mock_task = mocker.patch("movies.tasks.send_movie_night_update.delay")
+    movie_night = MovieNight.objects.create(movie=MovieFactory(), start_time=timezone.now(), creator=user)
+    movie_night = MovieNight.objects.get(pk=movie_night.pk)
+
+    movie_night.start_notification_before = timezone.timedelta(minutes=15)
+    # SAVEPOINT, UPDATE, then moving the reminder: SELECT reminders, SAVEPOINT, DELETE, SELECT offsets,
+    # INSERT, RELEASE SAVEPOINT; and RELEASE SAVEPOINT
+    with django_assert_num_queries(9):
+        movie_night.save()
+    dispatch_pending()
+
+    mock_task.assert_not_called()
 
 """
 NGUYEN Le Diem Quynh lnguye220903@gmail.com
@@ -0,0 +1,189 @@
+"""
+Tests for the reminder schedules of movie nights and the sending of due reminders.
+
+- `TestReminderSchedule`: Ensures the reminders follow the start time and `start_notification_before` of the movie night.
+- `TestArmReminders`: Ensures every unsent reminder is queued as an ETA task at its instant, through the outbox.
+- `TestSendReminder`: Ensures the ETA task sends its reminder once, on time, with the offset in the message.
+- `TestSendDueReminders`: Ensures overdue reminders are caught up once, and reminders still to come are not.
+"""
+import pytest
+from datetime import timedelta
+from django.utils import timezone
+from movies import reminders, tasks
+from movies.models import MovieNight, MovieNightReminder, OutboxEvent
+from movies.outbox import dispatch_pending
+from notifications.models import Notification
+from tests.factories import MovieNightFactory, MovieNightInvitationFactory
+
+
+@pytest.mark.django_db
+class TestReminderSchedule:
+
+    def test_reminder_on_create(self):
+        movie_night = MovieNightFactory(
+            start_time=timezone.now() + timedelta(days=1), start_notification_before=timedelta(minutes=30)
+        )
+
+        reminder = movie_night.reminders.get()
+        assert reminder.offset == timedelta(minutes=30)
+        assert reminder.fire_at == movie_night.start_time - timedelta(minutes=30)
+        assert reminder.sent_at is None
+
+    def test_move_resends_reminders_still_to_come(self):
+        movie_night = MovieNightFactory(start_time=timezone.now() + timedelta(hours=2))
+        movie_night.set_reminders([timedelta(hours=3), timedelta(minutes=15)])
+        assert movie_night.reminders.get(offset=timedelta(hours=3)).sent_at is not None  # Already past when scheduled
+
+        movie_night.start_time += timedelta(days=1)
+        movie_night.save()
+
+        assert not movie_night.reminders.filter(sent_at__isnull=False).exists()
+        assert sorted(movie_night.reminders.values_list("fire_at", flat=True)) == [
+            movie_night.start_time - timedelta(hours=3), movie_night.start_time - timedelta(minutes=15)
+        ]
+
+    def test_change_of_delay_moves_matching_reminder(self):
+        movie_night = MovieNightFactory(
+            start_time=timezone.now() + timedelta(days=2), start_notification_before=timedelta(minutes=30)
+        )
+        movie_night.set_reminders([timedelta(days=1), timedelta(minutes=30)])
+        movie_night = MovieNight.objects.get(pk=movie_night.pk)
+
+        movie_night.start_notification_before = timedelta(minutes=10)
+        movie_night.save()
+
+        assert movie_night.reminder_offsets == [timedelta(days=1), timedelta(minutes=10)]
+
+    def test_unrelated_change_keeps_schedule(self, django_assert_num_queries):
+        movie_night = MovieNightFactory(start_time=timezone.now() + timedelta(days=1))
+        movie_night = MovieNight.objects.get(pk=movie_night.pk)
+        reminder = movie_night.reminders.get()
+
+        movie_night.start_notification_sent = True
+        movie_night.save()
+
+        assert movie_night.reminders.get() == reminder
+
+
+@pytest.mark.django_db
+class TestArmReminders:
+
+    def armed(self):
+        return list(OutboxEvent.objects.filter(task_name="apps.movies.tasks.send_reminder").values_list("args", "eta"))
+
+    def test_new_reminders_are_armed(self):
+        movie_night = MovieNightFactory(start_time=timezone.now() + timedelta(hours=2))
+        movie_night.set_reminders([timedelta(hours=3), timedelta(minutes=15)])
+
+        # The reminder already past when scheduled is not armed
+        reminder = movie_night.reminders.get(offset=timedelta(minutes=15))
+        assert self.armed()[-1] == ([reminder.pk], reminder.fire_at)
+        assert [args for args, eta in self.armed()].count([reminder.pk]) == 1
+
+    def test_moved_reminders_are_armed_again(self):
+        movie_night = MovieNightFactory(start_time=timezone.now() + timedelta(days=1))
+        reminder = movie_night.reminders.get()
+        OutboxEvent.objects.all().delete()
+
+        movie_night.start_time += timedelta(hours=1)
+        movie_night.save()
+
+        assert self.armed() == [([reminder.pk], reminder.fire_at + timedelta(hours=1))]
+
+    def test_dispatch_queues_eta_task(self, mocker):
+        movie_night = MovieNightFactory(start_time=timezone.now() + timedelta(days=1))
+        reminder = movie_night.reminders.get()
+        mock_apply_async = mocker.patch("movies.tasks.send_reminder.apply_async")
+        mocker.patch("movies.tasks.send_invitation.delay")
+
+        dispatch_pending()
+
+        mock_apply_async.assert_called_once_with(args=[reminder.pk], eta=reminder.fire_at)
+
+
+@pytest.mark.django_db
+class TestSendReminder:
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.movie_night = MovieNightFactory(start_time=timezone.now() + timedelta(minutes=10))
+        self.movie_night.set_reminders([timedelta(minutes=15), timedelta(minutes=5), timedelta(days=1, hours=2)])
+
+    def test_send_reminder_once(self):
+        reminder = self.movie_night.reminders.get(offset=timedelta(minutes=15))
+
+        assert tasks.send_reminder(reminder.pk) is True
+        assert tasks.send_reminder(reminder.pk) is False
+
+        notification = Notification.objects.get(notification_type="REM")
+        assert notification.message == "The movie night that you have participated will start in 15 minutes."
+        reminder.refresh_from_db()
+        assert reminder.sent_at is not None
+
+    def test_send_reminder_not_due(self):
+        # An ETA task armed for an instant the reminder has moved from sends nothing
+        reminder = self.movie_night.reminders.get(offset=timedelta(minutes=5))
+
+        assert tasks.send_reminder(reminder.pk) is False
+        assert not Notification.objects.exists()
+
+    def test_send_reminder_message_of_offset(self):
+        reminder = self.movie_night.reminders.get(offset=timedelta(days=1, hours=2))
+        MovieNightReminder.objects.filter(pk=reminder.pk).update(fire_at=timezone.now(), sent_at=None)
+
+        assert tasks.send_reminder(reminder.pk) is True
+        assert Notification.objects.get().message == "The movie night that you have participated will start in 1 day, 2 hours."
+
+
+@pytest.mark.django_db
+class TestSendDueReminders:
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.movie_night = MovieNightFactory(start_time=timezone.now() + timedelta(minutes=10))
+        self.movie_night.set_reminders([timedelta(minutes=15), timedelta(minutes=12), timedelta(minutes=5)])
+        self.attendee = MovieNightInvitationFactory(
+            movie_night=self.movie_night, attendance_confirmed=True, is_attending=True
+        ).invitee
+        MovieNightInvitationFactory(movie_night=self.movie_night)
+
+    def reminder_notifications(self):
+        return Notification.objects.filter(notification_type="REM")
+
+    def test_send_due_reminders_once(self):
+        assert tasks.send_due_reminders() == 2
+        assert tasks.send_due_reminders() == 0
+
+        # The two due reminders of the movie night send one notification to each recipient
+        assert sorted(notification.recipient_id for notification in self.reminder_notifications()) == sorted(
+            [self.attendee.pk, self.movie_night.creator_id]
+        )
+        assert list(self.movie_night.reminders.filter(sent_at__isnull=True).values_list("offset", flat=True)) == [
+            timedelta(minutes=5)
+        ]
+        # Sent for the reminder closest to the start
+        assert set(self.reminder_notifications().values_list("message", flat=True)) == {
+            "The movie night that you have participated will start in 12 minutes."
+        }
+        self.movie_night.refresh_from_db()
+        assert self.movie_night.start_notification_sent is True
+
+    def test_send_due_reminders_in_batches(self):
+        other = MovieNightFactory(start_time=timezone.now() + timedelta(minutes=5), start_notification_before=timedelta(minutes=10))
+
+        assert reminders.send_due(batch_size=1) == 3
+
+        assert self.reminder_notifications().filter(object_id=other.pk).count() == 1
+        assert not MovieNightReminder.objects.filter(sent_at__isnull=True, fire_at__lte=timezone.now()).exists()
+
+    def test_send_due_reminders_leaves_recent_ones_to_their_task(self):
+        other = MovieNightFactory(start_time=timezone.now() + timedelta(minutes=10), start_notification_before=timedelta(minutes=10))
+
+        assert tasks.send_due_reminders() == 2
+        assert other.reminders.get().sent_at is None
+
+    def test_deleted_movie_night_drops_reminders(self):
+        self.movie_night.delete()
+
+        assert tasks.send_due_reminders() == 0
+        assert not MovieNightReminder.objects.exists()
@@ -4,7 +4,8 @@ Test URL patterns and their corresponding views for the MovieNightInvitation
 import pytest
 from django.urls import reverse, resolve
 from movies.views import (
-    MyMovieNightInvitationView, MovieNightInvitationDetailView
+    MyMovieNightInvitationView, MovieNightInvitationDetailView, MovieNightBulkInvitationView,
+    MovieNightGroupInvitationView,
 )
 
 @pytest.mark.django_db
@@ -19,6 +20,16 @@ class TestMovieNightInvitationURLs:
         """Test that the movienight_invitation_detail URL resolves to the correct view."""
         url = reverse('movienight_invitation_detail', kwargs={'pk': '1'})
         assert resolve(url).func.view_class == MovieNightInvitationDetailView
+
+    def test_movie_night_invitation_bulk_create_url(self):
+        """Test that the movienight_invitation_bulk_create URL resolves to the correct view."""
+        url = reverse('movienight_invitation_bulk_create', kwargs={'pk': '1'})
+        assert resolve(url).func.view_class == MovieNightBulkInvitationView
+
+    def test_movie_night_invitation_group_create_url(self):
+        """Test that the movienight_invitation_group_create URL resolves to the correct view."""
+        url = reverse('movienight_invitation_group_create', kwargs={'pk': '1'})
+        assert resolve(url).func.view_class == MovieNightGroupInvitationView
         
 """
 NGUYEN Le Diem Quynh lnguye220903@gmail.com
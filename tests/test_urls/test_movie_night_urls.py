@@ -6,6 +6,13 @@ import pytest
 from django.urls import reverse, resolve
 from movies.views import (
     MyMovieNightView,
+    MyAgendaView,
+    MovieNightStartTimeSuggestionView,
+    MyMovieNightSeriesView,
+    MovieNightSeriesOccurrencesView,
+    MovieNightSeriesRsvpView,
+    MyCalendarFeedView,
+    MovieNightCalendarFeedView,
     ParticipatingMovieNightView,
     InvitedMovieNightView,
     MovieNightDetailView,
@@ -31,6 +38,41 @@ class TestMovieNightURLs:
         url = reverse('invited_movienight_list')
         assert resolve(url).func.view_class == InvitedMovieNightView
 
+    def test_my_agenda_url(self):
+        """Test that the my_agenda URL resolves to the correct view."""
+        url = reverse('my_agenda')
+        assert resolve(url).func.view_class == MyAgendaView
+
+    def test_movie_night_start_time_suggestion_url(self):
+        """Test that the movienight_start_time_suggestion URL resolves to the correct view."""
+        url = reverse('movienight_start_time_suggestion')
+        assert resolve(url).func.view_class == MovieNightStartTimeSuggestionView
+
+    def test_my_movie_night_series_list_url(self):
+        """Test that the my_movienight_series_list URL resolves to the correct view."""
+        url = reverse('my_movienight_series_list')
+        assert resolve(url).func.view_class == MyMovieNightSeriesView
+
+    def test_movie_night_series_occurrences_url(self):
+        """Test that the movienight_series_occurrences URL resolves to the correct view."""
+        url = reverse('movienight_series_occurrences', kwargs={'pk': '1'})
+        assert resolve(url).func.view_class == MovieNightSeriesOccurrencesView
+
+    def test_movie_night_series_rsvp_url(self):
+        """Test that the movienight_series_rsvp URL resolves to the correct view."""
+        url = reverse('movienight_series_rsvp', kwargs={'pk': '1'})
+        assert resolve(url).func.view_class == MovieNightSeriesRsvpView
+
+    def test_my_calendar_url(self):
+        """Test that the my_calendar URL resolves to the correct view."""
+        url = reverse('my_calendar')
+        assert resolve(url).func.view_class == MyCalendarFeedView
+
+    def test_movie_night_calendar_feed_url(self):
+        """Test that the movienight_calendar_feed URL resolves to the correct view."""
+        url = reverse('movienight_calendar_feed', kwargs={'token': '1:signature'})
+        assert resolve(url).func.view_class == MovieNightCalendarFeedView
+
     def test_movie_night_detail_url(self):
         """Test that the movienight_detail URL resolves to the correct view."""
         url = reverse('movienight_detail', kwargs={'pk': '1'})
@@ -3,7 +3,7 @@ Test URL patterns and their corresponding views for the Movie
 """
 import pytest
 from django.urls import reverse, resolve
-from movies.views import MovieSearchView, MovieSearchResultsView, MovieSearchWaitView, MovieDetailView, MovieView
+from movies.views import MovieSearchView, MovieSearchResultsView, MovieSearchWaitView, MovieDetailView, MovieView, MovieBatchView, MoviePosterView, MovieExportView
 
 @pytest.mark.django_db
 class TestMovieURLs:
@@ -31,6 +31,21 @@ class TestMovieURLs:
         url = reverse('movie_detail', kwargs={'pk': 'tt1375666'})
         assert resolve(url).func.view_class == MovieDetailView
 
+    def test_movie_batch_url(self):
+        """Test that the movie_batch URL resolves to the correct view."""
+        url = reverse('movie_batch')
+        assert resolve(url).func.view_class == MovieBatchView
+
+    def test_movie_poster_url(self):
+        """Test that the movie_poster URL resolves to the correct view."""
+        url = reverse('movie_poster', kwargs={'pk': 1, 'size': 'small'})
+        assert resolve(url).func.view_class == MoviePosterView
+
+    def test_movie_export_url(self):
+        """Test that the movie_export URL resolves to the correct view."""
+        url = reverse('movie_export', kwargs={'export_format': 'csv'})
+        assert resolve(url).func.view_class == MovieExportView
+
     def test_movie_list_url(self):
         """Test that the movie_list URL resolves to the correct view."""
         url = reverse('movie_list')